@@ -0,0 +1,278 @@
+"""Permutation A/B test: do months with a buy signal earn more than the rest?
+
+null hypothesis: positive return is due to random chance
+alternate hypothesis: positive return is due to the strategy
+
+Everything runs on plain arrays: group means come from np.bincount, and all
+shuffles are drawn at once as a (repetition, n_months) label matrix whose
+group sums are one more bincount. matplotlib is only imported to draw the
+histograms.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import month_drags
+from engine.cache import cache_key
+from engine.data import close_prices
+from engine.trading_calendar import trading_calendar
+
+FIRST_MONTH = "2015-01"
+N_MONTHS = 120
+# bumped when seeded results change (2: shuffles from np.random.default_rng)
+AB_TEST_VERSION = 2
+
+
+def signal_months(buy_signals):
+    """Months (as Periods) that contain at least one buy signal"""
+    return pd.DatetimeIndex(sorted(buy_signals)).to_period("M").unique().to_numpy()
+
+
+def month_grid(first_month=FIRST_MONTH, n_months=N_MONTHS):
+    return pd.period_range(first_month, periods=n_months, freq="M").to_numpy()
+
+
+def month_codes(months):
+    """year * 12 + month of Periods, dates or "YYYY-MM" strings (ints pass through)"""
+    if np.asarray(months).dtype.kind in "iu":
+        return np.asarray(months, dtype=np.int64)
+    months = pd.PeriodIndex(months, freq="M")
+    return (months.year * 12 + months.month).to_numpy(dtype=np.int64)
+
+
+def signal_month_codes(buy_signals):
+    """Sorted month codes that contain at least one buy signal"""
+    dates = pd.DatetimeIndex(buy_signals)
+    return np.unique(dates.year.to_numpy() * 12 + dates.month.to_numpy()).astype(
+        np.int64
+    )
+
+
+def month_labels(signals_array, every_month):
+    """True for every month of the grid that has a buy signal"""
+    return np.isin(month_codes(every_month), month_codes(signals_array))
+
+
+def month_label_matrix(signal_codes, every_month):
+    """(n_series, n_months) labels for many arrays of signal month codes at once"""
+    grid = month_codes(every_month)
+    sorter = np.argsort(grid, kind="stable")
+    rows = np.repeat(np.arange(len(signal_codes)), [len(c) for c in signal_codes])
+    codes = np.concatenate([month_codes(c) for c in signal_codes] + [[]]).astype(
+        np.int64
+    )
+    found = np.minimum(np.searchsorted(grid, codes, sorter=sorter), len(grid) - 1)
+    columns = sorter[found]
+    hit = grid[columns] == codes
+    labels = np.zeros((len(signal_codes), len(grid)), dtype=bool)
+    labels[rows[hit], columns[hit]] = True
+    return labels
+
+
+def month_returns(prices, buy_dates, holding_period, drag=0.0, roll_months=()):
+    """Return of buying at the trading day nearest each date and selling
+    holding_period months later, after roll drag"""
+    close = close_prices(prices)
+    close_values = close.to_numpy(dtype=float)
+    calendar = trading_calendar(close.index)
+    buy_pos = calendar.nearest(buy_dates)
+    sell_pos = calendar.months_ahead(buy_pos, holding_period)
+    drags = month_drags(holding_period, drag, roll_months)
+    buy_price = close_values[buy_pos]
+    return (
+        (close_values[sell_pos] - buy_price)
+        / buy_price
+        * drags[close.index.month[buy_pos] - 1]
+    )
+
+
+# function to calculate returns for a given month
+def month_return(prices, buy_signal, holding_period, drag=0.0, roll_months=()):
+    return float(
+        month_returns(prices, [buy_signal], holding_period, drag, roll_months)[0]
+    )
+
+
+def group_means(labels, returns):
+    """[mean return of months without a signal, mean of months with one]"""
+    labels = np.asarray(labels, dtype=np.intp)
+    sums = np.bincount(labels, weights=returns, minlength=2)
+    return sums / np.bincount(labels, minlength=2)
+
+
+def shuffled_differences(labels, returns, repetition, rng):
+    """Difference in group means for repetition random shuffles of labels"""
+    labels = np.asarray(labels, dtype=np.intp)
+    shuffled = rng.permuted(np.tile(labels, (repetition, 1)), axis=1)
+    groups = 2 * np.arange(repetition)[:, None] + shuffled
+    sums = np.bincount(
+        groups.ravel(), weights=np.tile(returns, repetition), minlength=2 * repetition
+    ).reshape(repetition, 2)
+    n_signal = labels.sum()
+    return sums[:, 1] / n_signal - sums[:, 0] / (len(labels) - n_signal)
+
+
+def permutation_test(
+    signals_array,
+    prices_array,
+    holding_period,
+    drag=0.0,
+    roll_months=(),
+    repetition=5000,
+    every_month=None,
+    seed=None,
+):
+    """Label months by signal, compute their returns and shuffle the labels.
+
+    Returns a dict with the labels, monthly returns, group means, observed
+    difference, simulated differences and empirical p-value.
+    """
+    if every_month is None:
+        every_month = month_grid()
+
+    # True for the months that have a buy signal
+    yes_buy_signals_months = month_labels(signals_array, every_month)
+
+    return_every_month = month_returns(
+        prices_array,
+        pd.PeriodIndex(every_month).to_timestamp(),
+        holding_period,
+        drag,
+        roll_months,
+    )
+
+    means = group_means(yes_buy_signals_months, return_every_month)
+    observed_difference = means[1] - means[0]
+
+    # shuffle the buy signal labels to perform AB testing
+    differences = shuffled_differences(
+        yes_buy_signals_months,
+        return_every_month,
+        repetition,
+        np.random.default_rng(seed),
+    )
+    empirical_p_value = (
+        np.count_nonzero(differences >= observed_difference) / repetition
+    )
+    return {
+        "labels": yes_buy_signals_months,
+        "returns": np.array(return_every_month),
+        "means": means,
+        "observed_difference": observed_difference,
+        "differences": differences,
+        "p_value": empirical_p_value,
+    }
+
+
+def plot_ab_results(result, contract_name):
+    """Save the monthly return histograms and the null distribution as PNGs"""
+    import matplotlib.pyplot as plt
+
+    observed_difference = result["observed_difference"]
+    labels = result["labels"]
+    returns = result["returns"]
+    bins = np.histogram_bin_edges(returns, bins=10)
+    for label in (False, True):
+        plt.hist(
+            returns[labels == label],
+            bins=bins,
+            density=True,
+            alpha=0.7,
+            label=f"Buy Signal={label}",
+        )
+    plt.xlabel("Monthly Return")
+    plt.legend()
+    plt.title(
+        f"Observed Distribution of {contract_name} Monthly Return Based on Buy Signals"
+    )
+    plt.savefig(
+        f"{contract_name}_monthly_returns_histogram.png", dpi=300, bbox_inches="tight"
+    )
+    print(f"Histogram saved as '{contract_name}_monthly_returns_histogram.png'")
+    plt.close()
+
+    plt.hist(result["differences"], bins=10, density=True, alpha=0.7)
+    plt.xlabel("Difference Between Group Means")
+    plt.axvline(
+        observed_difference,
+        color="red",
+        linestyle="--",
+        linewidth=2,
+        label=f"Observed Difference: {observed_difference:.4f}",
+    )
+    plt.legend()
+    plt.title(f"Prediction Under the Null Hypothesis for {contract_name}")
+    plt.savefig(
+        f"{contract_name}_null_hypothesis_distribution.png",
+        dpi=300,
+        bbox_inches="tight",
+    )
+    print(
+        f"Null hypothesis distribution saved as '{contract_name}_null_hypothesis_distribution.png'"
+    )
+    plt.close()
+
+
+def ab_testing(
+    signals_array,
+    prices_array,
+    holding_period,
+    contract_name,
+    drag=0.0,
+    roll_months=(),
+    repetition=5000,
+    every_month=None,
+    seed=None,
+    cache=None,
+    plot=True,
+):
+    """Run the permutation test, print the p-value and (with plot) save its
+    histograms.
+
+    With a seed and a ResultCache, identical inputs reuse the stored result.
+    """
+    compute = lambda: permutation_test(
+        signals_array,
+        prices_array,
+        holding_period,
+        drag,
+        roll_months,
+        repetition,
+        every_month,
+        seed,
+    )
+    if cache is None or seed is None:
+        result = compute()
+    else:
+        key = cache_key(
+            "ab_testing",
+            AB_TEST_VERSION,
+            close_prices(prices_array),
+            [str(month) for month in signals_array],
+            holding_period,
+            drag,
+            list(roll_months),
+            repetition,
+            [
+                str(month)
+                for month in (every_month if every_month is not None else month_grid())
+            ],
+            seed,
+        )
+        result = cache.get_or_compute(key, compute)
+
+    observed_difference = result["observed_difference"]
+    print(
+        pd.DataFrame(
+            {
+                "Buy Signal": [False, True],
+                "Monthly Return average": result["means"],
+            }
+        ).to_string(index=False)
+    )
+    print("Observed difference in means: ", observed_difference)
+    if plot:
+        plot_ab_results(result, contract_name)
+
+    print("Empirical p-value: ", result["p_value"])
+    return observed_difference, result["p_value"]
@@ -0,0 +1,178 @@
+"""Growing-degree-day, killing-degree-day and THI stress accumulators.
+
+A commodity may list accumulators in the registry; each becomes a column
+of load_weather(name) that signal rules reference like any other, e.g.
+
+    {"name": "KDD_7d", "kind": "kdd", "threshold": 29, "window": 7}
+    {"name": "GDD_season", "kind": "gdd", "base": 10, "cap": 30, "season_start": 4}
+    {"name": "THI_mean_3d", "kind": "mean", "column": "THI", "window": 3}
+
+Kinds give the daily contribution:
+
+- gdd: max(0, (min(Tmax, cap) + max(Tmin, base)) / 2 - base)
+- kdd: max(0, Tmax - threshold)
+- excess: max(0, column - threshold), e.g. THI above a stress level
+- mean: the column itself, averaged instead of summed
+
+and "window" (days) or "season_start" (month) says what it is summed over.
+Sums come from one cumulative sum on the calendar, so every window costs
+O(n) whatever its length. Windows that reach back before the first stored
+day are NaN. Given a ResultCache, results are kept in it, keyed by the
+weather, the specs and ACCUMULATOR_VERSION; by default nothing is written.
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from engine.cache import cache_key
+from engine.events import day_numbers
+
+# Bump when a formula changes so cached columns are recomputed.
+ACCUMULATOR_VERSION = 1
+
+
+def daily_values(spec, columns):
+    """Daily contribution of one accumulator; columns maps name -> array"""
+    kind = spec["kind"]
+    if kind == "gdd":
+        base, cap = spec.get("base", 10.0), spec.get("cap", 30.0)
+        high = np.minimum(columns["Max_Temp_C"], cap)
+        low = np.maximum(columns["Min_Temp_C"], base)
+        return np.maximum((high + low) / 2 - base, 0.0)
+    if kind == "kdd":
+        return np.maximum(columns["Max_Temp_C"] - spec.get("threshold", 29.0), 0.0)
+    if kind == "excess":
+        return np.maximum(columns[spec["column"]] - spec["threshold"], 0.0)
+    if kind == "mean":
+        return np.asarray(columns[spec["column"]], dtype=float)
+    raise ValueError(f"Unknown accumulator kind '{kind}'")
+
+
+def calendar_cumsum(values, days):
+    """Cumulative sums and valid-day counts on a gap-free calendar.
+
+    values is (..., n) on the day numbers days; returns (..., span + 1)
+    arrays where position k + 1 holds the total up to calendar day k.
+    """
+    offset = days - days[0]
+    span = offset[-1] + 1
+    valid = ~np.isnan(values)
+    totals = np.zeros(values.shape[:-1] + (span + 1,))
+    counts = np.zeros(values.shape[:-1] + (span + 1,))
+    totals[..., offset + 1] = np.where(valid, values, 0.0)
+    counts[..., offset + 1] = valid
+    return np.cumsum(totals, axis=-1), np.cumsum(counts, axis=-1), offset
+
+
+def period_starts(spec, dates, offset):
+    """Calendar position where each day's window or season begins"""
+    if "window" in spec:
+        return offset - spec["window"] + 1
+    dates = pd.DatetimeIndex(dates)
+    month = spec["season_start"]
+    year = dates.year - (dates.month < month)
+    starts = pd.to_datetime({"year": year, "month": month, "day": 1})
+    return offset - (dates - pd.DatetimeIndex(starts)).days.to_numpy()
+
+
+def accumulate(spec, dates, columns):
+    """(..., n) accumulator values for the arrays in columns"""
+    values = daily_values(spec, columns)
+    totals, counts, offset = calendar_cumsum(values, day_numbers(dates))
+    starts = period_starts(spec, dates, offset)
+    inside = starts >= 0
+    starts = np.clip(starts, 0, None)
+    total = totals[..., offset + 1] - totals[..., starts]
+    if spec["kind"] == "mean":
+        count = counts[..., offset + 1] - counts[..., starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            total = np.where(count > 0, total / count, np.nan)
+    return np.where(inside, total, np.nan)
+
+
+def accumulator_frame(df, specs):
+    columns = {column: df[column].to_numpy(dtype=float) for column in df.columns}
+    return pd.DataFrame(
+        {spec["name"]: accumulate(spec, df.index, columns) for spec in specs},
+        index=df.index,
+    )
+
+
+def add_accumulators(df, specs, cache=None):
+    """df with one extra column per accumulator spec (reused from cache if given)"""
+    if not specs:
+        return df
+    if cache is None:
+        extra = accumulator_frame(df, specs)
+    else:
+        key = cache_key("accumulators", ACCUMULATOR_VERSION, df, specs)
+        extra = cache.get_or_compute(key, lambda: accumulator_frame(df, specs))
+    return df.join(extra)
+
+
+def batch_accumulate(sims, dates, columns, specs):
+    """Append accumulator columns to an (n_sims, n_days, n_columns) array"""
+    if not specs:
+        return sims, list(columns)
+    arrays = {column: sims[..., j] for j, column in enumerate(columns)}
+    extra = [accumulate(spec, dates, arrays) for spec in specs]
+    return (
+        np.concatenate([sims, np.stack(extra, axis=-1)], axis=-1),
+        list(columns) + [spec["name"] for spec in specs],
+    )
+
+
+class AccumulatorState:
+    """Streaming counterpart of accumulate for a site, O(1) per day"""
+
+    def __init__(self, specs):
+        self.specs = specs
+        self.first_day = None
+        self.windows = {spec["name"]: deque() for spec in specs}
+        self.sums = {spec["name"]: [0.0, 0] for spec in specs}
+
+    @staticmethod
+    def period_start(spec, date, day):
+        if "window" in spec:
+            return day - spec["window"] + 1
+        month = spec["season_start"]
+        season = pd.Timestamp(date.year - (date.month < month), month, 1)
+        return day - (date - season).days
+
+    def update(self, date, record):
+        """Return record with every accumulator column filled in"""
+        date = pd.Timestamp(date)
+        day = day_numbers([date])[0]
+        if self.first_day is None:
+            self.first_day = day
+        record = dict(record)
+        columns = {
+            key: np.nan if value is None else float(value)
+            for key, value in record.items()
+            if not isinstance(value, str)
+        }
+        for spec in self.specs:
+            name = spec["name"]
+            try:
+                value = float(daily_values(spec, columns))
+            except KeyError:
+                value = np.nan
+            start = self.period_start(spec, date, day)
+            window, sums = self.windows[name], self.sums[name]
+            while window and window[0][0] < start:
+                _, old = window.popleft()
+                sums[0] -= old
+                sums[1] -= 1
+            if not np.isnan(value):
+                window.append((day, value))
+                sums[0] += value
+                sums[1] += 1
+            if start < self.first_day:
+                record[name] = np.nan
+            elif spec["kind"] == "mean":
+                record[name] = sums[0] / sums[1] if sums[1] else np.nan
+            else:
+                record[name] = sums[0]
+        return record
@@ -0,0 +1,245 @@
+"""Single-commodity backtests shared by every registered commodity."""
+
+import numpy as np
+import pandas as pd
+
+from engine.cache import cache_key, signal_dates_key
+from engine.data import close_prices
+from engine.trading_calendar import trading_calendar
+
+INITIAL_CASH = 10000
+# share of free cash each lot gets in the overlapping (multi-lot) mode
+LOT_FRACTION = 0.25
+
+
+def roll_offsets(buy_month, holding_period, roll_months):
+    """Months after the buy (1..holding_period) that land in a roll month"""
+    offsets = np.arange(1, holding_period + 1)
+    months = (buy_month - 1 + offsets) % 12 + 1
+    return offsets[np.isin(months, list(roll_months))]
+
+
+def count_roll_months(buy_date, holding_period, roll_months):
+    """Number of roll months crossed in the holding_period months after buy_date"""
+    return len(roll_offsets(buy_date.month, holding_period, roll_months))
+
+
+def get_total_drag(buy_date, holding_period, drag, roll_months):
+    return (1 - drag) ** count_roll_months(buy_date, holding_period, roll_months)
+
+
+def month_drags(holding_period, drag=0.0, roll_months=()):
+    """Total drag of a trade bought in each calendar month (index 0 is January)"""
+    return np.array(
+        [
+            get_total_drag(
+                pd.Timestamp(2001, month, 1), holding_period, drag, roll_months
+            )
+            for month in range(1, 13)
+        ]
+    )
+
+
+def drag_factors(calendar, start, stop, holding_period, drag=0.0, roll_months=()):
+    """Cumulative roll drag on each day start..stop of a trade.
+
+    Each roll is charged at the close of its roll date, the trading day
+    nearest buy_date + k months for every roll month k, so the last factor
+    equals get_total_drag for the trade.
+    """
+    factors = np.ones(stop - start + 1)
+    if not drag or not len(roll_months):
+        return factors
+    offsets = roll_offsets(calendar.index[start].month, holding_period, roll_months)
+    rolls = np.array(
+        [calendar.month_table(int(k))[start] - start for k in offsets], dtype=np.int64
+    )
+    steps = np.zeros(stop - start + 1)
+    np.add.at(steps, np.clip(rolls, 0, stop - start), 1)
+    return (1 - drag) ** np.cumsum(steps)
+
+
+def exit_date(index, buy_date, holding_period):
+    calendar = trading_calendar(index)
+    position = index.get_indexer([buy_date])[0]
+    if position >= 0:
+        return index[calendar.months_ahead(position, holding_period)]
+    target_sell_date = buy_date + pd.DateOffset(months=holding_period)
+    return index[calendar.nearest([target_sell_date])[0]]
+
+
+def select_trades(close, buy_signals, holding_period, drag=0.0, roll_months=()):
+    """Trades taken by the one-position strategy as (buy_pos, sell_pos, total_drag) arrays
+
+    Signals that arrive while a position is open are skipped.
+    """
+    positions = close.index.get_indexer(pd.DatetimeIndex(sorted(buy_signals)))
+    positions = positions[positions >= 0]
+    exits = trading_calendar(close.index).months_ahead(positions, holding_period)
+
+    taken = []
+    busy_until = -1
+    for i, (start, stop) in enumerate(zip(positions, exits)):
+        if start < busy_until:
+            continue
+        taken.append(i)
+        busy_until = stop
+
+    buy_positions = positions[taken].astype(np.int64)
+    sell_positions = exits[taken].astype(np.int64)
+    drags = month_drags(holding_period, drag, roll_months)[
+        close.index.month[buy_positions] - 1
+    ]
+    return buy_positions, sell_positions, np.asarray(drags, dtype=float)
+
+
+def position_exposure(close, buy_signals, holding_period, overlap=False):
+    """1.0 on days a position is held at the close, from each entry day up
+    to the day before its exit (the exposure equity_metrics expects).
+
+    With overlap every signal opens a lot, so any signal's window counts.
+    """
+    if overlap:
+        positions = close.index.get_indexer(pd.DatetimeIndex(sorted(buy_signals)))
+        starts = positions[positions >= 0]
+        stops = trading_calendar(close.index).months_ahead(starts, holding_period)
+    else:
+        starts, stops, _ = select_trades(close, buy_signals, holding_period)
+    changes = np.zeros(len(close) + 1)
+    np.add.at(changes, starts, 1)
+    np.add.at(changes, stops, -1)
+    held = np.cumsum(changes[:-1]) > 0
+    return pd.Series(held.astype(float), index=close.index)
+
+
+def trade_returns(close, buy_signals, holding_period, drag=0.0, roll_months=()):
+    """Net return of every trade taken, after roll drag"""
+    buy_pos, sell_pos, drags = select_trades(
+        close, buy_signals, holding_period, drag, roll_months
+    )
+    close_values = close.to_numpy(dtype=float)
+    return close_values[sell_pos] / close_values[buy_pos] * drags - 1
+
+
+def run_backtest(close, buy_signals, holding_period, drag=0.0, roll_months=()):
+    cash = INITIAL_CASH
+    values = np.full(len(close), cash, dtype=float)
+    close_values = close.to_numpy(dtype=float)
+    buy_pos, sell_pos, drags = select_trades(
+        close, buy_signals, holding_period, drag, roll_months
+    )
+
+    calendar = trading_calendar(close.index)
+    for start, stop in zip(buy_pos, sell_pos):
+        shares = cash / close_values[start]
+        # mark to market: roll costs hit the curve on the roll dates
+        factors = drag_factors(calendar, start, stop, holding_period, drag, roll_months)
+        values[start : stop + 1] = shares * close_values[start : stop + 1] * factors
+        cash = values[stop]
+        values[stop:] = cash
+
+    total_return = (cash - INITIAL_CASH) / INITIAL_CASH
+    years = (close.index[-1] - close.index[0]).days / 365.25
+    annualized_return = (1 + total_return) ** (1 / years) - 1
+    portfolio_value = pd.Series(values, index=close.index)
+    return cash, annualized_return, portfolio_value
+
+
+def backtest_strategy(
+    prices,
+    buy_signals,
+    holding_period,
+    drag=0.0,
+    roll_months=(),
+    verbose=True,
+    cache=None,
+    overlap=False,
+    lot_fraction=LOT_FRACTION,
+    lot_cash=None,
+):
+    """Buy with all cash on each signal, hold for holding_period months, then sell.
+
+    Signals that arrive while a position is open are skipped. With a drag,
+    the position loses (1 - drag) on every roll date it holds through, so
+    the daily curve carries the roll costs. With overlap, every signal opens
+    its own lot instead, sized at lot_fraction of the free cash or at
+    lot_cash (see engine/lots.py). Pass a ResultCache as cache to reuse
+    results for identical inputs.
+    """
+    close = close_prices(prices)
+
+    def compute():
+        if not overlap:
+            return run_backtest(close, buy_signals, holding_period, drag, roll_months)
+        from engine.lots import backtest_lots
+
+        return backtest_lots(
+            close,
+            buy_signals,
+            holding_period,
+            drag,
+            roll_months,
+            lot_fraction,
+            lot_cash,
+        )[:3]
+
+    if cache is None:
+        result = compute()
+    else:
+        parts = [
+            "backtest_strategy",
+            close,
+            signal_dates_key(buy_signals),
+            holding_period,
+            drag,
+            list(roll_months),
+        ]
+        if overlap:
+            parts += ["overlap", lot_fraction, lot_cash]
+        result = cache.get_or_compute(cache_key(*parts), compute)
+
+    cash, annualized_return, portfolio_value = result
+    if verbose:
+        print(f"Final Portfolio Value: ${cash:.2f}")
+        print(f"Annualized Return: {annualized_return * 100:.2f}%")
+    return cash, annualized_return, portfolio_value
+
+
+def optimize_holding_period(
+    prices,
+    buy_signals,
+    min_months=1,
+    max_months=12,
+    drag=0.0,
+    roll_months=(),
+    cache=None,
+):
+    print(f"--- Optimizing Strategy ({min_months}-{max_months} months) ---")
+
+    cash_results = {}
+    return_results = {}
+    best_cash = 0
+    best_month = 0
+
+    for m in range(min_months, max_months + 1):
+        cash, annualized_return, portfolio_value = backtest_strategy(
+            prices, buy_signals, m, drag, roll_months, cache=cache
+        )
+        profit = cash - INITIAL_CASH
+        print(
+            f"Holding: {m} months | Final Cash: ${cash:,.2f} | Profit: ${profit:,.2f}"
+        )
+        cash_results[m] = cash
+        return_results[m] = profit / INITIAL_CASH
+        if cash > best_cash:
+            best_cash = cash
+            best_month = m
+
+    return best_month, best_cash, cash_results, return_results
+
+
+def commodity_costs(spec, roll_costs=True):
+    """(drag, roll_months) for a registry entry, or no costs when roll_costs is off"""
+    if not roll_costs:
+        return 0.0, ()
+    return spec["drag"], spec["roll_months"]
@@ -0,0 +1,189 @@
+"""Bootstrap confidence intervals for backtest returns and drawdowns.
+
+Two resampling units are supported:
+
+- daily: moving-block bootstrap of the equity curves' daily log returns,
+  which keeps short-range autocorrelation inside each block;
+- trades: resampling the per-trade returns with replacement.
+
+Block starts are drawn once per chunk as a (chunk, n_blocks) matrix and
+applied to every series at once, so all commodities sharing a calendar are
+evaluated together. Chunks are sized to stay under max_bytes of memory.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+MAX_BYTES = 256 * 1024 * 1024
+
+
+def block_start_matrix(n, block_length, n_resamples, rng):
+    """(n_resamples, n_blocks) random block starts; the last block may be shorter"""
+    n_blocks = -(-n // block_length)
+    last_length = n - (n_blocks - 1) * block_length
+    starts = rng.integers(0, n - block_length + 1, size=(n_resamples, n_blocks))
+    starts[:, -1] = rng.integers(0, n - last_length + 1, size=n_resamples)
+    return starts, last_length
+
+
+def window_stats(log_returns, length, max_bytes=MAX_BYTES):
+    """Total, highest and lowest level, and internal drawdown of every window.
+
+    log_returns is (n_series, n); each output is (n_series, n - length + 1),
+    indexed by the window's first day, with levels measured from the window
+    start (so highest >= 0 >= lowest). Windows are expanded a chunk of
+    starts at a time to stay under max_bytes.
+    """
+    n_series = log_returns.shape[0]
+    levels = np.concatenate(
+        [np.zeros((n_series, 1)), np.cumsum(log_returns, axis=1)], axis=1
+    )
+    windows = np.lib.stride_tricks.sliding_window_view(levels, length + 1, axis=1)
+    n_windows = windows.shape[1]
+    stats = tuple(np.empty((n_series, n_windows)) for _ in range(4))
+    # relative levels and their running peak per window start
+    step = max(1, int(max_bytes // (8 * 2 * n_series * (length + 1))))
+    for start in range(0, n_windows, step):
+        stop = min(start + step, n_windows)
+        chunk = windows[:, start:stop]
+        relative = chunk - chunk[..., :1]
+        peak = np.maximum.accumulate(relative, axis=-1)
+        stats[0][:, start:stop] = relative[..., -1]
+        stats[1][:, start:stop] = relative.max(axis=-1)
+        stats[2][:, start:stop] = relative.min(axis=-1)
+        stats[3][:, start:stop] = (peak - relative).max(axis=-1)
+    return stats
+
+
+def chunk_size(n_series, n_blocks, max_bytes=MAX_BYTES):
+    # start matrix plus ~8 running (n_series, chunk) arrays per block step
+    bytes_per_resample = 8 * (n_blocks + 8 * n_series)
+    return max(1, int(max_bytes // bytes_per_resample))
+
+
+def resample_paths(
+    log_returns,
+    n_resamples,
+    block_length,
+    periods_per_year,
+    seed=None,
+    max_bytes=MAX_BYTES,
+):
+    """Moving-block bootstrap of (n_series, n) log returns.
+
+    Every possible block is summarised once (total, high, low, internal
+    drawdown), so a resampled path is evaluated block by block instead of
+    day by day. Returns (annualized, max_drawdown), each (n_series, n_resamples).
+    """
+    log_returns = np.atleast_2d(np.asarray(log_returns, dtype=float))
+    n_series, n = log_returns.shape
+    block_length = max(1, min(block_length, n))
+    n_blocks = -(-n // block_length)
+    full_stats = window_stats(log_returns, block_length, max_bytes)
+    rng = np.random.default_rng(seed)
+    annualized = np.empty((n_series, n_resamples))
+    max_drawdown = np.empty((n_series, n_resamples))
+    step = chunk_size(n_series, n_blocks, max_bytes)
+
+    for start in range(0, n_resamples, step):
+        stop = min(start + step, n_resamples)
+        starts, last_length = block_start_matrix(n, block_length, stop - start, rng)
+        last_stats = (
+            full_stats
+            if last_length == block_length
+            else window_stats(log_returns, last_length, max_bytes)
+        )
+        level = np.zeros((n_series, stop - start))
+        peak = np.zeros_like(level)
+        worst = np.zeros_like(level)
+        for j in range(n_blocks):
+            stats = last_stats if j == n_blocks - 1 else full_stats
+            total, high, low, drawdown = (stat[:, starts[:, j]] for stat in stats)
+            worst = np.maximum(worst, np.maximum(drawdown, peak - (level + low)))
+            peak = np.maximum(peak, level + high)
+            level += total
+        annualized[:, start:stop] = np.expm1(level * periods_per_year / n)
+        max_drawdown[:, start:stop] = -np.expm1(-worst)
+    return annualized, max_drawdown
+
+
+def daily_log_returns(portfolio_values):
+    """Daily log returns of one equity curve, or of each column of a frame"""
+    values = np.asarray(portfolio_values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    return np.diff(np.log(values), axis=0).T
+
+
+def summarize(names, annualized, max_drawdown, confidence):
+    tail = (1 - confidence) / 2
+    quantiles = [tail, 0.5, 1 - tail]
+    ann = np.quantile(annualized, quantiles, axis=1)
+    dd = np.quantile(max_drawdown, quantiles, axis=1)
+    return pd.DataFrame(
+        {
+            "annualized_return_low": ann[0],
+            "annualized_return_median": ann[1],
+            "annualized_return_high": ann[2],
+            "max_drawdown_low": dd[0],
+            "max_drawdown_median": dd[1],
+            "max_drawdown_high": dd[2],
+        },
+        index=pd.Index(names, name="series"),
+    )
+
+
+def bootstrap_equity_curves(
+    curves,
+    n_resamples=10000,
+    block_length=21,
+    confidence=0.95,
+    seed=None,
+    max_bytes=MAX_BYTES,
+):
+    """Block-bootstrap CIs for every column of a frame of aligned equity curves"""
+    curves = pd.DataFrame(curves)
+    annualized, max_drawdown = resample_paths(
+        daily_log_returns(curves),
+        n_resamples,
+        block_length,
+        TRADING_DAYS_PER_YEAR,
+        seed,
+        max_bytes,
+    )
+    return summarize(curves.columns, annualized, max_drawdown, confidence)
+
+
+def bootstrap_trades(
+    trade_returns_by_name,
+    years,
+    n_resamples=10000,
+    confidence=0.95,
+    seed=None,
+    max_bytes=MAX_BYTES,
+):
+    """Resample each series' trades with replacement.
+
+    trade_returns_by_name maps a name to its array of per-trade net returns;
+    years is the length of the backtest the trades came from.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(trade_returns_by_name)
+    annualized = np.full((len(names), n_resamples), np.nan)
+    max_drawdown = np.full((len(names), n_resamples), np.nan)
+
+    for i, name in enumerate(names):
+        log_returns = np.log1p(np.asarray(trade_returns_by_name[name], dtype=float))
+        n = len(log_returns)
+        if n == 0:
+            continue
+        step = max(1, int(max_bytes // (8 * 4 * n)))
+        for start in range(0, n_resamples, step):
+            stop = min(start + step, n_resamples)
+            index = rng.integers(0, n, size=(stop - start, n))
+            paths = np.cumsum(log_returns[index], axis=1)
+            peak = np.maximum.accumulate(np.maximum(paths, 0.0), axis=1)
+            annualized[i, start:stop] = np.expm1(paths[:, -1] / years)
+            max_drawdown[i, start:stop] = -np.expm1((paths - peak).min(axis=1))
+    return summarize(names, annualized, max_drawdown, confidence)
@@ -0,0 +1,154 @@
+"""Content-addressed on-disk cache for backtest and A/B test results.
+
+Keys are SHA-256 digests of everything a result depends on (price series,
+signal dates, holding period, drag, roll months, seed, ...). Entries are
+pickles under cache/results; reading an entry refreshes its modification
+time, and the least recently used entries are evicted once the directory
+grows past max_bytes.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from engine.registry import ROOT_DIR
+
+RESULT_CACHE_DIR = os.path.join(ROOT_DIR, "cache", "results")
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+# Bump when a cached computation changes so stale entries are never reused.
+CACHE_VERSION = 2
+# returned by get() on a miss unless another default is given; None is a value
+MISSING = object()
+
+
+def _update(digest, value):
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        digest.update(
+            pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes()
+        )
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode())
+    elif isinstance(value, pd.Index):
+        digest.update(pd.util.hash_pandas_object(value).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(str(value.dtype).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            _update(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(repr(key).encode())
+            _update(digest, value[key])
+    else:
+        if isinstance(value, np.generic):
+            # np.int64(10) and 10 must hash alike; their reprs differ in numpy 2
+            value = value.item()
+        digest.update(repr(value).encode())
+    digest.update(b"|")
+
+
+def cache_key(*parts):
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+def signal_dates_key(buy_signals):
+    """Signal dates as sorted int64 nanoseconds, so list/Index inputs hash the same"""
+    return np.sort(pd.DatetimeIndex(buy_signals).asi8)
+
+
+class ResultCache:
+    def __init__(self, directory=RESULT_CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def get(self, key, default=None):
+        """Cached value, or default on a miss.
+
+        An entry that no longer unpickles (truncated, or written by code that
+        has since moved or changed) is deleted and counts as a miss.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except Exception:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            return default
+        os.utime(path)
+        return value
+
+    def put(self, key, value):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.evict()
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def entries(self):
+        """(mtime, size, path) for every entry, least recently used first"""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".pkl"):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+
+
+default_cache = ResultCache()
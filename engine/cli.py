@@ -0,0 +1,357 @@
+"""Headless batch runs across commodities and holding periods.
+
+Example, from the repository root:
+
+    python -m engine.cli corn coffee --holding-periods 1-12 --jobs 4 --output results
+    python -m engine.cli all --offline --start 2015-01-01 --end 2025-11-24
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from engine.backtest import (
+    LOT_FRACTION,
+    backtest_strategy,
+    commodity_costs,
+    position_exposure,
+)
+from engine.bootstrap import bootstrap_equity_curves
+from engine.cache import default_cache
+from engine.data import close_prices, load_prices, load_weather
+from engine.metrics import equity_metrics
+from engine.registry import (
+    PRICE_END,
+    PRICE_START,
+    SIGNAL_CUTOFF_YEAR,
+    get_commodity,
+    list_commodities,
+)
+from engine.shared import publish_panel
+from engine.signals import get_buy_signals
+from engine.significance import significance_table
+from engine.weather_gen import stress_test
+
+SUMMARY_METRICS = [
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "max_drawdown_days",
+    "calmar",
+    "hit_rate",
+    "exposure",
+    "turnover",
+]
+
+
+def parse_int_list(text):
+    """Parse "6,10" or "1-12" (or a mix like "1-3,6") into a sorted list of ints"""
+    values = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            low, high = part.split("-", 1)
+            values.update(range(int(low), int(high) + 1))
+        else:
+            values.add(int(part))
+    if not values:
+        raise argparse.ArgumentTypeError(f"no values in '{text}'")
+    return sorted(values)
+
+
+def run_commodity(
+    name,
+    holding_periods,
+    start,
+    end,
+    roll_costs,
+    cutoff_year,
+    offline,
+    use_cache=True,
+    lot_fraction=None,
+    panel=None,
+):
+    """Backtest one commodity over every holding period; returns (rows, equity
+    curves, exposures), the last two with one column per holding period
+
+    With a SharedPanel the weather and prices are read from shared memory
+    instead of being loaded (or unpickled) again in this process. A
+    lot_fraction switches to overlapping lots of that share of free cash.
+    """
+    spec = get_commodity(name)
+    drag, roll_months = commodity_costs(spec, roll_costs)
+    cache = default_cache if use_cache else None
+    if panel is not None:
+        df = panel.weather(name)
+        prices = panel.prices(name)
+    else:
+        df = load_weather(name, cache=cache)
+        prices = load_prices(name, start, end, offline=offline)
+    signals = get_buy_signals(df, prices, spec["rules"], cutoff_year)
+
+    rows = []
+    curves = {}
+    exposures = {}
+    close = close_prices(prices)
+    for holding_period in holding_periods:
+        cash, annualized_return, portfolio_value = backtest_strategy(
+            prices,
+            signals,
+            holding_period,
+            drag,
+            roll_months,
+            verbose=False,
+            cache=cache,
+            overlap=lot_fraction is not None,
+            lot_fraction=lot_fraction or LOT_FRACTION,
+        )
+        rows.append(
+            {
+                "commodity": name,
+                "holding_period": holding_period,
+                "signals": len(signals),
+                "final_cash": cash,
+                "annualized_return": annualized_return,
+            }
+        )
+        curves[holding_period] = portfolio_value
+        exposures[holding_period] = position_exposure(
+            close, signals, holding_period, overlap=lot_fraction is not None
+        )
+    return rows, pd.DataFrame(curves), pd.DataFrame(exposures)
+
+
+def run_parallel(names, holding_periods, settings, jobs):
+    """One task per (commodity, holding period), all reading one shared panel"""
+    start, end, _, _, offline, use_cache, _ = settings
+    cache = default_cache if use_cache else None
+    tasks = [(name, [h]) for name in names for h in holding_periods[name]]
+    with publish_panel(names, start, end, offline, cache) as panel:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(run_commodity, name, hs, *settings, panel=panel)
+                for name, hs in tasks
+            ]
+            parts = [future.result() for future in futures]
+    results = []
+    for name in names:
+        mine = [part for (owner, _), part in zip(tasks, parts) if owner == name]
+        rows = [row for commodity_rows, _, _ in mine for row in commodity_rows]
+        curves = pd.concat([curve for _, curve, _ in mine], axis=1)
+        exposures = pd.concat([exposure for _, _, exposure in mine], axis=1)
+        results.append((rows, curves, exposures))
+    return results
+
+
+def save_equity_plot(name, curves, path):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for holding_period in curves.columns:
+        ax.plot(curves.index, curves[holding_period], label=f"{holding_period} months")
+    ax.set_title(
+        f"{get_commodity(name)['label']} Portfolio Value (Initial Cash: $10,000)"
+    )
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Value ($)")
+    ax.grid(True)
+    ax.legend()
+    fig.savefig(path, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.cli",
+        description="Backtest registered commodities without interactive plots.",
+    )
+    parser.add_argument(
+        "commodities",
+        nargs="*",
+        default=["all"],
+        help=f"commodity names or 'all' (registered: {', '.join(list_commodities())})",
+    )
+    parser.add_argument("--start", default=PRICE_START, help="first price date")
+    parser.add_argument("--end", default=PRICE_END, help="last price date (exclusive)")
+    parser.add_argument(
+        "--holding-periods",
+        type=parse_int_list,
+        default=None,
+        help="months to hold, e.g. '6,10' or '1-12' (default: each commodity's own)",
+    )
+    parser.add_argument(
+        "--no-roll-costs",
+        dest="roll_costs",
+        action="store_false",
+        help="ignore the roll drag",
+    )
+    parser.add_argument(
+        "--cutoff-year",
+        type=int,
+        default=SIGNAL_CUTOFF_YEAR,
+        help="drop signals from this year on",
+    )
+    parser.add_argument(
+        "--output", default="results", help="directory for CSV/PNG output"
+    )
+    parser.add_argument(
+        "--plots", action="store_true", help="also save equity curve PNGs"
+    )
+    parser.add_argument(
+        "--overlap",
+        nargs="?",
+        type=float,
+        const=LOT_FRACTION,
+        default=None,
+        metavar="FRACTION",
+        help=f"open a lot per signal with this share of free cash (default {LOT_FRACTION})",
+    )
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes")
+    parser.add_argument(
+        "--offline", action="store_true", help="only use cached prices, never download"
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="recompute results instead of reusing cache/results",
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=0,
+        help="block-bootstrap resamples for return/drawdown intervals (0 = off)",
+    )
+    parser.add_argument(
+        "--block-length", type=int, default=21, help="bootstrap block length in days"
+    )
+    parser.add_argument(
+        "--stress",
+        type=int,
+        default=0,
+        help="synthetic weather scenarios per commodity (0 = off)",
+    )
+    parser.add_argument(
+        "--permutations",
+        type=int,
+        default=0,
+        help="permutation tests per commodity, rule and holding period (0 = off)",
+    )
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    names = list_commodities() if "all" in args.commodities else args.commodities
+    for name in names:
+        get_commodity(name)
+
+    holding_periods = {
+        name: args.holding_periods or [get_commodity(name)["holding_period"]]
+        for name in names
+    }
+    settings = (
+        args.start,
+        args.end,
+        args.roll_costs,
+        args.cutoff_year,
+        args.offline,
+        args.use_cache,
+        args.overlap,
+    )
+    try:
+        if args.jobs > 1:
+            results = run_parallel(names, holding_periods, settings, args.jobs)
+        else:
+            results = [
+                run_commodity(name, holding_periods[name], *settings) for name in names
+            ]
+    except FileNotFoundError as e:
+        raise SystemExit(f"error: {e}")
+
+    os.makedirs(args.output, exist_ok=True)
+    rows = []
+    for name, (commodity_rows, curves, exposures) in zip(names, results):
+        metrics = equity_metrics(curves, exposures)
+        for row in commodity_rows:
+            row.update(metrics.loc[row["holding_period"], SUMMARY_METRICS])
+        rows.extend(commodity_rows)
+        curves.to_csv(os.path.join(args.output, f"{name}_equity.csv"))
+        if args.plots:
+            save_equity_plot(
+                name, curves, os.path.join(args.output, f"{name}_equity.png")
+            )
+
+    summary = pd.DataFrame(rows)
+    summary.to_csv(os.path.join(args.output, "summary.csv"), index=False)
+    print(summary.to_string(index=False))
+
+    if args.stress:
+        stress = pd.concat(
+            [
+                stress_test(
+                    name,
+                    args.stress,
+                    args.holding_periods,
+                    args.roll_costs,
+                    args.seed,
+                    prices=load_prices(name, args.start, args.end, args.offline),
+                )
+                for name in names
+            ],
+            ignore_index=True,
+        )
+        stress.to_csv(os.path.join(args.output, "stress.csv"), index=False)
+        print(
+            stress.groupby(["commodity", "holding_period"])[
+                ["signals", "trades", "annualized_return"]
+            ]
+            .describe(percentiles=[0.05, 0.5, 0.95])
+            .to_string()
+        )
+
+    if args.bootstrap:
+        curves = pd.concat(
+            {
+                f"{name}_{holding_period}": curve[holding_period]
+                for name, (_, curve, _) in zip(names, results)
+                for holding_period in curve.columns
+            },
+            axis=1,
+        )
+        intervals = bootstrap_equity_curves(
+            curves.ffill().bfill(),
+            n_resamples=args.bootstrap,
+            block_length=args.block_length,
+            seed=args.seed,
+        )
+        intervals.to_csv(os.path.join(args.output, "bootstrap.csv"))
+        print(intervals.to_string())
+
+    if args.permutations:
+        significance = significance_table(
+            names,
+            holding_periods,
+            args.permutations,
+            seed=args.seed,
+            roll_costs=args.roll_costs,
+            cutoff_year=args.cutoff_year,
+            start=args.start,
+            end=args.end,
+            offline=args.offline,
+        )
+        significance.to_csv(os.path.join(args.output, "significance.csv"), index=False)
+        print(significance.to_string(index=False))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
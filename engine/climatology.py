@@ -0,0 +1,325 @@
+"""Day-of-year climatology index and anomaly lookups.
+
+For every site and column the index keeps, per day of year, the count, sum
+and sum of squares of observed values plus a histogram of them (N_BINS
+bins over the column's range: BIN_RANGES for the stored weather columns,
+the observed range with some headroom for anything else, such as the
+accumulators). These accumulators are additive, so new days are folded in
+with update() without revisiting history, and the mean, standard deviation
+and percentiles are derived from them over a +/- window-day circular
+window. Values that fall outside a column's range are counted as clipped,
+and percentile rules on that column are refused until the index is rebuilt.
+
+The index is stored next to the weather CSV as <csv name>.climatology.npz.
+Signal rules can then be written relative to what is normal for the site
+and day, e.g.
+
+    {"name": "hot", "column": "Max_Temp_C", "kind": "zscore", "op": ">", "threshold": 2.0}
+    {"name": "cold", "column": "Min_Temp_C", "kind": "percentile", "op": "<", "threshold": 5}
+
+which evaluate as one vectorized subtraction / comparison against the
+index rows for the days in question. Backtests without a stored index use
+point_in_time_values(), which judges every month against the days before
+it only, so no threshold depends on later weather.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine.registry import weather_path
+
+N_DAYS = 366
+N_BINS = 260
+# (low, high) histogram range of the stored weather columns
+BIN_RANGES = {
+    "Max_Temp_C": (-70.0, 60.0),
+    "Min_Temp_C": (-70.0, 60.0),
+    "Humidity_Pct": (0.0, 100.0),
+    "THI": (-40.0, 130.0),
+}
+# extra room on each side of an observed range, as a fraction of its width
+RANGE_HEADROOM = 0.5
+DEFAULT_WINDOW = 7
+# smoothed observations a day needs before it has a mean, std or percentile
+MIN_COUNT = 10
+# Bump when the stored layout changes so old .npz files are rebuilt.
+CLIMATOLOGY_VERSION = 2
+
+
+def day_of_year_index(dates):
+    """0-based day of year on a leap-year calendar, so Feb 29 has its own slot"""
+    dates = pd.DatetimeIndex(dates)
+    day = np.asarray(dates.dayofyear) - 1
+    late_non_leap = ~np.asarray(dates.is_leap_year) & (np.asarray(dates.month) > 2)
+    return day + late_non_leap
+
+
+def column_ranges(df, columns):
+    """{column: (low, high)} covering BIN_RANGES and the values in df"""
+    ranges = {}
+    for column in columns:
+        values = df[column].to_numpy(dtype=float)
+        values = values[np.isfinite(values)]
+        if column in BIN_RANGES:
+            low, high = BIN_RANGES[column]
+            if len(values):
+                low, high = min(low, values.min()), max(high, values.max())
+        elif len(values):
+            low, high = values.min(), values.max()
+            room = RANGE_HEADROOM * max(high - low, 1.0)
+            low, high = low - room, high + room
+        else:
+            low, high = 0.0, 1.0
+        ranges[column] = (float(low), float(high))
+    return ranges
+
+
+class Climatology:
+    def __init__(self, columns, window=DEFAULT_WINDOW, ranges=None):
+        self.columns = list(columns)
+        self.window = window
+        ranges = ranges or {}
+        unknown = [c for c in self.columns if c not in ranges and c not in BIN_RANGES]
+        if unknown:
+            raise ValueError(f"no histogram range for columns {unknown}")
+        bounds = np.array(
+            [ranges.get(c) or BIN_RANGES[c] for c in self.columns], dtype=float
+        ).reshape(-1, 2)
+        n_columns = len(self.columns)
+        self.low = bounds[:, 0]
+        self.width = (bounds[:, 1] - bounds[:, 0]) / N_BINS
+        self.clipped = np.zeros(n_columns, dtype=np.int64)
+        self.count = np.zeros((N_DAYS, n_columns))
+        self.total = np.zeros((N_DAYS, n_columns))
+        self.total_sq = np.zeros((N_DAYS, n_columns))
+        self.hist = np.zeros((N_DAYS, n_columns, N_BINS), dtype=np.uint32)
+        self.last_date = None
+        self._derived = None
+
+    @classmethod
+    def from_frame(cls, df, columns=None, window=DEFAULT_WINDOW):
+        columns = columns or [c for c in df.columns if df[c].dtype.kind == "f"]
+        climatology = cls(columns, window, column_ranges(df, columns))
+        climatology.update(df)
+        return climatology
+
+    def update(self, df):
+        """Fold in days after last_date; returns how many days were added"""
+        if self.last_date is not None:
+            df = df[df.index > self.last_date]
+        if df.empty:
+            return 0
+        day = day_of_year_index(df.index)
+        for j, column in enumerate(self.columns):
+            values = df[column].to_numpy(dtype=float)
+            ok = np.isfinite(values)
+            d, v = day[ok], values[ok]
+            np.add.at(self.count[:, j], d, 1)
+            np.add.at(self.total[:, j], d, v)
+            np.add.at(self.total_sq[:, j], d, v * v)
+            high = self.low[j] + N_BINS * self.width[j]
+            self.clipped[j] += np.count_nonzero((v < self.low[j]) | (v > high))
+            bins = np.floor((v - self.low[j]) / self.width[j]).astype(int)
+            bins = np.clip(bins, 0, N_BINS - 1)
+            np.add.at(self.hist[:, j], (d, bins), 1)
+        self.last_date = df.index.max()
+        self._derived = None
+        return len(df)
+
+    def _smooth(self, values):
+        """Circular sum over +/- window days along the first axis"""
+        if self.window == 0:
+            return values.astype(float)
+        padded = np.concatenate(
+            [values[-self.window :], values, values[: self.window]], axis=0
+        ).astype(float)
+        cumulative = np.concatenate(
+            [np.zeros((1,) + values.shape[1:]), np.cumsum(padded, axis=0)], axis=0
+        )
+        width = 2 * self.window + 1
+        return cumulative[width:] - cumulative[:-width]
+
+    def derived(self):
+        """Smoothed (mean, std, cumulative histogram) tables, rebuilt after updates"""
+        if self._derived is None:
+            count = self._smooth(self.count)
+            total = self._smooth(self.total)
+            total_sq = self._smooth(self.total_sq)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = total / count
+                var = total_sq / count - mean**2
+            std = np.sqrt(np.clip(var, 1e-12, None))
+            cdf = np.cumsum(self._smooth(self.hist), axis=-1)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                cdf = cdf / cdf[..., -1:]
+            enough = count >= MIN_COUNT
+            mean = np.where(enough, mean, np.nan)
+            std = np.where(enough, std, np.nan)
+            cdf = np.where(enough[..., None], cdf, np.nan)
+            self._derived = (mean, std, cdf)
+        return self._derived
+
+    def mean(self):
+        return self.derived()[0]
+
+    def std(self):
+        return self.derived()[1]
+
+    def check_range(self, column):
+        """Refuse percentiles of a column whose values overflowed its histogram"""
+        j = self.columns.index(column)
+        if self.clipped[j]:
+            low, high = self.low[j], self.low[j] + N_BINS * self.width[j]
+            raise ValueError(
+                f"{self.clipped[j]} values of '{column}' fall outside its histogram "
+                f"range [{low:g}, {high:g}]; rebuild the climatology"
+            )
+
+    def percentile(self, q):
+        """(N_DAYS, n_columns) table of the q-th percentile (bin upper edges),
+        NaN on days with no observations"""
+        cdf = self.derived()[2]
+        bins = np.argmax(cdf >= q / 100.0, axis=-1)
+        edges = self.low + (bins + 1) * self.width
+        return np.where(np.isfinite(cdf[..., -1]), edges, np.nan)
+
+    def zscores(self, dates, column, values):
+        j = self.columns.index(column)
+        mean, std, _ = self.derived()
+        day = day_of_year_index(dates)
+        return (np.asarray(values, dtype=float) - mean[day, j]) / std[day, j]
+
+    def percentile_thresholds(self, dates, column, q):
+        self.check_range(column)
+        j = self.columns.index(column)
+        return self.percentile(q)[day_of_year_index(dates), j]
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            version=CLIMATOLOGY_VERSION,
+            columns=np.array(self.columns),
+            window=self.window,
+            low=self.low,
+            width=self.width,
+            clipped=self.clipped,
+            count=self.count,
+            total=self.total,
+            total_sq=self.total_sq,
+            hist=self.hist,
+            last_date=(
+                np.datetime64(self.last_date, "D")
+                if self.last_date is not None
+                else np.datetime64("NaT")
+            ),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if "version" not in data.files or data["version"] != CLIMATOLOGY_VERSION:
+                raise ValueError(f"{path} was written by an older climatology layout")
+            columns = [str(c) for c in data["columns"]]
+            ranges = {
+                c: (low, low + N_BINS * width)
+                for c, low, width in zip(columns, data["low"], data["width"])
+            }
+            climatology = cls(columns, int(data["window"]), ranges)
+            climatology.clipped = data["clipped"]
+            climatology.count = data["count"]
+            climatology.total = data["total"]
+            climatology.total_sq = data["total_sq"]
+            climatology.hist = data["hist"]
+            last_date = data["last_date"][()]
+            climatology.last_date = (
+                None if np.isnat(last_date) else pd.Timestamp(last_date)
+            )
+        return climatology
+
+
+def compare_values(rule, dates, values, climatology):
+    """Values to compare with the rule threshold, and the threshold itself.
+
+    values may carry leading axes (e.g. scenarios); the last axis follows dates.
+    """
+    kind = rule.get("kind", "absolute")
+    values = np.asarray(values, dtype=float)
+    if kind == "absolute":
+        return values, rule["threshold"]
+    j = climatology.columns.index(rule["column"])
+    day = day_of_year_index(dates)
+    if kind == "zscore":
+        mean, std, _ = climatology.derived()
+        return (values - mean[day, j]) / std[day, j], rule["threshold"]
+    if kind == "percentile":
+        climatology.check_range(rule["column"])
+        return values, climatology.percentile(rule["threshold"])[day, j]
+    raise ValueError(f"Unknown rule kind '{kind}'")
+
+
+def point_in_time_values(rule, df, values=None, window=DEFAULT_WINDOW):
+    """compare_values with every month judged against the days of df before it.
+
+    The index starts empty and df's days are folded in a month at a time,
+    so a day's threshold never depends on later weather (df must be sorted
+    by date); days of year with
+    too little history (MIN_COUNT) never fire. values defaults to the rule's
+    column of df and may carry leading axes (e.g. simulated scenarios).
+    """
+    column = rule["column"]
+    if values is None:
+        values = df[column].to_numpy()
+    values = np.asarray(values, dtype=float)
+    climatology = Climatology([column], window, column_ranges(df, [column]))
+    compared = np.full(values.shape, np.nan)
+    threshold = np.full(len(df), np.nan)
+    months = np.asarray(df.index.year * 12 + df.index.month)
+    starts = np.flatnonzero(np.r_[True, months[1:] != months[:-1]])
+    for start, stop in zip(starts, np.r_[starts[1:], len(df)]):
+        month = df.iloc[start:stop]
+        compared[..., start:stop], threshold[start:stop] = compare_values(
+            rule, month.index, values[..., start:stop], climatology
+        )
+        climatology.update(month)
+    return compared, threshold
+
+
+def rule_values(rule, df, climatology=None):
+    """compare_values for a rule's column; without a climatology, anomaly
+    rules are judged point in time"""
+    if climatology is None and needs_climatology([rule]):
+        return point_in_time_values(rule, df)
+    return compare_values(rule, df.index, df[rule["column"]].to_numpy(), climatology)
+
+
+def needs_climatology(rules):
+    return any(rule.get("kind", "absolute") != "absolute" for rule in rules)
+
+
+def climatology_path(name):
+    return os.path.splitext(weather_path(name))[0] + ".climatology.npz"
+
+
+def load_climatology(name, df=None, window=DEFAULT_WINDOW):
+    """Stored index for a commodity's site, built or brought up to date from df"""
+    path = climatology_path(name)
+    climatology = None
+    if os.path.exists(path):
+        try:
+            climatology = Climatology.load(path)
+        except ValueError:
+            pass
+    if climatology is not None:
+        if df is None or not climatology.update(df):
+            return climatology
+    else:
+        if df is None:
+            from engine.data import load_weather
+
+            df = load_weather(name)
+        columns = [c for c in df.columns if df[c].dtype.kind == "f"]
+        climatology = Climatology.from_frame(df, columns, window)
+    climatology.save(path)
+    return climatology
@@ -0,0 +1,158 @@
+"""Compact in-memory forms of weather frames and signal lists.
+
+Holding thousands of sites in today's formats (float64 DataFrames, lists of
+Timestamps) costs far more memory than the data needs. Here:
+
+- dates are int32 day numbers (days since 1970-01-01)
+- weather values are one float32 (n_days, n_columns) matrix; readings with
+  two decimals survive the round trip, but a value within ~1e-6 of a rule
+  threshold may compare differently than in float64
+- a signal set is a sorted, unique int32 array of day numbers, or a packed
+  bitmap (one bit per day from a first day) when sets are dense or need to
+  be combined
+
+Every form converts back to the one the rest of the engine uses.
+`python -m engine.compact --sites 1000` prints a memory benchmark.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+from engine.data import load_weather
+
+DAY_DTYPE = np.int32
+VALUE_DTYPE = np.float32
+
+
+def to_day_numbers(dates):
+    """int32 days since 1970-01-01 of dates (DatetimeIndex, Timestamps, strings)"""
+    days = pd.DatetimeIndex(dates).values.astype("datetime64[D]").view(np.int64)
+    return days.astype(DAY_DTYPE)
+
+
+def from_day_numbers(days):
+    return pd.DatetimeIndex(np.asarray(days, dtype="datetime64[D]"), name="Date")
+
+
+def signal_days(buy_signals):
+    """Sorted unique int32 day numbers of a list of signal dates"""
+    return np.unique(to_day_numbers(list(buy_signals)))
+
+
+def signal_dates(days):
+    """Back to the list of Timestamps that get_buy_signals returns"""
+    return list(from_day_numbers(days))
+
+
+def days_to_bitmap(days, first_day, n_days):
+    """Packed bits, one per day from first_day; days outside are dropped"""
+    offsets = np.asarray(days, dtype=np.int64) - first_day
+    offsets = offsets[(offsets >= 0) & (offsets < n_days)]
+    bits = np.zeros(n_days, dtype=bool)
+    bits[offsets] = True
+    return np.packbits(bits)
+
+
+def bitmap_to_days(bitmap, first_day, n_days):
+    bits = np.unpackbits(bitmap, count=n_days).astype(bool)
+    return (np.flatnonzero(bits) + first_day).astype(DAY_DTYPE)
+
+
+class CompactWeather:
+    def __init__(self, days, columns, values):
+        self.days = np.asarray(days, dtype=DAY_DTYPE)
+        self.columns = list(columns)
+        self.values = np.ascontiguousarray(values, dtype=VALUE_DTYPE)
+
+    @classmethod
+    def from_frame(cls, df):
+        return cls(to_day_numbers(df.index), df.columns, df.to_numpy(dtype=float))
+
+    @classmethod
+    def load(cls, name, accumulators=True):
+        return cls.from_frame(load_weather(name, accumulators))
+
+    def __len__(self):
+        return len(self.days)
+
+    def column(self, name):
+        return self.values[:, self.columns.index(name)]
+
+    def to_frame(self, dtype=np.float64):
+        """The crops_data layout again (float64 unless asked otherwise)"""
+        return pd.DataFrame(
+            self.values.astype(dtype, copy=False),
+            index=from_day_numbers(self.days),
+            columns=self.columns,
+        )
+
+    @property
+    def nbytes(self):
+        return self.days.nbytes + self.values.nbytes
+
+
+def list_nbytes(timestamps):
+    """Size of a list of Timestamps, counting the list and every object"""
+    return sys.getsizeof(timestamps) + sum(sys.getsizeof(t) for t in timestamps)
+
+
+def memory_benchmark(n_sites=1000, years=10, n_columns=2, signals_per_year=12, seed=0):
+    """Bytes per format for n_sites synthetic sites (weather plus signals)"""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2015-01-01", periods=int(years * 365.25), freq="D")
+    n_days = len(dates)
+    values = rng.normal(15, 10, (n_days, n_columns)).round(2)
+    df = pd.DataFrame(
+        values,
+        index=pd.DatetimeIndex(dates, name="Date"),
+        columns=[f"column_{j}" for j in range(n_columns)],
+    )
+    signals = sorted(rng.choice(dates, int(signals_per_year * years), replace=False))
+    signals = [pd.Timestamp(date) for date in signals]
+    compact = CompactWeather.from_frame(df)
+    days = signal_days(signals)
+    bitmap = days_to_bitmap(days, int(compact.days[0]), n_days)
+
+    per_site = pd.DataFrame(
+        {
+            "format": [
+                "weather DataFrame (float64)",
+                "CompactWeather (float32, int32 days)",
+                "signals list of Timestamps",
+                "signals int32 days",
+                "signals bitmap",
+            ],
+            "bytes_per_site": [
+                df.memory_usage(deep=True, index=True).sum(),
+                compact.nbytes,
+                list_nbytes(signals),
+                days.nbytes,
+                bitmap.nbytes,
+            ],
+        }
+    )
+    per_site["total_mb"] = per_site["bytes_per_site"] * n_sites / 2**20
+    return per_site
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.compact",
+        description="Compare memory of today's and the compact weather/signal formats.",
+    )
+    parser.add_argument("--sites", type=int, default=1000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--columns", type=int, default=2)
+    parser.add_argument("--signals-per-year", type=int, default=12)
+    args = parser.parse_args(argv)
+    table = memory_benchmark(
+        args.sites, args.years, args.columns, args.signals_per_year
+    )
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""Rolling covariance and correlation of daily returns across commodities.
+
+CovarianceCache keeps prefix sums of the pairwise statistics of daily
+returns for every day of a price matrix:
+
+- count of days both commodities have a return
+- sum of i's returns, and of their squares, over those days
+- sum of the products of i's and j's returns
+
+so the covariance or correlation matrix over any window ending on any day
+is a difference of two prefix rows (O(n_commodities^2)), and update()
+appends a new day of prices with the same amount of work. Missing prices
+are handled pairwise, like DataFrame.cov(). Caches are shared per price
+matrix through covariance_cache(), and feed the "min_variance" sizing
+policy and pair_report(), which ranks every pair of registered commodities
+by how much they move together.
+
+    python -m engine.covariance --window 252
+"""
+
+import argparse
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from engine.bootstrap import TRADING_DAYS_PER_YEAR
+from engine.sizing import daily_returns
+
+MAX_CACHES = 16
+MIN_PERIODS = 20
+STATISTICS = ("count", "sum", "sum_squares", "sum_products")
+_CACHES = {}
+
+
+class CovarianceCache:
+    def __init__(self, names, capacity=256):
+        self.names = list(names)
+        n = len(self.names)
+        self.dates = []
+        self.last_prices = None
+        # prefix[k] holds the sums over the first k days
+        self._prefix = np.zeros((max(capacity, 1) + 1, len(STATISTICS), n, n))
+        self._length = 0
+
+    @classmethod
+    def from_values(cls, values, names=None, dates=None):
+        """Cache over a (n_dates, n_commodities) price matrix, built in one pass"""
+        values = np.asarray(values, dtype=float)
+        n_dates, n = values.shape
+        cache = cls(names if names is not None else range(n), capacity=n_dates)
+        daily = np.stack(cls.day_statistics(daily_returns(values)), axis=1)
+        cache._prefix[1 : n_dates + 1] = np.cumsum(daily, axis=0)
+        cache._length = n_dates
+        cache.dates = list(dates) if dates is not None else list(range(n_dates))
+        cache.last_prices = values[-1].copy() if n_dates else None
+        return cache
+
+    @classmethod
+    def from_panel(cls, panel):
+        return cls.from_values(panel.values, panel.names, panel.dates)
+
+    @staticmethod
+    def day_statistics(returns):
+        """Per-day (count, sum, sum_squares, sum_products) matrices of returns"""
+        valid = ~np.isnan(returns)
+        r = np.where(valid, returns, 0.0)
+        v = valid.astype(float)
+        return (
+            v[..., :, None] * v[..., None, :],
+            r[..., :, None] * v[..., None, :],
+            (r * r)[..., :, None] * v[..., None, :],
+            r[..., :, None] * r[..., None, :],
+        )
+
+    def __len__(self):
+        return self._length
+
+    def update(self, prices, date=None):
+        """Append one day of prices (one per commodity, NaN when missing).
+
+        Returns are measured against the previous day only, as in
+        engine.sizing.daily_returns, so the day after a gap has none.
+        """
+        prices = np.asarray(prices, dtype=float)
+        if self.last_prices is None:
+            returns = np.full(len(self.names), np.nan)
+        else:
+            returns = prices / self.last_prices - 1
+        self.last_prices = prices.copy()
+        if self._length + 1 >= len(self._prefix):
+            grown = np.zeros((2 * len(self._prefix),) + self._prefix.shape[1:])
+            grown[: len(self._prefix)] = self._prefix
+            self._prefix = grown
+        day = np.stack(self.day_statistics(returns))
+        self._prefix[self._length + 1] = self._prefix[self._length] + day
+        self._length += 1
+        self.dates.append(date if date is not None else self._length - 1)
+
+    def position(self, end):
+        """Day position of end (a date, a position, or None for the last day)"""
+        if end is None:
+            return self._length - 1
+        if isinstance(end, (int, np.integer)):
+            return int(end) if end >= 0 else self._length + int(end)
+        return self.dates.index(pd.Timestamp(end))
+
+    def window_sums(self, window, ends):
+        """(len(ends), 4, n, n) sums over the window days ending at each position"""
+        ends = np.asarray(ends, dtype=np.intp) + 1
+        starts = np.clip(ends - window, 0, None)
+        return self._prefix[ends] - self._prefix[starts]
+
+    def moments(self, window, ends, min_periods=MIN_PERIODS):
+        """(covariance, variance of i over the days shared with j) per end"""
+        count, total, squares, products = np.moveaxis(
+            self.window_sums(window, ends), 1, 0
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            covariance = (products - total * np.swapaxes(total, -1, -2) / count) / (
+                count - 1
+            )
+            variance = (squares - total**2 / count) / (count - 1)
+        enough = count >= max(min_periods, 2)
+        return np.where(enough, covariance, np.nan), np.where(enough, variance, np.nan)
+
+    def covariances(self, window, ends=None, min_periods=MIN_PERIODS, annualize=False):
+        """(len(ends), n, n) covariance matrices (default: every day)"""
+        ends = np.arange(self._length) if ends is None else ends
+        covariance, _ = self.moments(window, ends, min_periods)
+        return covariance * TRADING_DAYS_PER_YEAR if annualize else covariance
+
+    def correlations(self, window, ends=None, min_periods=MIN_PERIODS):
+        ends = np.arange(self._length) if ends is None else ends
+        covariance, variance = self.moments(window, ends, min_periods)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return covariance / np.sqrt(variance * np.swapaxes(variance, -1, -2))
+
+    def covariance(self, window, end=None, min_periods=MIN_PERIODS, annualize=False):
+        """Covariance DataFrame over the window days ending at end"""
+        matrix = self.covariances(window, [self.position(end)], min_periods, annualize)[
+            0
+        ]
+        return pd.DataFrame(matrix, index=self.names, columns=self.names)
+
+    def correlation(self, window, end=None, min_periods=MIN_PERIODS):
+        matrix = self.correlations(window, [self.position(end)], min_periods)[0]
+        return pd.DataFrame(matrix, index=self.names, columns=self.names)
+
+
+def covariance_cache(values, names=None, dates=None):
+    """Shared CovarianceCache for a price matrix, reused across calls with the
+    same names and dates (a cache built without them is labelled 0, 1, ...)"""
+    values = np.ascontiguousarray(values, dtype=float)
+    key = (
+        values.shape,
+        hash(values.tobytes()),
+        None if names is None else tuple(names),
+        (
+            None
+            if dates is None
+            else hash(pd.util.hash_array(np.asarray(dates)).tobytes())
+        ),
+    )
+    cache = _CACHES.get(key)
+    if cache is None:
+        if len(_CACHES) >= MAX_CACHES:
+            _CACHES.pop(next(iter(_CACHES)))
+        cache = _CACHES[key] = CovarianceCache.from_values(values, names, dates)
+    return cache
+
+
+def pair_report(panel, buy_signals=None, window=252, holding_periods=None):
+    """One row per pair of the panel's commodities, least correlated first.
+
+    Correlation over the whole history and over rolling windows (mean, max
+    and the latest); with buy_signals, also the pair portfolio's metrics.
+    """
+    from engine.metrics import equity_metrics
+    from engine.portfolio import portfolio_backtest
+
+    cache = covariance_cache(panel.values, panel.names, panel.dates)
+    full = cache.correlation(len(cache))
+    rolling = cache.correlations(window)
+    rows = []
+    for a, b in combinations(range(len(panel.names)), 2):
+        series = rolling[:, a, b]
+        row = {
+            "pair": f"{panel.names[a]}+{panel.names[b]}",
+            "correlation": full.iat[a, b],
+            "rolling_mean": np.nanmean(series) if np.isfinite(series).any() else np.nan,
+            "rolling_max": np.nanmax(series) if np.isfinite(series).any() else np.nan,
+            "rolling_latest": series[-1],
+        }
+        if buy_signals is not None:
+            names = [panel.names[a], panel.names[b]]
+            values = portfolio_backtest(
+                panel.select(names), buy_signals, holding_periods
+            )[2]
+            metrics = equity_metrics(values[["portfolio"]]).iloc[0]
+            for column in ("annualized_return", "sharpe", "max_drawdown"):
+                row[column] = metrics[column]
+        rows.append(row)
+    return pd.DataFrame(rows).sort_values("rolling_mean", ignore_index=True)
+
+
+def main(argv=None):
+    from engine.data import load_prices, load_weather
+    from engine.panel import load_panel
+    from engine.registry import get_commodity, list_commodities
+    from engine.signals import get_buy_signals
+
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.covariance",
+        description="Rank pairs of registered commodities by return correlation.",
+    )
+    parser.add_argument("commodities", nargs="*", default=["all"])
+    parser.add_argument(
+        "--window", type=int, default=252, help="rolling window in days"
+    )
+    parser.add_argument("--offline", action="store_true")
+    args = parser.parse_args(argv)
+    names = list_commodities() if "all" in args.commodities else args.commodities
+
+    panel = load_panel(names, offline=args.offline)
+    buy_signals = {
+        name: get_buy_signals(
+            load_weather(name),
+            load_prices(name, offline=args.offline),
+            get_commodity(name)["rules"],
+        )
+        for name in names
+    }
+    report = pair_report(panel, buy_signals, args.window)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Loading weather and price data for registered commodities.
+
+Downloaded prices are kept under cache/prices so later runs (and --offline
+runs of the CLI) can reuse them without touching the network.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine.registry import (
+    PRICE_END,
+    PRICE_START,
+    ROOT_DIR,
+    get_commodity,
+    weather_path,
+)
+
+PRICE_CACHE_DIR = os.path.join(ROOT_DIR, "cache", "prices")
+
+
+def load_weather(name, accumulators=True, cache=None):
+    """Stored weather plus the commodity's accumulator columns (GDD, KDD, THI...);
+    pass a ResultCache to reuse the accumulator columns across runs"""
+    df = pd.read_csv(weather_path(name), index_col="Date", parse_dates=True)
+    if accumulators:
+        from engine.accumulators import add_accumulators
+
+        specs = get_commodity(name).get("accumulators", [])
+        df = add_accumulators(df, specs, cache)
+    return df
+
+
+def download_prices(ticker, start=PRICE_START, end=PRICE_END):
+    import yfinance as yf
+
+    prices = yf.download(ticker, start=start, end=end, auto_adjust=True)
+    if isinstance(prices.columns, pd.MultiIndex):
+        prices.columns = prices.columns.droplevel(1)
+    return prices
+
+
+def download_many(tickers, start=PRICE_START, end=PRICE_END):
+    """One bulk request for several tickers; returns {ticker: OHLC frame}"""
+    import yfinance as yf
+
+    prices = yf.download(
+        list(tickers), start=start, end=end, auto_adjust=True, group_by="ticker"
+    )
+    if not isinstance(prices.columns, pd.MultiIndex):
+        return {tickers[0]: prices}
+    return {
+        ticker: prices[ticker].dropna(how="all")
+        for ticker in tickers
+        if ticker in prices.columns.get_level_values(0)
+    }
+
+
+def price_cache_path(ticker, start, end):
+    filename = f"{ticker.replace('=', '_')}_{start}_{end}.csv"
+    return os.path.join(PRICE_CACHE_DIR, filename)
+
+
+def load_prices(name, start=PRICE_START, end=PRICE_END, offline=False):
+    ticker = get_commodity(name)["ticker"]
+    path = price_cache_path(ticker, start, end)
+    if os.path.exists(path):
+        return pd.read_csv(path, index_col="Date", parse_dates=True)
+    if offline:
+        raise FileNotFoundError(
+            f"No cached prices for {ticker} ({start} to {end}) at {path}"
+        )
+
+    prices = download_prices(ticker, start, end)
+    if not prices.empty:
+        os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+        prices.index.name = "Date"
+        prices.to_csv(path)
+    return prices
+
+
+def load_prices_many(names, start=PRICE_START, end=PRICE_END, offline=False):
+    """{name: prices} from the cache, downloading all missing tickers in one call"""
+    prices = {}
+    missing = []
+    for name in names:
+        ticker = get_commodity(name)["ticker"]
+        path = price_cache_path(ticker, start, end)
+        if os.path.exists(path):
+            prices[name] = pd.read_csv(path, index_col="Date", parse_dates=True)
+        elif offline:
+            raise FileNotFoundError(
+                f"No cached prices for {ticker} ({start} to {end}) at {path}"
+            )
+        else:
+            missing.append(name)
+
+    if missing:
+        tickers = [get_commodity(name)["ticker"] for name in missing]
+        downloaded = download_many(tickers, start, end)
+        for name, ticker in zip(missing, tickers):
+            frame = downloaded.get(ticker, pd.DataFrame())
+            if not frame.empty:
+                os.makedirs(PRICE_CACHE_DIR, exist_ok=True)
+                frame.index.name = "Date"
+                frame.to_csv(price_cache_path(ticker, start, end))
+            prices[name] = frame
+    return {name: prices[name] for name in names}
+
+
+def close_prices(prices):
+    """Return the close series whether given the OHLC frame or the series itself"""
+    if isinstance(prices, pd.DataFrame):
+        if "Close" in prices.columns:
+            return prices["Close"]
+        return prices.iloc[:, 0]
+    return prices
+
+
+# POWER_URL in the environment points the fetchers elsewhere, e.g. at the
+# local stand-in from engine/power_server.py
+POWER_URL = os.environ.get(
+    "POWER_URL", "https://power.larc.nasa.gov/api/temporal/daily/point"
+)
+
+# NASA POWER parameter -> column name used in crops_data/*.csv
+POWER_COLUMNS = {
+    "T2M_MAX": "Max_Temp_C",
+    "T2M_MIN": "Min_Temp_C",
+    "RH2M": "Humidity_Pct",
+}
+
+
+def power_params(lat, lon, parameters, start, end):
+    return {
+        "parameters": ",".join(parameters),
+        "community": "AG",
+        "longitude": lon,
+        "latitude": lat,
+        "start": start.strftime("%Y%m%d"),
+        "end": end.strftime("%Y%m%d"),
+        "format": "JSON",
+    }
+
+
+def power_arrays(data, parameters):
+    """Dates (datetime64[D]) and one float64 array per parameter from a POWER response"""
+    properties = data["properties"]["parameter"]
+    keys = list(properties[parameters[0]])
+    dates = pd.to_datetime(keys, format="%Y%m%d").to_numpy(dtype="datetime64[D]")
+    columns = {
+        p: np.fromiter(
+            (properties[p].get(k, np.nan) for k in keys), dtype=float, count=len(keys)
+        )
+        for p in parameters
+    }
+    return dates, columns
+
+
+def frame_from_arrays(dates, columns):
+    """Build the crops_data column layout (plus THI when humidity is present)"""
+    df = pd.DataFrame(
+        {POWER_COLUMNS.get(p, p): values for p, values in columns.items()},
+        index=pd.DatetimeIndex(dates, name="Date"),
+    )
+    df = df[df["Max_Temp_C"] > -100]
+    if "Humidity_Pct" in df.columns:
+        df["THI"] = thi(df["Max_Temp_C"], df["Humidity_Pct"])
+    return df
+
+
+def thi(max_temp, humidity):
+    """Temperature-humidity index from °C and relative humidity in %"""
+    return (0.8 * max_temp) + ((humidity / 100) * (max_temp - 14.4)) + 46.4
+
+
+def power_to_frame(data, parameters):
+    """Turn a POWER daily point response into the crops_data column layout"""
+    return frame_from_arrays(*power_arrays(data, parameters))
@@ -0,0 +1,126 @@
+"""Run-length detection of sustained extremes (heatwaves, cold snaps).
+
+A rule becomes a run rule by adding any of
+
+    "min_run": 3            # exceeding days needed before the rule fires
+    "max_gap": 1            # non-exceeding days allowed inside one event
+    "min_degree_days": 5.0  # cumulative exceedance past the threshold
+
+e.g. {"name": "hot", "column": "Max_Temp_C", "op": ">", "threshold": 34,
+"months": [7, 8], "min_run": 3, "max_gap": 1}. Days are grouped into events
+with diff/cumsum over the exceeding days only. An event's days count from the
+one where both requirements are met, so a signal never looks ahead. A rule
+without these keys behaves exactly like the single-day rule.
+"""
+
+import numpy as np
+import pandas as pd
+
+RUN_KEYS = ("min_run", "max_gap", "min_degree_days")
+
+
+def is_run_rule(rule):
+    return any(key in rule for key in RUN_KEYS)
+
+
+def day_numbers(dates):
+    return np.asarray(
+        pd.DatetimeIndex(dates).values.astype("datetime64[D]"), dtype=np.int64
+    )
+
+
+def exceedance(values, threshold, op):
+    """How far past the threshold each value is, in the rule's units"""
+    if op in (">", ">="):
+        return values - threshold
+    return threshold - values
+
+
+def label_runs(mask, days, max_gap=0):
+    """Event id of every exceeding day, one flat array per (row, day) position.
+
+    mask is (..., n_days); rows (e.g. scenarios) never share an event. Returns
+    (rows, cols, event_ids, starts) where starts are the flat positions at
+    which each event begins.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    flat = mask.reshape(-1, mask.shape[-1])
+    rows, cols = np.nonzero(flat)
+    day = days[cols]
+    new_event = np.ones(len(cols), dtype=bool)
+    new_event[1:] = (rows[1:] != rows[:-1]) | (np.diff(day) - 1 > max_gap)
+    event_ids = np.cumsum(new_event) - 1
+    starts = np.flatnonzero(new_event)
+    return rows, cols, event_ids, starts
+
+
+def run_mask(mask, dates, excess, min_run=1, max_gap=0, min_degree_days=0.0):
+    """Keep the exceeding days of events from the day they qualify on"""
+    mask = np.asarray(mask, dtype=bool)
+    rows, cols, event_ids, starts = label_runs(mask, day_numbers(dates), max_gap)
+    if len(cols) == 0:
+        return mask
+    run_length = np.arange(len(cols)) - starts[event_ids] + 1
+    excess = np.asarray(excess, dtype=float).reshape(-1, mask.shape[-1])[rows, cols]
+    total = np.cumsum(excess)
+    before = np.r_[0.0, total][starts]
+    degree_days = total - before[event_ids]
+    keep = (run_length >= min_run) & (degree_days >= min_degree_days - 1e-9)
+    out = np.zeros(mask.shape, dtype=bool)
+    out.reshape(-1, mask.shape[-1])[rows[keep], cols[keep]] = True
+    return out
+
+
+def apply_runs(rule, mask, dates, values, threshold):
+    if not is_run_rule(rule):
+        return mask
+    return run_mask(
+        mask,
+        dates,
+        exceedance(values, threshold, rule["op"]),
+        rule.get("min_run", 1),
+        rule.get("max_gap", 0),
+        rule.get("min_degree_days", 0.0),
+    )
+
+
+def list_events(mask, dates, excess, max_gap=0):
+    """One row per event of a 1-D mask: start, end, days, degree_days"""
+    dates = pd.DatetimeIndex(dates)
+    rows, cols, event_ids, starts = label_runs(mask, day_numbers(dates), max_gap)
+    excess = np.asarray(excess, dtype=float)[cols]
+    ends = np.r_[starts[1:], len(cols)] - 1
+    return pd.DataFrame(
+        {
+            "start": dates[cols[starts]],
+            "end": dates[cols[ends]],
+            "days": np.bincount(event_ids, minlength=len(starts)),
+            "degree_days": np.bincount(event_ids, excess, minlength=len(starts)),
+        }
+    )
+
+
+class RunState:
+    """Streaming counterpart of run_mask for one rule, O(1) per day"""
+
+    def __init__(self, rule):
+        self.min_run = rule.get("min_run", 1)
+        self.max_gap = rule.get("max_gap", 0)
+        self.min_degree_days = rule.get("min_degree_days", 0.0)
+        self.last_day = None
+        self.length = 0
+        self.degree_days = 0.0
+
+    def update(self, date, excess):
+        """Record an exceeding day; True once its event has qualified"""
+        day = day_numbers([date])[0]
+        if self.last_day is None or day - self.last_day - 1 > self.max_gap:
+            self.length = 0
+            self.degree_days = 0.0
+        self.last_day = day
+        self.length += 1
+        self.degree_days += excess
+        return (
+            self.length >= self.min_run
+            and self.degree_days >= self.min_degree_days - 1e-9
+        )
@@ -0,0 +1,237 @@
+"""Asynchronous NASA POWER downloads for many sites at once.
+
+All requests share one aiohttp session (and so one connection pool),
+limited to `concurrency` requests in flight, so fetching a multi-site,
+multi-parameter universe overlaps network latency instead of serialising
+it. Each response body is read in chunks into one buffer and decoded with
+json.loads once it is complete; the parameter series are then copied into
+NumPy arrays (power_arrays). The parse is buffered, not streaming, so a
+response is held in memory in full while it is decoded.
+
+From a script or the CLI:
+
+    frames = fetch_weather_all(["corn", "coffee"], start, end)
+
+From a notebook (which already runs an event loop):
+
+    frames = await fetch_weather_many(["corn", "coffee"], start, end)
+
+or run as `python -m engine.fetch all --years 10` to refresh crops_data.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from engine.data import POWER_URL, frame_from_arrays, power_arrays, power_params
+from engine.registry import get_commodity, list_commodities, weather_path
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class PowerFetchError(Exception):
+    pass
+
+
+def split_parameters(parameters, per_request):
+    if not per_request:
+        return [list(parameters)]
+    return [
+        list(parameters[i : i + per_request])
+        for i in range(0, len(parameters), per_request)
+    ]
+
+
+async def read_json(response, chunk_size=1 << 16):
+    """Whole response body, read chunk by chunk, then decoded in one go"""
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(chunk_size):
+        body.extend(chunk)
+    return json.loads(body)
+
+
+async def fetch_power_arrays(
+    session,
+    lat,
+    lon,
+    parameters,
+    start,
+    end,
+    url=POWER_URL,
+    retries=3,
+    backoff=1.0,
+):
+    """One POWER request with retries; returns (dates, {parameter: array})"""
+    import aiohttp
+
+    params = power_params(lat, lon, parameters, start, end)
+    for attempt in range(retries + 1):
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status in RETRY_STATUSES and attempt < retries:
+                    retry_after = response.headers.get("Retry-After")
+                    delay = float(retry_after) if retry_after else backoff * 2**attempt
+                    await asyncio.sleep(delay)
+                    continue
+                response.raise_for_status()
+                data = await read_json(response)
+            return power_arrays(data, parameters)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                raise PowerFetchError(f"POWER request failed for ({lat}, {lon}): {e}")
+            await asyncio.sleep(backoff * 2**attempt)
+        except KeyError as e:
+            raise PowerFetchError(f"Unexpected POWER response for ({lat}, {lon}): {e}")
+    raise PowerFetchError(f"POWER request failed for ({lat}, {lon}) after retries")
+
+
+async def fetch_sites(
+    sites,
+    start,
+    end,
+    concurrency=8,
+    parameters_per_request=None,
+    url=POWER_URL,
+    retries=3,
+    backoff=1.0,
+    timeout=60,
+):
+    """Fetch {key: (lat, lon, parameters)} concurrently; returns {key: DataFrame}
+
+    A site whose request fails maps to None, like the old get_*_data fetchers.
+    """
+    import aiohttp
+
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=client_timeout
+    ) as session:
+
+        async def one(lat, lon, parameters):
+            async with semaphore:
+                return await fetch_power_arrays(
+                    session, lat, lon, parameters, start, end, url, retries, backoff
+                )
+
+        jobs = []
+        for key, (lat, lon, parameters) in sites.items():
+            for chunk in split_parameters(parameters, parameters_per_request):
+                jobs.append((key, one(lat, lon, chunk)))
+        results = await asyncio.gather(
+            *(job for _, job in jobs), return_exceptions=True
+        )
+
+    merged = {key: None for key in sites}
+    failed = set()
+    for (key, _), result in zip(jobs, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching data for {key}: {result}")
+            failed.add(key)
+            continue
+        dates, columns = result
+        if merged[key] is None:
+            merged[key] = (dates, columns)
+        else:
+            merged_dates, merged_columns = merged[key]
+            if not np.array_equal(merged_dates, dates):
+                raise PowerFetchError(
+                    f"Parameter chunks for {key} cover different days"
+                )
+            merged_columns.update(columns)
+
+    frames = {}
+    for key, arrays in merged.items():
+        frames[key] = (
+            None if key in failed or arrays is None else frame_from_arrays(*arrays)
+        )
+    return frames
+
+
+def commodity_sites(names):
+    sites = {}
+    for name in names:
+        weather = get_commodity(name)["weather"]
+        if weather["lat"] is None:
+            print(f"Skipping {name}: no site coordinates registered")
+            continue
+        sites[name] = (weather["lat"], weather["lon"], weather["parameters"])
+    return sites
+
+
+async def fetch_weather_many(names, start, end, **kwargs):
+    return await fetch_sites(commodity_sites(names), start, end, **kwargs)
+
+
+def run_coroutine(coroutine):
+    """asyncio.run, or a helper thread when an event loop is already running"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+
+    result = {}
+
+    def target():
+        try:
+            result["value"] = asyncio.run(coroutine)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+
+def fetch_weather_all(names, start, end, **kwargs):
+    return run_coroutine(fetch_weather_many(names, start, end, **kwargs))
+
+
+def fetch_power_sync(lat, lon, parameters, start, end, **kwargs):
+    frames = run_coroutine(
+        fetch_sites({"site": (lat, lon, parameters)}, start, end, **kwargs)
+    )
+    return frames["site"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.fetch",
+        description="Download daily NASA POWER weather for registered commodities.",
+    )
+    parser.add_argument("commodities", nargs="*", default=["all"])
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", help="directory for CSVs (default: registry paths)")
+    parser.add_argument("--url", default=POWER_URL, help="POWER daily point endpoint")
+    args = parser.parse_args(argv)
+
+    names = list_commodities() if "all" in args.commodities else args.commodities
+    end = datetime.now()
+    start = end - timedelta(days=args.years * 365)
+    frames = fetch_weather_all(
+        names, start, end, concurrency=args.concurrency, url=args.url
+    )
+    for name, df in frames.items():
+        if df is None:
+            continue
+        path = weather_path(name)
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            path = os.path.join(args.output, os.path.basename(path))
+        df.to_csv(path)
+        print(f"Saved {len(df)} days for {name} to {path}")
+
+
+if __name__ == "__main__":
+    main()
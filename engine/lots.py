@@ -0,0 +1,226 @@
+"""Overlapping-position (multi-lot) backtests.
+
+The one-position backtests skip every signal that arrives while a trade is
+open. Here each signal opens its own lot, sized by an allocation rule:
+
+- fraction: the lot gets that share of the cash free at its entry
+- lot_cash: the lot gets a fixed amount (or whatever cash is left)
+
+Lots live in one structured array (column, entry, exit, shares). Sizing
+walks them once in entry order with a heap of pending exits; the equity
+curve is then built with scatter-adds of cash and share changes at entry,
+roll and exit positions followed by one cumulative sum, so its cost grows
+with days + lots rather than days x lots. Roll drag is charged on the roll
+dates as in the one-position curves.
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import (
+    INITIAL_CASH,
+    LOT_FRACTION,
+    commodity_costs,
+    month_drags,
+    roll_offsets,
+)
+from engine.data import close_prices
+from engine.portfolio import signal_order
+from engine.registry import get_commodity
+from engine.trading_calendar import trading_calendar
+
+LOT_DTYPE = np.dtype(
+    [("column", np.int32), ("entry", np.int64), ("exit", np.int64), ("shares", float)]
+)
+
+
+def size_lots(prices, lots, growth, fraction=LOT_FRACTION, lot_cash=None):
+    """Fill lots["shares"] in entry order; lots that get no cash keep 0 shares"""
+    cash = float(INITIAL_CASH)
+    pending = []  # (exit, proceeds) of open lots
+    for k in np.argsort(lots["entry"], kind="stable"):
+        column, entry, exit = lots["column"][k], lots["entry"][k], lots["exit"][k]
+        while pending and pending[0][0] <= entry:
+            cash += heapq.heappop(pending)[1]
+        price = prices[entry, column]
+        allocation = min(cash, lot_cash) if lot_cash is not None else cash * fraction
+        if allocation <= 0 or np.isnan(price):
+            continue
+        cash -= allocation
+        lots["shares"][k] = allocation / price
+        heapq.heappush(pending, (exit, allocation * growth[k]))
+    return lots
+
+
+def roll_events(calendar, lots, holding_periods, costs):
+    """(lot, position, factor before the roll) for every roll date of every lot"""
+    lot_ids, positions, before = [], [], []
+    months = calendar.index.month.to_numpy()[lots["entry"]]
+    for column, holding_period in enumerate(holding_periods):
+        drag, roll_months = costs[column]
+        if not drag or not len(roll_months):
+            continue
+        for month in range(1, 13):
+            chosen = np.flatnonzero((lots["column"] == column) & (months == month))
+            if not len(chosen):
+                continue
+            offsets = roll_offsets(month, holding_period, roll_months)
+            for n_rolled, k in enumerate(offsets):
+                lot_ids.append(chosen)
+                positions.append(calendar.month_table(int(k))[lots["entry"][chosen]])
+                before.append(np.full(len(chosen), (1 - drag) ** n_rolled))
+    if not lot_ids:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([])
+    return np.concatenate(lot_ids), np.concatenate(positions), np.concatenate(before)
+
+
+def lots_equity(prices, calendar, lots, holding_periods, costs):
+    """(cash, held shares) per day from scatter-adds over all lots"""
+    n_dates, n_columns = prices.shape
+    rows = lots["entry"]
+    exits = lots["exit"]
+    columns = lots["column"]
+    shares = lots["shares"]
+    drags = np.array([drag for drag, _ in costs])
+
+    final_factor = np.ones(len(lots))
+    share_delta = np.zeros((n_dates, n_columns))
+    lot_ids, roll_positions, before = roll_events(
+        calendar, lots, holding_periods, costs
+    )
+    if len(lot_ids):
+        drag = drags[columns[lot_ids]]
+        np.add.at(
+            share_delta,
+            (roll_positions, columns[lot_ids]),
+            -shares[lot_ids] * before * drag,
+        )
+        np.multiply.at(final_factor, lot_ids, 1 - drag)
+
+    cash_delta = np.zeros(n_dates)
+    np.add.at(cash_delta, rows, -shares * prices[rows, columns])
+    np.add.at(cash_delta, exits, shares * final_factor * prices[exits, columns])
+    np.add.at(share_delta, (rows, columns), shares)
+    np.add.at(share_delta, (exits, columns), -shares * final_factor)
+    cash = INITIAL_CASH + np.cumsum(cash_delta)
+    held = np.cumsum(share_delta, axis=0)
+    # exited lots leave rounding dust, not positions
+    held[np.abs(held) < 1e-9] = 0.0
+    return cash, held
+
+
+def run_lots(
+    prices,
+    calendar,
+    positions,
+    columns,
+    holding_periods,
+    costs,
+    fraction=LOT_FRACTION,
+    lot_cash=None,
+):
+    """Open a lot per signal and return (lots, cash, held shares)"""
+    lots = np.zeros(len(positions), dtype=LOT_DTYPE)
+    lots["entry"] = positions
+    lots["column"] = columns
+    periods = np.asarray(holding_periods)
+    for column, holding_period in enumerate(holding_periods):
+        chosen = columns == column
+        lots["exit"][chosen] = calendar.months_ahead(positions[chosen], holding_period)
+    entry_months = calendar.index.month.to_numpy()[positions] - 1
+    drag_tables = np.array(
+        [
+            month_drags(periods[column], *costs[column])
+            for column in range(len(holding_periods))
+        ]
+    )
+    growth = (
+        prices[lots["exit"], columns]
+        / prices[positions, columns]
+        * drag_tables[columns, entry_months]
+    )
+    lots = size_lots(prices, lots, growth, fraction, lot_cash)
+    lots = lots[lots["shares"] > 0]
+    cash, held = lots_equity(prices, calendar, lots, holding_periods, costs)
+    return lots, cash, held
+
+
+def annualize(values, dates):
+    total_return = (values[-1] - INITIAL_CASH) / INITIAL_CASH
+    years = (dates[-1] - dates[0]).days / 365.25
+    return (1 + total_return) ** (1 / years) - 1
+
+
+def backtest_lots(
+    prices,
+    buy_signals,
+    holding_period,
+    drag=0.0,
+    roll_months=(),
+    fraction=LOT_FRACTION,
+    lot_cash=None,
+):
+    """One commodity, one lot per signal.
+
+    Returns (final value, annualized return, daily value Series, lots).
+    """
+    close = close_prices(prices)
+    close_values = close.to_numpy(dtype=float)[:, None]
+    positions = close.index.get_indexer(pd.DatetimeIndex(sorted(buy_signals)))
+    positions = positions[positions >= 0].astype(np.int64)
+    lots, cash, held = run_lots(
+        close_values,
+        trading_calendar(close.index),
+        positions,
+        np.zeros(len(positions), dtype=np.int32),
+        [holding_period],
+        [(drag, roll_months)],
+        fraction,
+        lot_cash,
+    )
+    values = cash + held[:, 0] * close_values[:, 0]
+    portfolio_value = pd.Series(values, index=close.index)
+    return values[-1], annualize(values, close.index), portfolio_value, lots
+
+
+def portfolio_lots(
+    panel,
+    buy_signals,
+    holding_periods=None,
+    roll_costs=True,
+    fraction=LOT_FRACTION,
+    lot_cash=None,
+):
+    """Several commodities on a PricePanel, one lot per signal.
+
+    Returns (final value, annualized return, DataFrame of values per
+    commodity plus cash and portfolio, lots).
+    """
+    holding_periods = holding_periods or {}
+    periods = []
+    costs = []
+    for name in panel.names:
+        spec = get_commodity(name)
+        periods.append(holding_periods.get(name, spec["holding_period"]))
+        costs.append(commodity_costs(spec, roll_costs))
+
+    positions, columns = signal_order(panel, buy_signals)
+    lots, cash, held = run_lots(
+        panel.values,
+        panel.calendar,
+        positions,
+        columns.astype(np.int32),
+        periods,
+        costs,
+        fraction,
+        lot_cash,
+    )
+    held_values = np.where(held != 0, held * np.nan_to_num(panel.values), 0.0)
+    values = pd.DataFrame(held_values, index=panel.dates, columns=panel.names)
+    values["cash"] = cash
+    values["portfolio"] = held_values.sum(axis=1) + cash
+    portfolio = values["portfolio"].to_numpy()
+    return portfolio[-1], annualize(portfolio, panel.dates), values, lots
@@ -0,0 +1,149 @@
+"""Risk metrics for one or many equity curves at once.
+
+equity_metrics takes a 1-D curve, a 2-D (n_curves, n_days) array from a
+sweep, or a DataFrame with one curve per column, and computes every metric
+with array operations along the day axis, so ranking thousands of
+configurations needs no per-curve loop:
+
+- total_return, annualized_return, volatility
+- sharpe, sortino (annualized, against a constant risk-free rate)
+- max_drawdown and max_drawdown_days (longest stretch below a prior peak)
+- calmar (annualized return over max drawdown)
+- trades, hit_rate (share of trades that made money), exposure (share of
+  days in the market) and turnover (position changes per year)
+
+Exposure is the invested fraction of equity per day; pass it whenever the
+positions are known (engine.backtest.position_exposure gives it for the
+backtests). Without it, a day counts as invested when the curve moved.
+That is only an approximation for curves with no known positions: a held
+day with an unchanged close looks flat and splits one trade into two,
+which skews trades, hit_rate and turnover.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.bootstrap import TRADING_DAYS_PER_YEAR
+
+METRICS = (
+    "total_return",
+    "annualized_return",
+    "volatility",
+    "sharpe",
+    "sortino",
+    "max_drawdown",
+    "max_drawdown_days",
+    "calmar",
+    "trades",
+    "hit_rate",
+    "exposure",
+    "turnover",
+)
+
+
+def drawdowns(equity):
+    """(max drawdown, longest run of days below the running peak) per row"""
+    peak = np.maximum.accumulate(equity, axis=-1)
+    max_drawdown = (1 - equity / peak).max(axis=-1)
+    days = np.arange(equity.shape[-1])
+    at_peak = equity >= peak
+    last_peak = np.maximum.accumulate(np.where(at_peak, days, 0), axis=-1)
+    return max_drawdown, (days - last_peak).max(axis=-1)
+
+
+def trade_stats(log_returns, held):
+    """(number of trades, share of them with a positive total return) per row.
+
+    held[:, t] says whether the position was on over day t's return; each
+    run of held days is one trade (a re-entry on the exit day continues it).
+    """
+    n_rows, n_days = held.shape
+    entries = held & ~np.concatenate(
+        [np.zeros((n_rows, 1), dtype=bool), held[:, :-1]], axis=1
+    )
+    trade_ids = np.cumsum(entries.ravel()) - 1
+    rows = np.repeat(np.arange(n_rows), n_days)
+    flat_held = held.ravel()
+    n_trades_total = int(entries.sum())
+    totals = np.bincount(
+        trade_ids[flat_held],
+        log_returns.ravel()[flat_held],
+        minlength=n_trades_total,
+    )
+    trade_rows = rows[entries.ravel()]
+    trades = np.bincount(trade_rows, minlength=n_rows)
+    wins = np.bincount(trade_rows, totals > 0, minlength=n_rows)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return trades, np.where(trades > 0, wins / trades, np.nan)
+
+
+def equity_metrics(
+    equity,
+    exposure=None,
+    periods_per_year=TRADING_DAYS_PER_YEAR,
+    risk_free=0.0,
+    years=None,
+):
+    """Metrics table for equity curves; one row per curve.
+
+    A DataFrame's columns (or a Series) become the row labels, and its
+    DatetimeIndex sets the number of years; otherwise years defaults to
+    the number of days over periods_per_year. exposure has the shape of
+    equity; when it is omitted, held days are guessed from the returns.
+    """
+    labels = None
+    if isinstance(equity, (pd.Series, pd.DataFrame)):
+        frame = equity.to_frame() if isinstance(equity, pd.Series) else equity
+        labels = list(frame.columns)
+        if years is None and isinstance(frame.index, pd.DatetimeIndex):
+            years = (frame.index[-1] - frame.index[0]).days / 365.25
+        equity = frame.to_numpy(dtype=float).T
+        if isinstance(exposure, pd.DataFrame):
+            exposure = exposure.to_numpy(dtype=float).T
+    single = np.ndim(equity) == 1 and labels is None
+    equity = np.atleast_2d(np.asarray(equity, dtype=float))
+    n_days = equity.shape[1]
+    if years is None:
+        years = (n_days - 1) / periods_per_year
+
+    returns = equity[:, 1:] / equity[:, :-1] - 1
+    log_returns = np.log1p(returns)
+    if exposure is None:
+        weights = (returns != 0).astype(float)
+        held = weights > 0
+    else:
+        # the position held at the close of day t - 1 earns day t's return
+        weights = np.atleast_2d(np.asarray(exposure, dtype=float))[:, :-1]
+        held = weights != 0
+
+    total_return = equity[:, -1] / equity[:, 0] - 1
+    annualized = (1 + total_return) ** (1 / years) - 1
+    excess = returns - risk_free / periods_per_year
+    mean = excess.mean(axis=1)
+    std = returns.std(axis=1, ddof=1)
+    downside = np.sqrt((np.minimum(excess, 0) ** 2).mean(axis=1))
+    max_drawdown, drawdown_days = drawdowns(equity)
+    trades, hit_rate = trade_stats(log_returns, held)
+    turnover = np.abs(np.diff(weights, axis=1, prepend=0)).sum(axis=1) / years
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        table = pd.DataFrame(
+            {
+                "total_return": total_return,
+                "annualized_return": annualized,
+                "volatility": std * np.sqrt(periods_per_year),
+                "sharpe": mean / std * np.sqrt(periods_per_year),
+                "sortino": mean / downside * np.sqrt(periods_per_year),
+                "max_drawdown": max_drawdown,
+                "max_drawdown_days": drawdown_days,
+                "calmar": np.where(max_drawdown > 0, annualized / max_drawdown, np.nan),
+                "trades": trades,
+                "hit_rate": hit_rate,
+                "exposure": (weights != 0).mean(axis=1),
+                "turnover": turnover,
+            },
+            index=labels,
+        )
+    if single:
+        return table.iloc[0]
+    return table
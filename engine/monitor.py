@@ -0,0 +1,294 @@
+"""Live signal monitor over incoming daily weather.
+
+Each commodity keeps a small SignalState: the last signalled month, the
+open position (if any) and the last processed date. A new day is checked
+against the registry rules once, so updates are O(1) per day and nothing
+is rescanned. Rules relative to the climate are judged against a
+day-of-year index that new days are folded into a month at a time, once the
+next month starts, as engine.climatology.point_in_time_values does for the
+backtests. A warm start rebuilds that index from the replayed history only;
+the monitor saves updated indexes after the warm start and after each poll.
+Records come from NASA POWER (polled) or from CSV files dropped into a
+directory, in the same layout as crops_data/*.csv.
+
+    python -m engine.monitor corn coffee --source power --interval 21600
+    python -m engine.monitor all --source dir --watch-dir drops --events events.jsonl
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from engine.accumulators import AccumulatorState
+from engine.climatology import (
+    DEFAULT_WINDOW,
+    Climatology,
+    climatology_path,
+    column_ranges,
+    compare_values,
+    load_climatology,
+    needs_climatology,
+)
+from engine.data import load_weather
+from engine.events import RunState, exceedance, is_run_rule
+from engine.fetch import fetch_weather_all
+from engine.registry import get_commodity, list_commodities
+from engine.signals import OPERATORS
+
+
+def is_weekday(date):
+    return date.weekday() < 5
+
+
+def add_months(date, months):
+    return date + pd.DateOffset(months=months)
+
+
+class SignalState:
+    """Incremental version of get_buy_signals + the one-position backtest loop"""
+
+    def __init__(
+        self, name, holding_period=None, is_trading_day=is_weekday, climatology=None
+    ):
+        spec = get_commodity(name)
+        self.name = name
+        self.rules = spec["rules"]
+        # only an index loaded from the store is written back by save()
+        self.climatology_path = None
+        if climatology is None and needs_climatology(self.rules):
+            climatology = load_climatology(name)
+            self.climatology_path = climatology_path(name)
+        self.climatology = climatology
+        self.climatology_changed = False
+        # days of the current month, folded into the index when it ends
+        self.pending = []
+        self.holding_period = holding_period or spec["holding_period"]
+        self.is_trading_day = is_trading_day
+        self.accumulators = AccumulatorState(spec.get("accumulators", []))
+        self.runs = {
+            rule["name"]: RunState(rule) for rule in self.rules if is_run_rule(rule)
+        }
+        self.last_date = None
+        self.last_month_code = None
+        self.exit_date = None
+
+    def fired_rules(self, date, record):
+        fired = []
+        for rule in self.rules:
+            value = record.get(rule["column"])
+            if value is None or pd.isna(value):
+                continue
+            if rule.get("months") and date.month not in rule["months"]:
+                continue
+            value, threshold = compare_values(rule, [date], [value], self.climatology)
+            value, threshold = value[0], np.ravel(threshold)[0]
+            if not OPERATORS[rule["op"]](value, threshold):
+                continue
+            run = self.runs.get(rule["name"])
+            if run is None or run.update(
+                date, exceedance(value, threshold, rule["op"])
+            ):
+                fired.append(rule["name"])
+        return fired
+
+    def update(self, date, record):
+        """Process one day; returns the buy/exit events it triggers"""
+        date = pd.Timestamp(date).normalize()
+        if self.last_date is not None and date <= self.last_date:
+            return []
+        self.last_date = date
+        events = []
+
+        if self.exit_date is not None and date >= self.exit_date:
+            events.append({"type": "exit", "commodity": self.name, "date": date})
+            self.exit_date = None
+
+        # run rules and accumulators have to see every day, signalled month or not
+        record = self.accumulators.update(date, record)
+        if self.pending and self.pending[-1][0].to_period("M") != date.to_period("M"):
+            self.fold_pending()
+        fired = self.fired_rules(date, record)
+        if self.climatology is not None:
+            self.pending.append((date, record))
+        if not fired or not self.is_trading_day(date):
+            return events
+        month_code = date.year * 12 + date.month - 1
+        if month_code == self.last_month_code:
+            return events
+
+        # first signal of the month, same dedupe as seen_months in get_buy_signals
+        self.last_month_code = month_code
+        event = {"type": "signal", "commodity": self.name, "date": date, "rules": fired}
+        if self.exit_date is None:
+            self.exit_date = add_months(date, self.holding_period)
+            event["type"] = "buy"
+            event["exit_date"] = self.exit_date
+        events.append(event)
+        return events
+
+    def fold_pending(self):
+        """Fold the finished month's days into the index (days it already has
+        are skipped by Climatology.update)"""
+        columns = self.climatology.columns
+        dates = pd.DatetimeIndex([date for date, _ in self.pending])
+        rows = {
+            column: [record.get(column, np.nan) for _, record in self.pending]
+            for column in columns
+        }
+        self.pending = []
+        if self.climatology.update(pd.DataFrame(rows, index=dates, dtype=float)):
+            self.climatology_changed = True
+
+    def save_climatology(self):
+        if self.climatology_changed and self.climatology_path is not None:
+            self.climatology.save(self.climatology_path)
+        self.climatology_changed = False
+
+    def warm_start(self, df):
+        """Replay stored history once so live updates continue from its end.
+
+        Anomaly rules start from an empty index that the replayed days are
+        folded into, so the replay signals what get_buy_signals does.
+        """
+        if needs_climatology(self.rules):
+            columns = sorted(
+                {
+                    r["column"]
+                    for r in self.rules
+                    if r.get("kind", "absolute") != "absolute"
+                }
+            )
+            window = self.climatology.window if self.climatology else DEFAULT_WINDOW
+            self.climatology = Climatology(columns, window, column_ranges(df, columns))
+            self.pending = []
+        events = []
+        for date, record in zip(df.index, df.to_dict("records")):
+            events.extend(self.update(date, record))
+        if self.climatology is not None:
+            self.climatology_changed = True
+        return events
+
+
+class SignalMonitor:
+    def __init__(self, names, holding_periods=None, on_event=print):
+        holding_periods = holding_periods or {}
+        self.states = {
+            name: SignalState(name, holding_periods.get(name)) for name in names
+        }
+        self.on_event = on_event
+
+    def ingest(self, name, date, record):
+        events = self.states[name].update(date, record)
+        for event in events:
+            self.on_event(event)
+        return events
+
+    def ingest_frame(self, name, df):
+        events = []
+        for date, record in zip(df.index, df.to_dict("records")):
+            events.extend(self.ingest(name, date, record))
+        return events
+
+    def warm_start(self, weather=None):
+        """Bring every state up to date with the stored CSVs without emitting events"""
+        for name, state in self.states.items():
+            df = weather[name] if weather is not None else load_weather(name)
+            state.warm_start(df)
+        self.save_climatologies()
+
+    def save_climatologies(self):
+        for state in self.states.values():
+            state.save_climatology()
+
+    def poll_power(self, lookback_days=14):
+        """Fetch the last few days from NASA POWER and feed any new records"""
+        end = datetime.now()
+        frames = fetch_weather_all(
+            list(self.states), end - timedelta(days=lookback_days), end
+        )
+        events = []
+        for name, df in frames.items():
+            if df is None:
+                continue
+            state = self.states[name]
+            if state.last_date is not None:
+                df = df[df.index > state.last_date]
+            events.extend(self.ingest_frame(name, df))
+        return events
+
+    def poll_directory(self, directory, processed):
+        """Feed CSV drops named <commodity>*.csv that have not been seen yet"""
+        events = []
+        for filename in sorted(os.listdir(directory)):
+            path = os.path.join(directory, filename)
+            if not filename.endswith(".csv") or path in processed:
+                continue
+            name = next((n for n in self.states if filename.startswith(n)), None)
+            processed.add(path)
+            if name is None:
+                continue
+            df = pd.read_csv(path, index_col="Date", parse_dates=True).sort_index()
+            events.extend(self.ingest_frame(name, df))
+        return events
+
+    def run(self, source="power", watch_dir=None, interval=3600, iterations=None):
+        processed = set()
+        count = 0
+        while iterations is None or count < iterations:
+            if source == "power":
+                self.poll_power()
+            else:
+                self.poll_directory(watch_dir, processed)
+            self.save_climatologies()
+            count += 1
+            if iterations is None or count < iterations:
+                time.sleep(interval)
+
+
+def event_printer(path=None):
+    def emit(event):
+        line = json.dumps(event, default=str)
+        print(line, flush=True)
+        if path:
+            with open(path, "a") as f:
+                f.write(line + "\n")
+
+    return emit
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.monitor",
+        description="Emit buy/exit events as new daily weather arrives.",
+    )
+    parser.add_argument("commodities", nargs="*", default=["all"])
+    parser.add_argument("--source", choices=["power", "dir"], default="power")
+    parser.add_argument("--watch-dir", help="directory of dropped CSV files")
+    parser.add_argument(
+        "--interval", type=float, default=3600, help="seconds between polls"
+    )
+    parser.add_argument("--events", help="also append events to this JSONL file")
+    parser.add_argument(
+        "--no-warm-start",
+        dest="warm_start",
+        action="store_false",
+        help="do not replay the stored CSVs before going live",
+    )
+    args = parser.parse_args(argv)
+    if args.source == "dir" and not args.watch_dir:
+        parser.error("--watch-dir is required with --source dir")
+
+    names = list_commodities() if "all" in args.commodities else args.commodities
+    monitor = SignalMonitor(names, on_event=event_printer(args.events))
+    if args.warm_start:
+        monitor.warm_start()
+    monitor.run(args.source, args.watch_dir, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Aligned close prices for several commodities in one float64 matrix.
+
+load_panel reads every ticker from the price cache (downloading all the
+missing ones in a single request), aligns them on one trading calendar and
+applies an explicit fill policy:
+
+- calendar="union": every date any commodity traded (default)
+- calendar="intersection": only dates every commodity traded
+- calendar=<commodity name>: that commodity's own trading days
+- fill="ffill": carry the last close forward (at most limit calendar days)
+- fill="none": leave NaN where a commodity did not trade
+
+Leading gaps before a commodity's first close are never filled. The result
+is a C-contiguous (n_dates, n_commodities) matrix with the dates and names
+alongside; backtests read columns of it directly.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.data import close_prices, load_prices_many
+from engine.registry import PRICE_END, PRICE_START, get_commodity
+from engine.trading_calendar import trading_calendar
+
+FILL_POLICIES = ("ffill", "none")
+
+
+class PricePanel:
+    def __init__(self, dates, names, values, observed):
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.names = list(names)
+        self.tickers = [get_commodity(name)["ticker"] for name in self.names]
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.observed = np.asarray(observed, dtype=bool)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def calendar(self):
+        return trading_calendar(self.dates)
+
+    def position(self, name):
+        return self.names.index(name)
+
+    def column(self, name):
+        """View of one commodity's aligned (filled) closes"""
+        return self.values[:, self.position(name)]
+
+    def frame(self):
+        """DataFrame over the matrix, one column per commodity"""
+        return pd.DataFrame(
+            self.values, index=self.dates, columns=self.names, copy=False
+        )
+
+    def close(self, name, filled=False):
+        """Close series of one commodity, on its own trading days by default"""
+        j = self.position(name)
+        keep = ~np.isnan(self.values[:, j])
+        if not filled:
+            keep &= self.observed[:, j]
+        return pd.Series(
+            self.values[keep, j], index=self.dates[keep], name="Close", copy=False
+        )
+
+    def select(self, names):
+        columns = [self.position(name) for name in names]
+        return PricePanel(
+            self.dates, names, self.values[:, columns], self.observed[:, columns]
+        )
+
+
+def align_prices(closes, calendar="union", fill="ffill", limit=None):
+    """PricePanel from {name: close Series}"""
+    if fill not in FILL_POLICIES:
+        raise ValueError(f"fill must be one of {FILL_POLICIES}, not '{fill}'")
+    names = list(closes)
+    indexes = [pd.DatetimeIndex(closes[name].dropna().index) for name in names]
+    if calendar == "union":
+        dates = indexes[0]
+        for index in indexes[1:]:
+            dates = dates.union(index)
+    elif calendar == "intersection":
+        dates = indexes[0]
+        for index in indexes[1:]:
+            dates = dates.intersection(index)
+    elif calendar in closes:
+        dates = indexes[names.index(calendar)]
+    else:
+        raise ValueError(
+            f"calendar must be 'union', 'intersection' or a commodity in {names}"
+        )
+    dates = dates.sort_values()
+
+    times = dates.values.astype("datetime64[ns]").view(np.int64)
+    values = np.full((len(dates), len(names)), np.nan)
+    observed = np.zeros((len(dates), len(names)), dtype=bool)
+    for j, (name, index) in enumerate(zip(names, indexes)):
+        own = index.values.astype("datetime64[ns]").view(np.int64)
+        close = closes[name].dropna().to_numpy(dtype=float)
+        # latest close on or before each panel date
+        last = np.searchsorted(own, times, side="right") - 1
+        known = last >= 0
+        age = np.where(known, times - own[np.clip(last, 0, None)], 0)
+        observed[:, j] = known & (age == 0)
+        usable = observed[:, j] if fill == "none" else known
+        if fill == "ffill" and limit is not None:
+            usable = usable & (age <= pd.Timedelta(days=limit).value)
+        values[usable, j] = close[last[usable]]
+    return PricePanel(dates, names, values, observed)
+
+
+def load_panel(
+    names,
+    start=PRICE_START,
+    end=PRICE_END,
+    offline=False,
+    calendar="union",
+    fill="ffill",
+    limit=None,
+):
+    """Aligned close prices for names, fetched in one bulk call or from cache"""
+    prices = load_prices_many(names, start, end, offline)
+    closes = {name: close_prices(prices[name]) for name in names}
+    return align_prices(closes, calendar, fill, limit)
@@ -0,0 +1,238 @@
+"""Per-commodity portfolio pipelines scheduled on a process pool.
+
+The parent loads every commodity once (one bulk price request) into a
+SharedPanel (engine/shared.py), and a portfolio run is then a small
+dependency graph over it:
+
+    signals(c) -> returns(c)      for every commodity c
+    signals(*) -> portfolio
+
+Each task is (function, args, dependencies); run_graph submits a task as
+soon as its dependencies have finished and passes their results after its
+own args, so the commodities' chains run side by side and the wall time is
+about that of the slowest chain plus the portfolio merge. With jobs=1 the
+same graph runs in this process, in dependency order. Tasks receive the
+panel handle, which pickles as a few names, and read prices and weather
+from shared memory; only signal dates and equity curves travel back.
+
+    results = run_portfolio_pipeline(["corn", "coffee", "lean_hogs"], jobs=3)
+    final, annualized, values = results["portfolio"]
+
+Task functions live at module level so worker processes can unpickle them.
+"""
+
+import argparse
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from engine.backtest import backtest_strategy, commodity_costs
+from engine.cache import default_cache
+from engine.panel import align_prices
+from engine.portfolio import compare_sizing, portfolio_backtest
+from engine.registry import (
+    PRICE_END,
+    PRICE_START,
+    SIGNAL_CUTOFF_YEAR,
+    get_commodity,
+    list_commodities,
+)
+from engine.shared import publish_panel
+from engine.signals import get_buy_signals
+from engine.sizing import SIZING_POLICIES
+
+
+def signals_stage(name, cutoff_year, shared):
+    prices = shared.prices(name).to_frame()
+    rules = get_commodity(name)["rules"]
+    return get_buy_signals(shared.weather(name), prices, rules, cutoff_year)
+
+
+def returns_stage(name, holding_period, roll_costs, shared, signals):
+    """The commodity on its own: (final value, annualized return, equity curve)"""
+    drag, roll_months = commodity_costs(get_commodity(name), roll_costs)
+    return backtest_strategy(
+        shared.prices(name), signals, holding_period, drag, roll_months, verbose=False
+    )
+
+
+def portfolio_stage(names, holding_periods, roll_costs, sizing, shared, *signals):
+    """Merge every commodity's prices and signals into one portfolio backtest
+
+    With a list of sizing policies the result is their compare_sizing table.
+    """
+    panel = align_prices({name: shared.prices(name) for name in names})
+    buy_signals = dict(zip(names, signals))
+    if isinstance(sizing, list):
+        return compare_sizing(panel, buy_signals, sizing, holding_periods, roll_costs)
+    return portfolio_backtest(
+        panel, buy_signals, holding_periods, roll_costs, sizing=sizing
+    )
+
+
+def portfolio_graph(
+    names,
+    shared,
+    holding_periods=None,
+    cutoff_year=SIGNAL_CUTOFF_YEAR,
+    roll_costs=True,
+    sizing=None,
+):
+    """{key: (function, args, dependency keys)} for a portfolio run over a
+    SharedPanel of names"""
+    holding_periods = {
+        name: (holding_periods or {}).get(name, get_commodity(name)["holding_period"])
+        for name in names
+    }
+    tasks = {}
+    for name in names:
+        tasks[("signals", name)] = (signals_stage, (name, cutoff_year, shared), [])
+        tasks[("returns", name)] = (
+            returns_stage,
+            (name, holding_periods[name], roll_costs, shared),
+            [("signals", name)],
+        )
+    tasks["portfolio"] = (
+        portfolio_stage,
+        (list(names), holding_periods, roll_costs, sizing, shared),
+        [("signals", name) for name in names],
+    )
+    return tasks
+
+
+def run_graph(tasks, jobs=1, timings=None):
+    """Run every task once its dependencies are done; returns {key: result}.
+
+    With a timings dict, each task's run time in seconds is stored under its
+    key (measured in the parent, so it includes queueing in the pool).
+    """
+    for key, (_, _, dependencies) in tasks.items():
+        missing = [d for d in dependencies if d not in tasks]
+        if missing:
+            raise ValueError(f"task {key!r} depends on unknown tasks {missing}")
+    results = {}
+    pending = dict(tasks)
+
+    def ready():
+        return [
+            key
+            for key, (_, _, dependencies) in pending.items()
+            if all(d in results for d in dependencies)
+        ]
+
+    def arguments(key):
+        function, args, dependencies = tasks[key]
+        return function, (*args, *(results[d] for d in dependencies))
+
+    if jobs <= 1:
+        while pending:
+            keys = ready()
+            if not keys:
+                raise ValueError(f"dependency cycle among {list(pending)}")
+            for key in keys:
+                started = time.perf_counter()
+                function, args = arguments(key)
+                results[key] = function(*args)
+                del pending[key]
+                if timings is not None:
+                    timings[key] = time.perf_counter() - started
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        running = {}
+        while pending or running:
+            for key in ready():
+                function, args = arguments(key)
+                running[pool.submit(function, *args)] = (key, time.perf_counter())
+                del pending[key]
+            if not running:
+                raise ValueError(f"dependency cycle among {list(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, started = running.pop(future)
+                results[key] = future.result()
+                if timings is not None:
+                    timings[key] = time.perf_counter() - started
+    return results
+
+
+def run_portfolio_pipeline(
+    names,
+    holding_periods=None,
+    jobs=None,
+    start=PRICE_START,
+    end=PRICE_END,
+    offline=False,
+    timings=None,
+    cache=default_cache,
+    **kwargs,
+):
+    """Build every commodity's artifacts concurrently and run the portfolio.
+
+    Returns {"signals", "returns": {name: ...}, "portfolio": (final value,
+    annualized return, values)}. jobs defaults to one worker per commodity;
+    accumulator columns are reused from cache (None to recompute them);
+    kwargs go to portfolio_graph.
+    """
+    names = list(names)
+    with publish_panel(names, start, end, offline, cache) as shared:
+        results = run_graph(
+            portfolio_graph(names, shared, holding_periods, **kwargs),
+            jobs if jobs is not None else len(names),
+            timings,
+        )
+    merged = {
+        key: {name: results[(stage, name)] for name in names}
+        for key, stage in (("signals", "signals"), ("returns", "returns"))
+    }
+    merged["portfolio"] = results["portfolio"]
+    return merged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.pipeline",
+        description="Run a multi-commodity portfolio with per-commodity stages in parallel.",
+    )
+    parser.add_argument("commodities", nargs="*", default=["all"])
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--no-roll-costs", dest="roll_costs", action="store_false")
+    parser.add_argument(
+        "--sizing",
+        default=None,
+        help=f"compare sizing policies, e.g. 'equal,kelly' (from {', '.join(SIZING_POLICIES)})",
+    )
+    args = parser.parse_args(argv)
+    names = list_commodities() if "all" in args.commodities else args.commodities
+
+    timings = {}
+    started = time.perf_counter()
+    sizing = None
+    if args.sizing:
+        sizing = [{"policy": policy} for policy in args.sizing.split(",")]
+    results = run_portfolio_pipeline(
+        names,
+        jobs=args.jobs,
+        offline=args.offline,
+        timings=timings,
+        roll_costs=args.roll_costs,
+        sizing=sizing,
+    )
+    wall = time.perf_counter() - started
+
+    for name in names:
+        final, annualized, _ = results["returns"][name]
+        print(
+            f"{name}: {len(results['signals'][name])} signals, "
+            f"final {final:.2f}, annualized {annualized:.2%}"
+        )
+    if sizing:
+        print(results["portfolio"].to_string())
+    else:
+        final, annualized, _ = results["portfolio"]
+        print(f"Portfolio: final {final:.2f}, annualized {annualized:.2%}")
+    print(f"Wall time {wall:.2f}s, summed task time {sum(timings.values()):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Interactive charts for a single commodity run."""
+
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from engine.backtest import (
+    INITIAL_CASH,
+    backtest_strategy,
+    commodity_costs,
+    optimize_holding_period,
+)
+from engine.data import close_prices
+from engine.registry import get_commodity
+from engine.signals import buy_signals_from_extremes, rule_mask
+
+RULE_MARKERS = {
+    ">": ("r", "Extreme Hot"),
+    ">=": ("r", "Extreme Hot"),
+    "<": ("b", "Extreme Cold"),
+    "<=": ("b", "Extreme Cold"),
+}
+
+
+def plot_temperature(df, title):
+    plt.plot(df.index, (df["Max_Temp_C"] + df["Min_Temp_C"]) / 2)
+    plt.title(title)
+    plt.xlabel("Date")
+    plt.ylabel("Temperature (°C)")
+    plt.show()
+
+
+def plot_extremes(df, spec):
+    extremes = []
+    plt.plot(df.index, df["Max_Temp_C"], label="Max Temp")
+    plt.plot(df.index, df["Min_Temp_C"], label="Min Temp")
+    for rule in spec["rules"]:
+        mask = rule_mask(df, rule)
+        color, label = RULE_MARKERS[rule["op"]]
+        # rules on THI or accumulators are marked on the max temperature line
+        column = rule["column"] if rule["column"].endswith("_Temp_C") else "Max_Temp_C"
+        if mask.any():
+            plt.plot(
+                df.index[mask],
+                df[column][mask],
+                f"{color}^",
+                linestyle="none",
+                markersize=10,
+                label=label,
+            )
+        extremes.append(df.index[mask].normalize())
+    plt.title(f"Extreme Temperatures During {spec['label']} Harvest")
+    plt.xlabel("Date")
+    plt.ylabel("Temperature (°C)")
+    plt.legend()
+    plt.show()
+    return extremes
+
+
+def plot_prices(prices, extremes, spec):
+    close = close_prices(prices)
+    for dates, color in zip(extremes, ["r", "b", "m", "c"]):
+        dates = pd.DatetimeIndex(dates)
+        dates = dates[dates.isin(close.index)]
+        plt.plot(dates, close.loc[dates], f"{color}o", markersize=10)
+    plt.plot(close.index, close)
+    plt.title(f"{spec['label']} Prices During Extreme Temperatures")
+    plt.xlabel("Date")
+    plt.ylabel("Price (USD)")
+    plt.show()
+
+
+def plot_buy_signals(prices, extremes):
+    close = close_prices(prices)
+    signals = buy_signals_from_extremes(extremes, close)
+    plt.plot(close.index, close)
+    plt.plot(signals, close.loc[signals], "go", markersize=10)
+    plt.title("Buy Signals")
+    plt.xlabel("Date")
+    plt.ylabel("Price (USD)")
+    plt.show()
+    return signals
+
+
+def plot_returns(prices, buy_signals, holding_period, drag=0.0, roll_months=()):
+    cash, annualized_return, portfolio_value = backtest_strategy(
+        prices, buy_signals, holding_period, drag, roll_months
+    )
+    plt.figure(figsize=(10, 5))
+    plt.plot(portfolio_value.index, portfolio_value, label="Portfolio Value")
+    plt.title(f"Portfolio Value Over {holding_period} Months (Initial Cash: $10,000)")
+    plt.xlabel("Date")
+    plt.ylabel("Value ($)")
+    plt.grid(True)
+    plt.legend()
+    plt.show()
+    return cash, annualized_return
+
+
+def plot_portfolio(values, title):
+    """Total value plus each commodity's position from portfolio_backtest"""
+    plt.figure(figsize=(10, 5))
+    plt.plot(values.index, values["portfolio"], label="Portfolio Value")
+    for name in values.columns.drop(["cash", "portfolio"]):
+        label = get_commodity(name)["label"]
+        plt.plot(values.index, values[name], label=f"{label} Portfolio Value")
+    plt.title(title)
+    plt.xlabel("Date")
+    plt.ylabel("Value ($)")
+    plt.grid(True)
+    plt.legend()
+    plt.show()
+
+
+def plot_optimization_results(cash_results, return_results, best_months):
+    cash_periods = list(cash_results.keys())
+    cash_values = list(cash_results.values())
+    return_values = list(return_results.values())
+
+    fig, ax1 = plt.subplots(figsize=(12, 6))
+
+    bars = ax1.bar(
+        cash_periods, cash_values, color="skyblue", alpha=0.7, label="Portfolio Value"
+    )
+    bars[cash_periods.index(best_months)].set_color("green")
+    ax1.axhline(
+        y=INITIAL_CASH,
+        color="red",
+        linestyle="--",
+        linewidth=1.5,
+        label="Starting Cash ($10k)",
+    )
+    ax1.set_xlabel("Holding Period (Months)")
+    ax1.set_ylabel("Final Portfolio Value ($)")
+    ax1.tick_params(axis="y")
+    ax1.set_xticks(cash_periods)
+    ax1.grid(True, alpha=0.3)
+
+    ax2 = ax1.twinx()
+    ax2.plot(
+        cash_periods,
+        return_values,
+        color="darkgreen",
+        marker="o",
+        linewidth=2,
+        markersize=6,
+        label="% Return",
+    )
+    ax2.set_ylabel("Percentage Return (%)")
+    ax2.tick_params(axis="y", labelcolor="darkgreen")
+    ax2.axhline(y=0, color="gray", linestyle=":", linewidth=1, alpha=0.5)
+
+    plt.title("Strategy Performance by Holding Period")
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax1.legend(lines1 + lines2, labels1 + labels2, loc="upper left")
+
+    plt.tight_layout()
+    plt.show()
+
+
+def run_report(name, df, prices, backtest_period, plot_period, roll_costs=True):
+    """The walkthrough each per-crop script runs as __main__"""
+    spec = get_commodity(name)
+    drag, roll_months = commodity_costs(spec, roll_costs)
+    extremes = plot_extremes(df, spec)
+    plot_prices(prices, extremes, spec)
+    signals = plot_buy_signals(prices, extremes)
+    print(signals)
+    backtest_strategy(prices, signals, backtest_period, drag, roll_months)
+    plot_returns(prices, signals, plot_period, drag, roll_months)
+    best_months, best_pnl, cash_results, return_results = optimize_holding_period(
+        prices, signals, 1, 12, drag, roll_months
+    )
+    plot_optimization_results(cash_results, return_results, best_months)
+    return signals
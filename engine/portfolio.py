@@ -0,0 +1,128 @@
+"""Multi-commodity portfolio backtest on an aligned PricePanel.
+
+Generalizes the original two-contract loop in portfolio.py and
+portfolio_function.py: a signal for a commodity that is not already held
+buys it with an equal share of the free cash (all of it when every other
+commodity is held), holds it for that commodity's holding period and sells
+at the nearest trading day. Roll drag is charged on each roll date. Other
+sizing policies (inverse volatility, volatility target, capped Kelly) come
+from engine/sizing.py.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import INITIAL_CASH, LOT_FRACTION, commodity_costs, drag_factors
+from engine.metrics import equity_metrics
+from engine.registry import get_commodity
+from engine.sizing import position_cash, sizing_label, sizing_table
+
+
+def signal_order(panel, buy_signals):
+    """(position, commodity column) of every signal on the panel, by date
+
+    Signals on the same day keep the order of panel.names.
+    """
+    positions = []
+    columns = []
+    for j, name in enumerate(panel.names):
+        rows = panel.dates.get_indexer(pd.DatetimeIndex(buy_signals.get(name, [])))
+        rows = rows[rows >= 0]
+        positions.append(rows)
+        columns.append(np.full(len(rows), j))
+    positions = np.concatenate(positions).astype(np.int64)
+    columns = np.concatenate(columns).astype(np.int64)
+    order = np.lexsort((columns, positions))
+    return positions[order], columns[order]
+
+
+def portfolio_backtest(
+    panel,
+    buy_signals,
+    holding_periods=None,
+    roll_costs=True,
+    overlap=False,
+    lot_fraction=LOT_FRACTION,
+    lot_cash=None,
+    sizing=None,
+):
+    """Backtest every commodity of the panel together.
+
+    buy_signals maps names to signal dates; holding_periods maps names to
+    months (default: the registry's). Returns (final value, annualized
+    return, DataFrame with one value column per commodity plus cash and
+    portfolio). sizing is a policy dict from engine/sizing.py (default:
+    equal shares of the free cash). With overlap, every signal opens its own
+    lot (see engine/lots.py) sized by lot_fraction / lot_cash instead, rather
+    than being skipped while its commodity is held.
+    """
+    if overlap:
+        from engine.lots import portfolio_lots
+
+        return portfolio_lots(
+            panel, buy_signals, holding_periods, roll_costs, lot_fraction, lot_cash
+        )[:3]
+
+    holding_periods = holding_periods or {}
+    names = panel.names
+    prices = panel.values
+    calendar = panel.calendar
+    n_dates, n_names = prices.shape
+
+    periods = []
+    costs = []
+    for name in names:
+        spec = get_commodity(name)
+        periods.append(holding_periods.get(name, spec["holding_period"]))
+        costs.append(commodity_costs(spec, roll_costs))
+
+    kind, sizes = sizing_table(prices, sizing)
+    cash = np.full(n_dates, float(INITIAL_CASH))
+    held = np.zeros((n_dates, n_names))
+    busy_until = np.full(n_names, -1)
+
+    for start, j in zip(*signal_order(panel, buy_signals)):
+        if start < busy_until[j] or np.isnan(prices[start, j]):
+            continue
+        trade_cash = position_cash(
+            kind,
+            sizes,
+            start,
+            j,
+            cash[start],
+            cash[start] + held[start].sum(),
+            busy_until <= start,
+        )
+        if trade_cash <= 0:
+            continue
+        stop = calendar.months_ahead(start, periods[j])
+        shares = trade_cash / prices[start, j]
+
+        factors = drag_factors(calendar, start, stop, periods[j], *costs[j])
+
+        cash[start:] -= trade_cash
+        held[start : stop + 1, j] = shares * prices[start : stop + 1, j] * factors
+        cash[stop:] += held[stop, j]
+        held[stop:, j] = 0
+        busy_until[j] = stop
+
+    values = pd.DataFrame(held, index=panel.dates, columns=names)
+    values["cash"] = cash
+    values["portfolio"] = held.sum(axis=1) + cash
+
+    final_value = values["portfolio"].iloc[-1]
+    total_return = (final_value - INITIAL_CASH) / INITIAL_CASH
+    years = (panel.dates[-1] - panel.dates[0]).days / 365.25
+    annualized_return = (1 + total_return) ** (1 / years) - 1
+    return final_value, annualized_return, values
+
+
+def compare_sizing(panel, buy_signals, policies, holding_periods=None, roll_costs=True):
+    """equity_metrics of the portfolio under each sizing policy, one row each"""
+    curves = {
+        sizing_label(sizing): portfolio_backtest(
+            panel, buy_signals, holding_periods, roll_costs, sizing=sizing
+        )[2]["portfolio"]
+        for sizing in policies
+    }
+    return equity_metrics(pd.DataFrame(curves))
@@ -0,0 +1,397 @@
+"""Local stand-in for the NASA POWER daily point API.
+
+Serves POWER-format JSON so the downloaders in engine/fetch.py (and their
+retry, concurrency and pooling behaviour) can be tested and load-tested on a
+machine without network access. Values come from, in order:
+
+- fixtures: stored POWER JSON responses (*.json) and crops_data-style CSVs
+  (*.csv with a Date column and a "lat"/"lon" pair in the file name, e.g.
+  site_42.03_-93.64.csv), plus the registered commodities' weather CSVs
+- a synthetic generator: a seasonal cycle plus noise that is deterministic
+  for a (seed, site, parameter, day), so overlapping requests agree
+
+Parameters or days a fixture does not cover fall back to the generator (or
+POWER's -999 fill value with synthetic=False). Each request can be delayed
+(latency + uniform jitter), failed with a 5xx at error_rate, or refused
+with 429 and a Retry-After header once a token-bucket rate limit is spent.
+
+    with PowerServer(latency=0.2, error_rate=0.1, rate_limit=5) as server:
+        frames = fetch_weather_all(names, start, end, url=server.url)
+        print(server.stats)
+
+or run `python -m engine.power_server --port 8765 --latency 0.2` and set
+POWER_URL=http://127.0.0.1:8765/api/temporal/daily/point for the fetchers.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from engine.data import POWER_COLUMNS
+from engine.registry import get_commodity, list_commodities, weather_path
+
+POWER_PATH = "/api/temporal/daily/point"
+FILL_VALUE = -999.0
+ERROR_STATUSES = (500, 502, 503)
+SYNTHETIC_EPOCH = np.datetime64("1981-01-01")
+
+# parameter -> (annual mean, seasonal amplitude, daily noise sd, lower, upper);
+# T2M_MIN and T2M are derived from T2M_MAX and the daily range T2M_RANGE
+SYNTHETIC = {
+    "T2M_MAX": (16.0, 14.0, 3.0, -60.0, 60.0),
+    "T2M_RANGE": (12.0, 2.0, 2.5, 1.0, 30.0),
+    "T2M_MIN": (4.0, 12.0, 3.0, -70.0, 45.0),
+    "T2M": (10.0, 13.0, 3.0, -65.0, 50.0),
+    "RH2M": (70.0, -10.0, 8.0, 5.0, 100.0),
+    "PRECTOTCORR": (2.5, 1.0, 3.0, 0.0, 200.0),
+}
+DEFAULT_SYNTHETIC = (0.0, 1.0, 1.0, -1e6, 1e6)
+COLUMN_PARAMETERS = {column: parameter for parameter, column in POWER_COLUMNS.items()}
+
+
+def site_key(lat, lon):
+    return round(float(lat), 2), round(float(lon), 2)
+
+
+def frame_parameters(df):
+    """{POWER parameter: Series} from a crops_data-style frame"""
+    return {
+        COLUMN_PARAMETERS.get(column, column): df[column].astype(float)
+        for column in df.columns
+        if column in COLUMN_PARAMETERS or column in SYNTHETIC
+    }
+
+
+def power_json_parameters(data):
+    """(site, {parameter: Series}) from a stored POWER response"""
+    lon, lat = data["geometry"]["coordinates"][:2]
+    series = {}
+    for parameter, values in data["properties"]["parameter"].items():
+        index = pd.to_datetime(list(values), format="%Y%m%d")
+        series[parameter] = pd.Series(list(values.values()), index=index, dtype=float)
+    return site_key(lat, lon), series
+
+
+def load_fixtures(directory=None, registry=True):
+    """{site: {parameter: Series}} from a fixture directory and the registry"""
+    sites = {}
+
+    def add(key, series):
+        sites.setdefault(key, {}).update(series)
+
+    if registry:
+        for name in list_commodities():
+            weather = get_commodity(name)["weather"]
+            path = weather_path(name)
+            if weather["lat"] is None or not os.path.exists(path):
+                continue
+            df = pd.read_csv(path, index_col="Date", parse_dates=True)
+            add(site_key(weather["lat"], weather["lon"]), frame_parameters(df))
+    if directory:
+        for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+            with open(path) as f:
+                add(*power_json_parameters(json.load(f)))
+        for path in sorted(glob.glob(os.path.join(directory, "*.csv"))):
+            match = re.search(r"(-?\d+(?:\.\d+)?)_(-?\d+(?:\.\d+)?)\.csv$", path)
+            if match is None:
+                continue
+            df = pd.read_csv(path, index_col="Date", parse_dates=True)
+            add(site_key(*match.groups()), frame_parameters(df))
+    return sites
+
+
+def synthetic_values(parameter, lat, lon, dates, seed=0):
+    """Seasonal cycle plus noise for datetime64[D] dates, fixed per (seed, site, day)
+
+    T2M_MIN is T2M_MAX minus the (positive) T2M_RANGE of the same day and T2M
+    lies halfway between them, so the minimum never exceeds the maximum.
+    """
+    if parameter in ("T2M_MIN", "T2M"):
+        high = synthetic_values("T2M_MAX", lat, lon, dates, seed)
+        spread = synthetic_values("T2M_RANGE", lat, lon, dates, seed)
+        if parameter == "T2M":
+            spread = spread / 2
+        lower = SYNTHETIC[parameter][3]
+        return np.round(np.clip(high - spread, lower, None), 2)
+    mean, amplitude, noise, lower, upper = SYNTHETIC.get(parameter, DEFAULT_SYNTHETIC)
+    days = (dates - SYNTHETIC_EPOCH).astype(np.int64)
+    # noise is drawn for every day since the epoch so any window sees the same days
+    span = max(int(days.max()) + 1 if len(days) else 1, 1)
+    stream = zlib.crc32(f"{seed}:{site_key(lat, lon)}:{parameter}".encode())
+    draws = np.random.default_rng(stream).normal(0.0, noise, span)
+    # warmest around day 200 in the north, day 17 in the south
+    peak = 200 if lat >= 0 else 17
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+    season = np.cos(2 * np.pi * (day_of_year - peak) / 365.25)
+    cooling = 0.5 * (abs(lat) - 40) if parameter == "T2M_MAX" else 0.0
+    values = mean - cooling + amplitude * season
+    values = values + np.where(days >= 0, draws[np.clip(days, 0, None)], 0.0)
+    return np.round(np.clip(values, lower, upper), 2)
+
+
+def power_response(lat, lon, parameters, dates, columns):
+    """POWER daily point JSON for {parameter: values} over dates"""
+    keys = pd.DatetimeIndex(dates).strftime("%Y%m%d")
+    return {
+        "type": "Feature",
+        "geometry": {"type": "Point", "coordinates": [lon, lat, 0.0]},
+        "properties": {
+            "parameter": {
+                parameter: dict(zip(keys, map(float, columns[parameter])))
+                for parameter in parameters
+            }
+        },
+        "header": {
+            "title": "NASA/POWER stand-in",
+            "fill_value": FILL_VALUE,
+            "start": keys[0] if len(keys) else None,
+            "end": keys[-1] if len(keys) else None,
+        },
+        "messages": [],
+        "parameters": {parameter: {"units": ""} for parameter in parameters},
+    }
+
+
+class TokenBucket:
+    """rate requests per second on average, up to burst at once"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self):
+        """0 when a request may pass, else the seconds until one can"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PowerServer:
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        fixtures=None,
+        registry=True,
+        synthetic=True,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        rate_limit=None,
+        burst=None,
+        seed=None,
+    ):
+        self.host = host
+        self.port = port
+        self.sites = load_fixtures(fixtures, registry)
+        self.synthetic = synthetic
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.seed = 0 if seed is None else seed
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "served": 0, "in_flight": 0, "max_in_flight": 0}
+        self._thread = None
+        self._loop = None
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}{POWER_PATH}"
+
+    def count(self, status):
+        self.stats[status] = self.stats.get(status, 0) + 1
+
+    def values(self, lat, lon, parameter, dates):
+        stored = self.sites.get(site_key(lat, lon), {}).get(parameter)
+        values = np.full(len(dates), np.nan)
+        if stored is not None:
+            values = stored.reindex(pd.DatetimeIndex(dates)).to_numpy(
+                dtype=float, copy=True
+            )
+        missing = np.isnan(values)
+        if missing.any():
+            if self.synthetic:
+                generated = synthetic_values(parameter, lat, lon, dates, self.seed)
+                values[missing] = generated[missing]
+            else:
+                values[missing] = FILL_VALUE
+        return values
+
+    def respond(self, query):
+        """(status, body) for one request's query parameters"""
+        try:
+            parameters = [p for p in query["parameters"].split(",") if p]
+            lat, lon = float(query["latitude"]), float(query["longitude"])
+            start = pd.to_datetime(query["start"], format="%Y%m%d")
+            end = pd.to_datetime(query["end"], format="%Y%m%d")
+        except (KeyError, ValueError) as e:
+            return 422, {"messages": [f"invalid request: {e}"]}
+        if not parameters or end < start:
+            return 422, {"messages": ["invalid request: no parameters or empty range"]}
+        dates = pd.date_range(start, end).to_numpy(dtype="datetime64[D]")
+        columns = {p: self.values(lat, lon, p, dates) for p in parameters}
+        return 200, power_response(lat, lon, parameters, dates, columns)
+
+    async def handle(self, request):
+        from aiohttp import web
+
+        self.stats["requests"] += 1
+        if self.bucket is not None:
+            wait = self.bucket.take()
+            if wait:
+                self.count(429)
+                return web.json_response(
+                    {"messages": ["rate limit exceeded"]},
+                    status=429,
+                    headers={"Retry-After": f"{wait:.3f}"},
+                )
+        self.stats["in_flight"] += 1
+        self.stats["max_in_flight"] = max(
+            self.stats["max_in_flight"], self.stats["in_flight"]
+        )
+        try:
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            if delay:
+                await asyncio.sleep(delay)
+            if self.random.random() < self.error_rate:
+                status = self.random.choice(ERROR_STATUSES)
+                self.count(status)
+                return web.json_response(
+                    {"messages": ["injected error"]}, status=status
+                )
+            status, body = self.respond(request.query)
+            self.count(status)
+            if status == 200:
+                self.stats["served"] += 1
+            return web.json_response(body, status=status)
+        finally:
+            self.stats["in_flight"] -= 1
+
+    def app(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get(POWER_PATH, self.handle)
+        return app
+
+    async def _serve(self, ready):
+        from aiohttp import web
+
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        ready.set()
+
+    def start(self):
+        """Serve from a background thread; returns once the port is bound"""
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.create_task(self._serve(ready))
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        if not ready.wait(timeout=10):
+            raise RuntimeError("POWER stand-in did not start")
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        future = asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop)
+        future.result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main(argv=None):
+    from aiohttp import web
+
+    parser = argparse.ArgumentParser(
+        prog="python -m engine.power_server",
+        description="Serve NASA POWER-format daily data from fixtures or synthetic weather.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", help="directory of POWER JSON / CSV fixtures")
+    parser.add_argument(
+        "--no-registry",
+        dest="registry",
+        action="store_false",
+        help="do not serve the registered commodities' weather CSVs",
+    )
+    parser.add_argument(
+        "--no-synthetic",
+        dest="synthetic",
+        action="store_false",
+        help="fill uncovered days with -999 instead of synthetic values",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds per request"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="extra random seconds"
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="share of requests failing with 5xx",
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=None, help="requests per second before 429"
+    )
+    parser.add_argument("--burst", type=float, default=None, help="rate limit burst")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    args = parser.parse_args(argv)
+
+    server = PowerServer(
+        args.host,
+        args.port,
+        args.fixtures,
+        args.registry,
+        args.synthetic,
+        args.latency,
+        args.jitter,
+        args.error_rate,
+        args.rate_limit,
+        args.burst,
+        args.seed,
+    )
+    print(f"Serving POWER stand-in at {server.url}")
+    web.run_app(server.app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
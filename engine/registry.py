@@ -0,0 +1,242 @@
+"""Commodity definitions shared by every backtest, A/B test and portfolio run.
+
+Each entry holds what used to be hard-coded at the top of the per-crop
+modules: the futures ticker, where the weather comes from, the extreme
+temperature rules, the roll calendar and the estimated roll drag. Optional
+"accumulators" add derived columns (GDD, KDD, THI stress) that rules can
+use; see engine/accumulators.py. Adding a commodity only needs a new entry
+here (or a call to register_commodity).
+"""
+
+import copy
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRICE_START = "2015-01-01"
+PRICE_END = "2025-11-24"
+
+# Signals from this year on are dropped because their exits fall past the
+# end of the price history.
+SIGNAL_CUTOFF_YEAR = 2025
+
+COMMODITIES = {
+    "corn": {
+        "label": "Corn",
+        "ticker": "ZC=F",
+        "weather": {
+            "csv": "crops_data/iowa_corn_temps_10y.csv",
+            "lat": 42.03,
+            "lon": -93.64,
+            "parameters": ["T2M_MAX", "T2M_MIN"],
+        },
+        "rules": [
+            {
+                "name": "hot",
+                "column": "Max_Temp_C",
+                "op": ">",
+                "threshold": 34,
+                "months": [7, 8],
+            },
+            {
+                "name": "cold",
+                "column": "Min_Temp_C",
+                "op": "<",
+                "threshold": 0,
+                "months": [5, 9],
+            },
+        ],
+        "accumulators": [
+            {
+                "name": "GDD_season",
+                "kind": "gdd",
+                "base": 10,
+                "cap": 30,
+                "season_start": 4,
+            },
+            {"name": "KDD_7d", "kind": "kdd", "threshold": 29, "window": 7},
+        ],
+        "roll_months": [3, 5, 7, 9, 12],
+        "drag": 0.02,
+        "holding_period": 10,
+    },
+    "soybeans": {
+        "label": "Soybeans",
+        "ticker": "ZS=F",
+        "weather": {
+            "csv": "crops_data/iowa_soybean_temps_10y.csv",
+            "lat": 41.58,
+            "lon": -93.62,
+            "parameters": ["T2M_MAX", "T2M_MIN"],
+        },
+        "rules": [
+            {
+                "name": "hot",
+                "column": "Max_Temp_C",
+                "op": ">",
+                "threshold": 33,
+                "months": [8],
+            },
+            {
+                "name": "cold",
+                "column": "Min_Temp_C",
+                "op": "<",
+                "threshold": -2,
+                "months": [9, 10],
+            },
+        ],
+        "accumulators": [
+            {
+                "name": "GDD_season",
+                "kind": "gdd",
+                "base": 10,
+                "cap": 30,
+                "season_start": 4,
+            },
+            {"name": "KDD_7d", "kind": "kdd", "threshold": 30, "window": 7},
+        ],
+        "roll_months": [1, 3, 5, 7, 8, 9, 11],
+        "drag": 0.015,
+        "holding_period": 8,
+    },
+    "coffee": {
+        "label": "Coffee",
+        "ticker": "KC=F",
+        "weather": {
+            "csv": "crops_data/varginha_coffee_temps_10y.csv",
+            "lat": -21.55,
+            "lon": -45.43,
+            "parameters": ["T2M_MAX", "T2M_MIN"],
+        },
+        "rules": [
+            {
+                "name": "hot",
+                "column": "Max_Temp_C",
+                "op": ">",
+                "threshold": 33,
+                "months": [9, 10],
+            },
+            {
+                "name": "cold",
+                "column": "Min_Temp_C",
+                "op": "<",
+                "threshold": 2,
+                "months": [6, 7, 8],
+            },
+        ],
+        "roll_months": [3, 5, 7, 9, 12],
+        "drag": 0.015,
+        "holding_period": 7,
+    },
+    "lean_hogs": {
+        "label": "Lean Hogs",
+        "ticker": "HE=F",
+        "weather": {
+            "csv": "crops_data/iowa_hog_weather_10y.csv",
+            "lat": 43.08,
+            "lon": -96.17,
+            "parameters": ["T2M_MAX", "T2M_MIN", "RH2M"],
+        },
+        "rules": [
+            # the old hot rule used month 13 and never fired; pigs suffer from
+            # heat and humidity together, so it now uses the 3-day mean THI
+            # (84 and above is the emergency band for swine)
+            {
+                "name": "hot",
+                "column": "THI_mean_3d",
+                "op": ">=",
+                "threshold": 84,
+                "months": [6, 7, 8],
+            },
+            {
+                "name": "cold",
+                "column": "Min_Temp_C",
+                "op": "<",
+                "threshold": -20,
+                "months": [12, 1, 2, 3],
+            },
+        ],
+        "accumulators": [
+            {"name": "THI_mean_3d", "kind": "mean", "column": "THI", "window": 3},
+            {
+                "name": "THI_stress_7d",
+                "kind": "excess",
+                "column": "THI",
+                "threshold": 79,
+                "window": 7,
+            },
+        ],
+        "roll_months": [2, 4, 6, 8, 10, 12],
+        "drag": 0.025,
+        "holding_period": 6,
+    },
+    "wheat": {
+        "label": "Wheat",
+        "ticker": "KE=F",
+        "weather": {
+            # wheat_data.py was never written, so only the stored CSV exists
+            "csv": "crops_data/kansas_wheat_temps_10y.csv",
+            "lat": None,
+            "lon": None,
+            "parameters": ["T2M_MAX", "T2M_MIN"],
+        },
+        "rules": [
+            {
+                "name": "hot",
+                "column": "Max_Temp_C",
+                "op": ">",
+                "threshold": 35,
+                "months": [5, 6],
+            },
+            {
+                "name": "cold",
+                "column": "Min_Temp_C",
+                "op": "<",
+                "threshold": -3,
+                "months": [4, 5],
+            },
+        ],
+        "roll_months": [3, 5, 7, 9, 12],
+        "drag": 0.0,  # never estimated; wheat had no roll-yield run
+        "holding_period": 6,
+    },
+}
+
+REQUIRED_KEYS = [
+    "label",
+    "ticker",
+    "weather",
+    "rules",
+    "roll_months",
+    "drag",
+    "holding_period",
+]
+
+
+def get_commodity(name):
+    try:
+        return COMMODITIES[name]
+    except KeyError:
+        raise KeyError(
+            f"Unknown commodity '{name}'. Registered: {', '.join(sorted(COMMODITIES))}"
+        ) from None
+
+
+def list_commodities():
+    return sorted(COMMODITIES)
+
+
+def register_commodity(name, spec):
+    """Add (or replace) a commodity definition after checking its keys"""
+    missing = [key for key in REQUIRED_KEYS if key not in spec]
+    if missing:
+        raise ValueError(f"Commodity '{name}' is missing {', '.join(missing)}")
+    COMMODITIES[name] = copy.deepcopy(spec)
+    return COMMODITIES[name]
+
+
+def weather_path(name):
+    path = get_commodity(name)["weather"]["csv"]
+    if os.path.isabs(path):
+        return path
+    return os.path.join(ROOT_DIR, path)
@@ -0,0 +1,189 @@
+"""Price and weather panels shared with worker processes without copying.
+
+publish_panel loads every commodity once in the parent and writes
+
+- prices: (n_dates, n_commodities) close matrix on the union of trading days
+- weather: (n_commodities, n_days, n_columns) cube on the union of weather days
+
+(NaN where a commodity has no value) into multiprocessing.shared_memory
+blocks. A SharedPanel pickles as a few names and shapes, so passing it to a
+ProcessPoolExecutor costs nothing; each worker attaches read-only NumPy
+views onto the same memory instead of receiving its own DataFrames.
+
+    with publish_panel(["corn", "coffee"]) as panel:
+        pool.map(work, [panel] * 64, ...)
+
+    def work(panel, ...):
+        prices = panel.prices("corn")   # Series over the shared matrix
+        df = panel.weather("corn")      # DataFrame over the shared cube
+
+Workers must come from the publishing process (any start method); the
+parent unlinks the blocks when the panel is closed.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from engine.data import load_weather
+from engine.panel import load_panel
+from engine.registry import PRICE_END, PRICE_START
+
+
+class SharedPanel:
+    def __init__(self, blocks, meta, owner):
+        self._blocks = blocks  # name -> (SharedMemory, shape, dtype)
+        self.meta = meta
+        self._owner = owner
+        self._views = {}
+
+    @classmethod
+    def publish(cls, arrays, meta=None):
+        """Copy arrays into fresh shared memory blocks (done once, in the parent)"""
+        blocks = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+            blocks[name] = (block, array.shape, array.dtype.str)
+        return cls(blocks, meta or {}, owner=True)
+
+    def __getstate__(self):
+        return {
+            "blocks": {
+                name: (block.name, shape, dtype)
+                for name, (block, shape, dtype) in self._blocks.items()
+            },
+            "meta": self.meta,
+        }
+
+    def __setstate__(self, state):
+        self._blocks = {
+            name: (shared_memory.SharedMemory(name=block), tuple(shape), dtype)
+            for name, (block, shape, dtype) in state["blocks"].items()
+        }
+        self.meta = state["meta"]
+        self._owner = False
+        self._views = {}
+
+    def __getitem__(self, name):
+        """Read-only view of one published array"""
+        if name not in self._views:
+            block, shape, dtype = self._blocks[name]
+            view = np.ndarray(shape, np.dtype(dtype), buffer=block.buf)
+            view.flags.writeable = False
+            self._views[name] = view
+        return self._views[name]
+
+    @property
+    def nbytes(self):
+        return sum(block.size for block, _, _ in self._blocks.values())
+
+    def close(self):
+        """Drop the views and detach; the owner also frees the memory"""
+        self._views.clear()
+        for block, _, _ in self._blocks.values():
+            block.close()
+            if self._owner:
+                block.unlink()
+        self._blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def index(self, name):
+        return self.meta["commodities"].index(name)
+
+    def prices(self, name):
+        """Close prices of one commodity on its own trading days"""
+        column = self["prices"][:, self.index(name)]
+        dates = self["price_dates"]
+        valid = ~np.isnan(column)
+        first, last = np.flatnonzero(valid)[[0, -1]]
+        if valid[first : last + 1].all():
+            # contiguous run: a strided view, nothing is copied
+            column, dates = column[first : last + 1], dates[first : last + 1]
+        else:
+            column, dates = column[valid], dates[valid]
+        return pd.Series(
+            column, index=pd.DatetimeIndex(dates, name="Date"), name="Close", copy=False
+        )
+
+    def weather(self, name):
+        """Weather frame of one commodity, with the columns it actually has"""
+        i = self.index(name)
+        columns = self.meta["weather_columns"][name]
+        positions = [self.meta["all_weather_columns"].index(c) for c in columns]
+        cube = self["weather"][i]
+        rows = self["weather_rows"][i]
+        first, last = self.meta["weather_spans"][name]
+        values = cube[first : last + 1]
+        if positions == list(range(len(positions))):
+            values = values[:, : len(positions)]
+        else:
+            values = values[:, positions]
+        dates = self["weather_dates"][first : last + 1]
+        present = rows[first : last + 1]
+        if not present.all():
+            values, dates = values[present], dates[present]
+        return pd.DataFrame(
+            values,
+            index=pd.DatetimeIndex(dates, name="Date"),
+            columns=columns,
+            copy=False,
+        )
+
+
+def price_matrix(names, start=PRICE_START, end=PRICE_END, offline=False):
+    """(dates, matrix) of close prices on the union of trading days, unfilled"""
+    panel = load_panel(names, start, end, offline, calendar="union", fill="none")
+    return panel.dates.values, panel.values
+
+
+def weather_cube(names, cache=None):
+    """(dates, cube, present, columns per commodity, all columns, spans)"""
+    frames = {name: load_weather(name, cache=cache) for name in names}
+    dates = frames[names[0]].index
+    all_columns = []
+    for df in frames.values():
+        dates = dates.union(df.index)
+        all_columns += [c for c in df.columns if c not in all_columns]
+    cube = np.full((len(names), len(dates), len(all_columns)), np.nan)
+    present = np.zeros((len(names), len(dates)), dtype=bool)
+    spans = {}
+    for i, (name, df) in enumerate(frames.items()):
+        rows = dates.get_indexer(df.index)
+        cols = [all_columns.index(c) for c in df.columns]
+        cube[i, rows[:, None], cols] = df.to_numpy(dtype=float)
+        present[i, rows] = True
+        spans[name] = (int(rows.min()), int(rows.max()))
+    columns = {name: list(df.columns) for name, df in frames.items()}
+    return dates.values, cube, present, columns, all_columns, spans
+
+
+def publish_panel(names, start=PRICE_START, end=PRICE_END, offline=False, cache=None):
+    """Load prices and weather for names once and put them in shared memory"""
+    names = list(names)
+    price_dates, prices = price_matrix(names, start, end, offline)
+    weather_dates, cube, present, columns, all_columns, spans = weather_cube(
+        names, cache
+    )
+    return SharedPanel.publish(
+        {
+            "prices": prices,
+            "price_dates": price_dates,
+            "weather": cube,
+            "weather_dates": weather_dates,
+            "weather_rows": present,
+        },
+        {
+            "commodities": names,
+            "weather_columns": columns,
+            "all_weather_columns": all_columns,
+            "weather_spans": spans,
+        },
+    )
@@ -0,0 +1,169 @@
+"""Bitmap index of rule hits across many sites and rules.
+
+Every series (one per (commodity, rule), or any labelled date set) is a row
+of packed bits on one shared axis of consecutive calendar days, so combining
+series is bytewise NumPy work instead of DatetimeIndex unions and Python
+sets:
+
+- any / all: OR / AND of the selected rows
+- at_least(k): days on which k or more of the rows fire (k-of-n consensus)
+- popcount: set days per row
+- month_counts: set days per row and calendar month
+- first_in_month: only the first set day of each month, per row
+
+Results are packed bitmaps on the same axis and can be fed back into these
+operations; dates() turns one into Timestamps. buy_signals reproduces
+engine.signals.buy_signals_from_extremes for a set of rows.
+
+    index = SignalIndex.from_rules(list_commodities())
+    consensus = index.at_least(3)              # 3 or more site-rules agree
+    hot_any = index.any([("corn", "hot"), ("soybeans", "hot")])
+    index.dates(index.first_in_month(hot_any))
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.compact import days_to_bitmap, from_day_numbers, to_day_numbers
+from engine.data import load_weather
+from engine.registry import SIGNAL_CUTOFF_YEAR, get_commodity
+from engine.signals import detect_extremes
+
+ROW_CHUNK = 4096
+
+
+class SignalIndex:
+    def __init__(self, first_day, n_days, labels, bits):
+        self.first_day = int(first_day)
+        self.n_days = int(n_days)
+        self.labels = list(labels)
+        self.bits = np.ascontiguousarray(bits, dtype=np.uint8)
+        months = from_day_numbers(self.first_day + np.arange(self.n_days))
+        months = months.year * 12 + months.month
+        self.month_starts = np.flatnonzero(
+            np.r_[True, months[1:] != months[:-1]]
+        ).astype(np.intp)
+        # year * 12 + month, as in engine.ab_testing.month_codes
+        self.month_codes = np.asarray(months[self.month_starts], dtype=np.int64)
+
+    @classmethod
+    def from_dates(cls, series):
+        """Index over {label: dates}"""
+        days = {label: to_day_numbers(dates) for label, dates in series.items()}
+        non_empty = [d for d in days.values() if len(d)]
+        first = min(int(d.min()) for d in non_empty) if non_empty else 0
+        last = max(int(d.max()) for d in non_empty) if non_empty else 0
+        n_days = last - first + 1
+        bits = np.zeros((len(days), -(-n_days // 8)), dtype=np.uint8)
+        for i, row_days in enumerate(days.values()):
+            bits[i] = days_to_bitmap(row_days, first, n_days)
+        return cls(first, n_days, list(days), bits)
+
+    @classmethod
+    def from_rules(cls, names, weather=None):
+        """One row per (commodity, rule name) from the registry rules"""
+        series = {}
+        for name in names:
+            df = weather[name] if weather is not None else load_weather(name)
+            rules = get_commodity(name)["rules"]
+            for rule, dates in zip(rules, detect_extremes(df, rules)):
+                series[(name, rule["name"])] = dates
+        return cls.from_dates(series)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def nbytes(self):
+        return self.bits.nbytes
+
+    def rows(self, labels=None):
+        """Row numbers of labels (None: every row); a commodity name selects
+        all of its rules"""
+        if labels is None:
+            return np.arange(len(self.labels))
+        if isinstance(labels, (str, tuple)):
+            labels = [labels]
+        rows = []
+        for label in labels:
+            if label in self.labels:
+                rows.append(self.labels.index(label))
+            else:
+                matches = [
+                    i
+                    for i, own in enumerate(self.labels)
+                    if isinstance(own, tuple) and own[0] == label
+                ]
+                if not matches:
+                    raise KeyError(f"no series labelled {label!r}")
+                rows.extend(matches)
+        return np.asarray(rows, dtype=np.intp)
+
+    def bitmap(self, dates):
+        """Packed bitmap of arbitrary dates on this index's day axis"""
+        return days_to_bitmap(to_day_numbers(dates), self.first_day, self.n_days)
+
+    def unpack(self, bitmaps):
+        return np.unpackbits(bitmaps, axis=-1, count=self.n_days).astype(bool)
+
+    def pack(self, bits):
+        return np.packbits(bits, axis=-1)
+
+    def any(self, labels=None):
+        return np.bitwise_or.reduce(self.bits[self.rows(labels)], axis=0)
+
+    def all(self, labels=None):
+        return np.bitwise_and.reduce(self.bits[self.rows(labels)], axis=0)
+
+    def counts(self, labels=None):
+        """Number of selected rows set on every day"""
+        rows = self.rows(labels)
+        counts = np.zeros(self.n_days, dtype=np.int32)
+        for start in range(0, len(rows), ROW_CHUNK):
+            chunk = self.bits[rows[start : start + ROW_CHUNK]]
+            counts += np.unpackbits(chunk, axis=-1, count=self.n_days).sum(
+                axis=0, dtype=np.int32
+            )
+        return counts
+
+    def at_least(self, k, labels=None):
+        """Days on which k or more of the selected rows are set"""
+        return self.pack(self.counts(labels) >= k)
+
+    def popcount(self, bitmaps=None):
+        """Set days of each bitmap (default: every row of the index)"""
+        bitmaps = self.bits if bitmaps is None else bitmaps
+        return np.bitwise_count(bitmaps).sum(axis=-1, dtype=np.int64)
+
+    def month_counts(self, bitmaps=None):
+        """(..., n_months) set days per calendar month; columns follow month_codes"""
+        bitmaps = self.bits if bitmaps is None else bitmaps
+        return np.add.reduceat(
+            self.unpack(bitmaps).astype(np.int32), self.month_starts, axis=-1
+        )
+
+    def first_in_month(self, bitmaps):
+        """Keep only the first set day of every calendar month"""
+        bits = self.unpack(bitmaps)
+        flat = bits.reshape(-1, self.n_days)
+        positions = np.where(flat, np.arange(self.n_days), self.n_days)
+        first = np.minimum.reduceat(positions, self.month_starts, axis=-1)
+        rows, months = np.nonzero(first < self.n_days)
+        kept = np.zeros_like(flat)
+        kept[rows, first[rows, months]] = True
+        return self.pack(kept.reshape(bits.shape))
+
+    def days(self, bitmap):
+        return (np.flatnonzero(self.unpack(bitmap)) + self.first_day).astype(np.int32)
+
+    def dates(self, bitmap):
+        """DatetimeIndex of the set days of one bitmap"""
+        return from_day_numbers(self.days(bitmap))
+
+    def buy_signals(self, labels, prices, cutoff_year=SIGNAL_CUTOFF_YEAR):
+        """First tradable hit of every month over the selected rows, before
+        cutoff_year (as engine.signals.buy_signals_from_extremes)"""
+        trading_days = pd.DatetimeIndex(prices.index)
+        tradable = self.bitmap(trading_days[trading_days.year < cutoff_year])
+        hits = self.any(labels) & tradable
+        return list(self.dates(self.first_in_month(hits)))
@@ -0,0 +1,67 @@
+"""Extreme-temperature detection and buy-signal generation.
+
+Rules come from the commodity registry, e.g.
+{"name": "hot", "column": "Max_Temp_C", "op": ">", "threshold": 34, "months": [7, 8]}
+and are evaluated on whole columns at once instead of row by row. Rules
+with "kind": "zscore" or "percentile" are measured against the site's
+day-of-year climatology (see engine/climatology.py): the one passed in,
+or else one built from the days before each month. Rules with "min_run",
+"max_gap" or "min_degree_days" only fire on sustained events (see
+engine/events.py).
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.climatology import rule_values
+from engine.events import apply_runs
+from engine.registry import SIGNAL_CUTOFF_YEAR
+
+OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+def rule_mask(df, rule, climatology=None):
+    values, threshold = rule_values(rule, df, climatology)
+    return mask_from_values(rule, df.index, values, threshold)
+
+
+def mask_from_values(rule, dates, values, threshold):
+    """Rule mask over values whose last axis follows dates"""
+    mask = OPERATORS[rule["op"]](values, threshold)
+    if rule.get("months"):
+        mask &= np.isin(pd.DatetimeIndex(dates).month, rule["months"])
+    return apply_runs(rule, mask, dates, values, threshold)
+
+
+def detect_extremes(df, rules, climatology=None):
+    """Return one DatetimeIndex of extreme days per rule, in rule order"""
+    return [df.index[rule_mask(df, rule, climatology)].normalize() for rule in rules]
+
+
+def first_in_month(dates, prices, cutoff_year=SIGNAL_CUTOFF_YEAR):
+    """Keep the first tradable date of every month, dropping dates from cutoff_year on"""
+    dates = pd.DatetimeIndex(dates).sort_values()
+    dates = dates[dates.isin(prices.index) & (dates.year < cutoff_year)]
+    month_codes = dates.year * 12 + dates.month - 1
+    _, first = np.unique(month_codes, return_index=True)
+    return list(dates[first])
+
+
+def buy_signals_from_extremes(extremes, prices, cutoff_year=SIGNAL_CUTOFF_YEAR):
+    all_dates = pd.DatetimeIndex([])
+    for dates in extremes:
+        all_dates = all_dates.union(pd.DatetimeIndex(dates))
+    return first_in_month(all_dates, prices, cutoff_year)
+
+
+def get_buy_signals(
+    df, prices, rules, cutoff_year=SIGNAL_CUTOFF_YEAR, climatology=None
+):
+    """Calculate buy signals for a weather frame without displaying plots"""
+    extremes = detect_extremes(df, rules, climatology)
+    return buy_signals_from_extremes(extremes, prices, cutoff_year)
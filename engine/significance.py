@@ -0,0 +1,189 @@
+"""Permutation tests for a whole family of hypotheses at once.
+
+A hypothesis is one (commodity, rule variant, holding period): its months on
+a common grid are labelled by whether they contain a buy signal, and the
+statistic is the difference between the mean return of signal and other
+months (as in engine/ab_testing.py). Every hypothesis is tested against the
+same (repetition, n_months) matrix of shuffled month positions, so the
+shuffles are drawn once and the simulated differences for all hypotheses
+come from batched gathers and matrix products, chunked to stay under
+max_bytes of memory.
+
+The p-values of the family are then corrected together:
+
+- holm: Holm-Bonferroni step-down, controls the family-wise error rate
+- bh: Benjamini-Hochberg step-up, controls the false discovery rate
+
+Hypotheses whose months all fall in one group get a NaN p-value and are
+left out of the corrections.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.ab_testing import (
+    month_grid,
+    month_label_matrix,
+    month_returns,
+    signal_month_codes,
+)
+from engine.backtest import commodity_costs
+from engine.bootstrap import MAX_BYTES
+from engine.data import load_prices, load_weather
+from engine.registry import PRICE_END, PRICE_START, SIGNAL_CUTOFF_YEAR, get_commodity
+from engine.signals import buy_signals_from_extremes, detect_extremes
+
+CORRECTIONS = ("holm", "bh")
+
+
+def permutation_matrix(n_months, repetition, rng):
+    """(repetition, n_months) shuffled month positions, shared by every hypothesis"""
+    return rng.permuted(np.tile(np.arange(n_months), (repetition, 1)), axis=1)
+
+
+def shuffled_differences(labels, returns, permutations, max_bytes=MAX_BYTES):
+    """(n_hypotheses, n_permutations) differences in means under each shuffle.
+
+    labels and returns are (n_hypotheses, n_months); permutation p moves the
+    label of month permutations[p, m] onto month m.
+    """
+    labels = np.asarray(labels, dtype=float)
+    returns = np.asarray(returns, dtype=float)
+    n_signal = labels.sum(axis=1, keepdims=True)
+    n_other = labels.shape[1] - n_signal
+    total = returns.sum(axis=1, keepdims=True)
+    chunk = max(1, int(max_bytes // (8 * labels.size)))
+    sums = np.empty((len(labels), len(permutations)))
+    for start in range(0, len(permutations), chunk):
+        shuffled = labels[:, permutations[start : start + chunk]]
+        sums[:, start : start + chunk] = (shuffled @ returns[:, :, None])[..., 0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / n_signal - (total - sums) / n_other
+
+
+def batch_permutation_test(
+    labels, returns, repetition=5000, seed=None, max_bytes=MAX_BYTES
+):
+    """(observed differences, p-values) for every row of labels/returns"""
+    labels = np.atleast_2d(labels)
+    returns = np.atleast_2d(returns)
+    n_months = labels.shape[1]
+    observed = shuffled_differences(labels, returns, np.arange(n_months)[None])[:, 0]
+    permutations = permutation_matrix(n_months, repetition, np.random.default_rng(seed))
+    differences = shuffled_differences(labels, returns, permutations, max_bytes)
+    p_values = np.count_nonzero(differences >= observed[:, None], axis=1) / repetition
+    p_values = np.where(np.isnan(observed), np.nan, p_values)
+    return observed, p_values
+
+
+def adjust_p_values(p_values, method="holm"):
+    """Corrected p-values for one family; NaN entries are not counted"""
+    if method not in CORRECTIONS:
+        raise ValueError(f"method must be one of {CORRECTIONS}, not '{method}'")
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p_values.shape, np.nan)
+    tested = ~np.isnan(p_values)
+    m = np.count_nonzero(tested)
+    if not m:
+        return adjusted
+    order = np.argsort(p_values[tested], kind="stable")
+    ranked = p_values[tested][order]
+    rank = np.arange(1, m + 1)
+    if method == "holm":
+        corrected = np.maximum.accumulate((m - rank + 1) * ranked)
+    else:
+        corrected = np.minimum.accumulate((m / rank * ranked)[::-1])[::-1]
+    values = np.empty(m)
+    values[order] = np.minimum(corrected, 1.0)
+    adjusted[tested] = values
+    return adjusted
+
+
+def commodity_hypotheses(
+    name,
+    holding_periods,
+    every_month,
+    roll_costs=True,
+    cutoff_year=SIGNAL_CUTOFF_YEAR,
+    prices=None,
+):
+    """(rows, labels, returns) for one commodity: all rules together and
+    every rule on its own, at every holding period"""
+    spec = get_commodity(name)
+    if prices is None:
+        prices = load_prices(name)
+    extremes = detect_extremes(load_weather(name), spec["rules"])
+    variants = {"all": extremes}
+    if len(extremes) > 1:
+        for rule, dates in zip(spec["rules"], extremes):
+            variants[rule["name"]] = [dates]
+    codes = [
+        signal_month_codes(buy_signals_from_extremes(chosen, prices, cutoff_year))
+        for chosen in variants.values()
+    ]
+    variant_labels = {}
+    for variant, signal_labels in zip(variants, month_label_matrix(codes, every_month)):
+        # a rule that gives the same months as another variant is the same test
+        if not any(
+            np.array_equal(signal_labels, seen) for seen in variant_labels.values()
+        ):
+            variant_labels[variant] = signal_labels
+
+    drag, roll_months = commodity_costs(spec, roll_costs)
+    buy_dates = pd.PeriodIndex(every_month).to_timestamp()
+    rows, labels, returns = [], [], []
+    for holding_period in holding_periods:
+        month_return = month_returns(
+            prices, buy_dates, holding_period, drag, roll_months
+        )
+        for variant, signal_labels in variant_labels.items():
+            rows.append(
+                {
+                    "commodity": name,
+                    "variant": variant,
+                    "holding_period": holding_period,
+                    "signal_months": int(signal_labels.sum()),
+                }
+            )
+            labels.append(signal_labels)
+            returns.append(month_return)
+    return rows, labels, returns
+
+
+def significance_table(
+    names,
+    holding_periods=None,
+    repetition=5000,
+    every_month=None,
+    seed=None,
+    roll_costs=True,
+    cutoff_year=SIGNAL_CUTOFF_YEAR,
+    start=PRICE_START,
+    end=PRICE_END,
+    offline=False,
+):
+    """Test every (commodity, rule variant, holding period) and correct the family.
+
+    holding_periods maps names to lists of months (default: the registry's).
+    """
+    holding_periods = holding_periods or {}
+    if every_month is None:
+        every_month = month_grid()
+    rows, labels, returns = [], [], []
+    for name in names:
+        periods = holding_periods.get(name, [get_commodity(name)["holding_period"]])
+        prices = load_prices(name, start, end, offline=offline)
+        parts = commodity_hypotheses(
+            name, periods, every_month, roll_costs, cutoff_year, prices
+        )
+        rows += parts[0]
+        labels += parts[1]
+        returns += parts[2]
+
+    observed, p_values = batch_permutation_test(labels, returns, repetition, seed)
+    table = pd.DataFrame(rows)
+    table["observed_difference"] = observed
+    table["p_value"] = p_values
+    for method in CORRECTIONS:
+        table[f"p_{method}"] = adjust_p_values(p_values, method)
+    return table
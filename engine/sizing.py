@@ -0,0 +1,121 @@
+"""Position-sizing policies for the multi-commodity portfolio.
+
+A policy is a plain dict like the signal rules, e.g.
+
+    {"policy": "equal"}
+    {"policy": "inverse_vol", "window": 63}
+    {"policy": "vol_target", "window": 63, "target": 0.15}
+    {"policy": "kelly", "window": 126, "scale": 0.5, "cap": 0.5}
+    {"policy": "min_variance", "window": 252}
+
+Everything a policy needs is computed once per panel as a (n_dates,
+n_commodities) matrix from rolling statistics of daily returns (pandas
+rolling windows, no per-day loop), or as one covariance matrix per day for
+min_variance; the backtest then sizes each trade with a few array lookups
+on the entry day:
+
+- share policies split the free cash between the commodities not already
+  held, in proportion to their score (equal: 1, inverse_vol: 1 / volatility)
+- target policies invest a fraction of current equity, capped by the free
+  cash (vol_target: target / volatility, kelly: scale * mean / variance,
+  clipped to [0, cap])
+- min_variance splits the free cash by the long-only minimum-variance
+  weights of the free commodities, from the rolling covariance matrices of
+  engine/covariance.py
+
+Until a commodity has min_periods days of returns the volatility-based
+policies do not trade it.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.bootstrap import TRADING_DAYS_PER_YEAR
+
+SIZING_POLICIES = ("equal", "inverse_vol", "vol_target", "kelly", "min_variance")
+SHARE_POLICIES = ("equal", "inverse_vol")
+DEFAULT_SIZING = {"policy": "equal"}
+DEFAULT_WINDOW = 63
+MIN_PERIODS = 20
+
+
+def daily_returns(values):
+    """Simple daily returns of a (n_dates, n_commodities) price matrix"""
+    returns = np.full(values.shape, np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1
+    return returns
+
+
+def rolling_moments(values, window=DEFAULT_WINDOW, min_periods=MIN_PERIODS):
+    """(mean, variance) of daily returns over the window ending on each day"""
+    rolling = pd.DataFrame(daily_returns(values)).rolling(
+        window, min_periods=min(min_periods, window)
+    )
+    return rolling.mean().to_numpy(), rolling.var().to_numpy()
+
+
+def rolling_volatility(values, window=DEFAULT_WINDOW, min_periods=MIN_PERIODS):
+    """Annualized volatility of daily returns over the window ending on each day"""
+    _, variance = rolling_moments(values, window, min_periods)
+    return np.sqrt(variance * TRADING_DAYS_PER_YEAR)
+
+
+def sizing_label(sizing):
+    """Short name of a policy for tables, e.g. "vol_target(window=63, target=0.15)" """
+    options = ", ".join(f"{k}={v}" for k, v in sizing.items() if k != "policy")
+    return f"{sizing['policy']}({options})" if options else sizing["policy"]
+
+
+def sizing_table(values, sizing=None):
+    """(kind, matrix): "share" scores or "target" equity fractions per day and
+    commodity for a price matrix, or "covariance" matrices per day"""
+    sizing = sizing or DEFAULT_SIZING
+    policy = sizing["policy"]
+    if policy not in SIZING_POLICIES:
+        raise ValueError(f"policy must be one of {SIZING_POLICIES}, not '{policy}'")
+    if policy == "equal":
+        return "share", np.ones(values.shape)
+
+    window = sizing.get("window", DEFAULT_WINDOW)
+    min_periods = sizing.get("min_periods", MIN_PERIODS)
+    if policy == "min_variance":
+        from engine.covariance import covariance_cache
+
+        cache = covariance_cache(values)
+        return "covariance", cache.covariances(window, min_periods=min_periods)
+
+    mean, variance = rolling_moments(values, window, min_periods)
+    volatility = np.sqrt(variance * TRADING_DAYS_PER_YEAR)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if policy == "inverse_vol":
+            matrix = 1 / volatility
+        elif policy == "vol_target":
+            matrix = sizing.get("target", 0.15) / volatility
+        else:
+            kelly = sizing.get("scale", 0.5) * mean / variance
+            matrix = np.clip(kelly, 0.0, sizing.get("cap", 0.5))
+    matrix = np.where(np.isfinite(matrix), matrix, 0.0)
+    return ("share" if policy in SHARE_POLICIES else "target"), matrix
+
+
+def position_cash(kind, matrix, start, j, cash, equity, free):
+    """Cash to put into commodity j on day start; free marks commodities not held"""
+    if kind == "share":
+        total = matrix[start, free].sum()
+        return cash * matrix[start, j] / total if total > 0 else 0.0
+    if kind == "covariance":
+        return cash * min_variance_weight(matrix[start], j, free)
+    return min(cash, equity * matrix[start, j])
+
+
+def min_variance_weight(covariance, j, free):
+    """j's long-only minimum-variance weight among the free commodities with
+    a full covariance history"""
+    known = free & np.isfinite(covariance[:, free]).all(axis=1)
+    if not known[j]:
+        return 0.0
+    chosen = np.flatnonzero(known)
+    sigma = covariance[np.ix_(chosen, chosen)]
+    weights = np.clip(np.linalg.pinv(sigma) @ np.ones(len(chosen)), 0.0, None)
+    total = weights.sum()
+    return weights[np.searchsorted(chosen, j)] / total if total > 0 else 0.0
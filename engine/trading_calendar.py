@@ -0,0 +1,89 @@
+"""Precomputed exit lookups on a price index.
+
+Every backtest exits at the trading day nearest to buy_date + h months.
+Doing that with pd.DateOffset and get_indexer(..., method="nearest") for
+each trade allocates an index per call; TradingCalendar instead computes,
+once per price index and offset, the exit position for every trading day,
+so resolving any batch of entries is one array gather:
+
+    calendar = trading_calendar(close.index)
+    sell_pos = calendar.months_ahead(buy_pos, holding_period)
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class TradingCalendar:
+    def __init__(self, index):
+        self.index = pd.DatetimeIndex(index)
+        self.times = self.index.values.astype("datetime64[ns]").view(np.int64)
+        self._months = {}
+        self._days = {}
+
+    def __len__(self):
+        return len(self.index)
+
+    def nearest(self, dates):
+        """Positions of the nearest trading days, ties going to the later day
+
+        (the same choice as get_indexer(..., method="nearest")).
+        """
+        targets = pd.DatetimeIndex(dates).values.astype("datetime64[ns]").view(np.int64)
+        right = np.searchsorted(self.times, targets, side="left")
+        left = np.clip(right - 1, 0, None)
+        right_clipped = np.clip(right, None, len(self.times) - 1)
+        use_left = (right == len(self.times)) | (
+            (right > 0)
+            & (targets - self.times[left] < self.times[right_clipped] - targets)
+        )
+        return np.where(use_left, left, right_clipped)
+
+    def month_table(self, months):
+        """Exit position months ahead of every trading day (built once per offset)"""
+        if months not in self._months:
+            self._months[months] = self.nearest(
+                self.index + pd.DateOffset(months=int(months))
+            )
+        return self._months[months]
+
+    def day_table(self, days):
+        """Nearest trading day position days calendar days after every trading day"""
+        if days not in self._days:
+            self._days[days] = self.nearest(self.index + pd.Timedelta(days=int(days)))
+        return self._days[days]
+
+    def months_ahead(self, positions, months):
+        """Gather exits for entry positions; months may be one int or one per entry"""
+        positions = np.asarray(positions, dtype=np.int64)
+        if np.ndim(months) == 0:
+            return self.month_table(int(months))[positions]
+        months = np.broadcast_to(np.asarray(months, dtype=np.int64), positions.shape)
+        out = np.empty(positions.shape, dtype=np.int64)
+        for h in np.unique(months):
+            chosen = months == h
+            out[chosen] = self.month_table(int(h))[positions[chosen]]
+        return out
+
+    def days_ahead(self, positions, days):
+        return self.day_table(int(days))[np.asarray(positions, dtype=np.int64)]
+
+    def trading_days_ahead(self, positions, days):
+        """Positions days trading days later, stopping at the last day"""
+        return np.minimum(np.asarray(positions) + days, len(self.index) - 1)
+
+
+_CALENDARS = {}
+MAX_CALENDARS = 16
+
+
+def trading_calendar(index):
+    """Shared TradingCalendar for a price index, reused across calls"""
+    index = pd.DatetimeIndex(index)
+    key = (len(index), hash(index.values.astype("datetime64[ns]").tobytes()))
+    calendar = _CALENDARS.get(key)
+    if calendar is None:
+        if len(_CALENDARS) >= MAX_CALENDARS:
+            _CALENDARS.pop(next(iter(_CALENDARS)))
+        calendar = _CALENDARS[key] = TradingCalendar(index)
+    return calendar
@@ -0,0 +1,238 @@
+"""Monte Carlo weather generator for stress-testing the signal rules.
+
+The model is fitted to a stored series (e.g. crops_data/iowa_corn_temps_10y.csv):
+
+- seasonal mean and standard deviation of each column as harmonic
+  regressions on day of year;
+- a VAR(1) on the standardized anomalies, so day-to-day persistence and the
+  correlation between max and min temperature are kept.
+
+simulate_weather produces an (n_sims, n_days, n_columns) array on any date
+index. stress_test runs every scenario through the registry rules, the
+first-in-month dedupe and a one-position backtest against the historical
+prices, all in batch: the backtest steps every scenario through its trades
+at once rather than looping over scenarios.
+"""
+
+import numpy as np
+import pandas as pd
+
+from engine.accumulators import batch_accumulate
+from engine.backtest import INITIAL_CASH, commodity_costs, month_drags
+from engine.climatology import compare_values, point_in_time_values
+from engine.data import close_prices, load_prices, load_weather, thi
+from engine.registry import SIGNAL_CUTOFF_YEAR, get_commodity
+from engine.signals import mask_from_values
+from engine.trading_calendar import trading_calendar
+
+COLUMNS = ("Max_Temp_C", "Min_Temp_C")
+
+
+def seasonal_design(dates, harmonics):
+    day = np.asarray(pd.DatetimeIndex(dates).dayofyear, dtype=float)
+    angle = 2 * np.pi * day / 365.25
+    terms = [np.ones_like(angle)]
+    for k in range(1, harmonics + 1):
+        terms += [np.cos(k * angle), np.sin(k * angle)]
+    return np.column_stack(terms)
+
+
+def fit_weather_model(df, columns=COLUMNS, harmonics=3):
+    values = df[list(columns)].to_numpy(dtype=float)
+    design = seasonal_design(df.index, harmonics)
+
+    mean_coef, *_ = np.linalg.lstsq(design, values, rcond=None)
+    residuals = values - design @ mean_coef
+    var_coef, *_ = np.linalg.lstsq(design, residuals**2, rcond=None)
+    std = np.sqrt(np.clip(design @ var_coef, 1e-6, None))
+    z = residuals / std
+
+    lagged, current = z[:-1], z[1:]
+    transition = np.linalg.solve(lagged.T @ lagged, lagged.T @ current).T
+    innovations = current - lagged @ transition.T
+    chol = np.linalg.cholesky(np.cov(innovations, rowvar=False))
+    return {
+        "columns": list(columns),
+        "harmonics": harmonics,
+        "mean_coef": mean_coef,
+        "var_coef": var_coef,
+        "transition": transition,
+        "chol": chol,
+    }
+
+
+def simulate_weather(model, dates, n_sims, seed=None):
+    """(n_sims, len(dates), n_columns) synthetic values on the given dates"""
+    rng = np.random.default_rng(seed)
+    design = seasonal_design(dates, model["harmonics"])
+    mean = design @ model["mean_coef"]
+    std = np.sqrt(np.clip(design @ model["var_coef"], 1e-6, None))
+    transition, chol = model["transition"], model["chol"]
+    n_days, n_columns = mean.shape
+
+    shocks = rng.standard_normal((n_days, n_sims, n_columns)) @ chol.T
+    z = np.empty((n_days, n_sims, n_columns))
+    z[0] = shocks[0]
+    for t in range(1, n_days):
+        z[t] = z[t - 1] @ transition.T + shocks[t]
+
+    sims = mean[None] + std[None] * z.transpose(1, 0, 2)
+    if model["columns"][:2] == ["Max_Temp_C", "Min_Temp_C"]:
+        high = np.maximum(sims[..., 0], sims[..., 1])
+        sims[..., 1] = np.minimum(sims[..., 0], sims[..., 1])
+        sims[..., 0] = high
+    return sims
+
+
+def uses_thi(spec):
+    referenced = [rule["column"] for rule in spec["rules"]]
+    referenced += [a.get("column") for a in spec.get("accumulators", [])]
+    return "THI" in referenced
+
+
+def simulated_columns(sims, dates, columns, accumulators):
+    """Add THI and accumulator columns derived from the simulated ones"""
+    columns = list(columns)
+    if "Humidity_Pct" in columns:
+        humidity = np.clip(sims[..., columns.index("Humidity_Pct")], 0, 100)
+        sims[..., columns.index("Humidity_Pct")] = humidity
+        sims = np.concatenate(
+            [sims, thi(sims[..., columns.index("Max_Temp_C")], humidity)[..., None]],
+            axis=-1,
+        )
+        columns.append("THI")
+    return batch_accumulate(sims, dates, columns, accumulators)
+
+
+def batch_rule_mask(sims, dates, columns, rules, climatology=None, observed=None):
+    """(n_sims, n_days) True where any rule fires
+
+    Without a climatology, anomaly rules are judged against the observed
+    frame's days before each month, as in engine.signals.
+    """
+    fired = np.zeros(sims.shape[:2], dtype=bool)
+    for rule in rules:
+        values = sims[..., columns.index(rule["column"])]
+        if climatology is None and rule.get("kind", "absolute") != "absolute":
+            values, threshold = point_in_time_values(rule, observed, values)
+        else:
+            values, threshold = compare_values(rule, dates, values, climatology)
+        fired |= mask_from_values(rule, dates, values, threshold)
+    return fired
+
+
+def first_in_month_mask(fired, dates):
+    """Keep only the first True of every calendar month in each row"""
+    dates = pd.DatetimeIndex(dates)
+    month_codes = np.asarray(dates.year * 12 + dates.month)
+    counts = np.cumsum(fired, axis=1)
+    month_start = np.r_[True, month_codes[1:] != month_codes[:-1]]
+    start_pos = np.maximum.accumulate(np.where(month_start, np.arange(len(dates)), 0))
+    before = np.where(start_pos > 0, counts[:, start_pos - 1], 0)
+    return fired & (counts - before == 1)
+
+
+def next_signal_table(signal_mask):
+    """Position of the first signal at or after every position (n if none),
+    with one extra column for position n"""
+    n = signal_mask.shape[1]
+    positions = np.where(signal_mask, np.arange(n), n)
+    table = np.minimum.accumulate(positions[:, ::-1], axis=1)[:, ::-1]
+    return np.concatenate([table, np.full((len(table), 1), n)], axis=1)
+
+
+def batch_backtest(close, signal_mask, holding_period, drag=0.0, roll_months=()):
+    """Final cash and trade count of the one-position strategy for every row
+
+    signal_mask is (n_scenarios, len(close)) on the close index. Every
+    scenario jumps from a trade to the next signal at or after its exit, so
+    the loop runs once per trade of the busiest scenario, over all of them.
+    """
+    close_values = close.to_numpy(dtype=float)
+    exits = trading_calendar(close.index).month_table(holding_period)
+    drags = month_drags(holding_period, drag, roll_months)
+    growth = close_values[exits] / close_values * drags[close.index.month - 1]
+    n = len(close_values)
+    # a trade blocks signals before its exit, and never its own day twice
+    resume = np.append(np.maximum(exits, np.arange(n) + 1), n)
+
+    table = next_signal_table(np.asarray(signal_mask, dtype=bool))
+    rows = np.arange(len(table))
+    final_cash = np.full(len(table), float(INITIAL_CASH))
+    n_trades = np.zeros(len(table), dtype=int)
+    pos = table[:, 0]
+    while True:
+        active = pos < n
+        if not active.any():
+            break
+        rows, pos = rows[active], pos[active]
+        final_cash[rows] *= growth[pos]
+        n_trades[rows] += 1
+        pos = table[rows, resume[pos]]
+    return final_cash, n_trades
+
+
+def stress_test(
+    name,
+    n_sims=1000,
+    holding_periods=None,
+    roll_costs=True,
+    seed=None,
+    harmonics=3,
+    prices=None,
+):
+    """Run n_sims synthetic weather histories through one commodity's strategy
+
+    holding_periods may be one int or a list; the same scenarios are reused
+    for every holding period. Returns one row per (holding period, scenario).
+    """
+    spec = get_commodity(name)
+    if holding_periods is None:
+        holding_periods = [spec["holding_period"]]
+    elif np.isscalar(holding_periods):
+        holding_periods = [holding_periods]
+    drag, roll_months = commodity_costs(spec, roll_costs)
+    df = load_weather(name)
+    close = close_prices(prices if prices is not None else load_prices(name))
+
+    # humidity is only simulated when an accumulator or rule needs THI
+    columns = list(COLUMNS)
+    if "Humidity_Pct" in df.columns and uses_thi(spec):
+        columns.append("Humidity_Pct")
+    model = fit_weather_model(df, columns, harmonics)
+    sims, columns = simulated_columns(
+        simulate_weather(model, df.index, n_sims, seed),
+        df.index,
+        model["columns"],
+        spec.get("accumulators", []),
+    )
+    # anomaly rules are judged against the observed climate, not the simulated one
+    fired = batch_rule_mask(sims, df.index, columns, spec["rules"], observed=df)
+
+    # same filters as get_buy_signals: tradable days before the cutoff year
+    positions = close.index.get_indexer(df.index)
+    tradable = (positions >= 0) & (df.index.year < SIGNAL_CUTOFF_YEAR)
+    signals = first_in_month_mask(fired & tradable[None], df.index)
+    signal_mask = np.zeros((n_sims, len(close)), dtype=bool)
+    signal_mask[:, positions[tradable]] = signals[:, tradable]
+
+    years = (close.index[-1] - close.index[0]).days / 365.25
+    frames = []
+    for holding_period in holding_periods:
+        final_cash, n_trades = batch_backtest(
+            close, signal_mask, holding_period, drag, roll_months
+        )
+        frames.append(
+            pd.DataFrame(
+                {
+                    "commodity": name,
+                    "holding_period": holding_period,
+                    "scenario": np.arange(n_sims),
+                    "signals": signals.sum(axis=1),
+                    "trades": n_trades,
+                    "final_cash": final_cash,
+                    "annualized_return": (final_cash / INITIAL_CASH) ** (1 / years) - 1,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
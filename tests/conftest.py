@@ -0,0 +1,35 @@
+"""Shared fixtures: stored weather from crops_data and synthetic prices.
+
+Prices are seeded business-day random walks instead of downloads, so the
+tests run offline and give the same series on every run.
+"""
+
+import zlib
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.data import load_weather
+from engine.registry import PRICE_END, PRICE_START, get_commodity, list_commodities
+
+
+@lru_cache(maxsize=None)
+def synthetic_prices(name, start=PRICE_START, end=PRICE_END):
+    dates = pd.bdate_range(start, end, inclusive="left", name="Date")
+    rng = np.random.default_rng(zlib.crc32(name.encode()))
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    return pd.DataFrame({"Close": close}, index=dates)
+
+
+@lru_cache(maxsize=None)
+def stored_weather(name):
+    return load_weather(name)
+
+
+@pytest.fixture(params=list_commodities())
+def commodity(request):
+    """(name, registry spec, weather frame, price frame) for each commodity"""
+    name = request.param
+    return name, get_commodity(name), stored_weather(name), synthetic_prices(name)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.ab_testing import (
+    month_codes,
+    month_grid,
+    month_label_matrix,
+    month_labels,
+    month_returns,
+    permutation_test,
+    signal_month_codes,
+    signal_months,
+)
+from engine.backtest import month_drags
+from engine.data import close_prices
+from tests.conftest import synthetic_prices
+
+
+@pytest.fixture
+def prices():
+    return synthetic_prices("corn")
+
+
+def test_month_returns_match_date_offsets(prices):
+    close = close_prices(prices)
+    buy_dates = pd.PeriodIndex(month_grid()).to_timestamp()
+    got = month_returns(prices, buy_dates, 3, 0.02, (3, 6, 9, 12))
+    drags = month_drags(3, 0.02, (3, 6, 9, 12))
+    for date, value in zip(buy_dates, got):
+        buy = close.index.get_indexer([date], method="nearest")[0]
+        sell_date = close.index[buy] + pd.DateOffset(months=3)
+        sell = close.index.get_indexer([sell_date], method="nearest")[0]
+        expected = (close.iloc[sell] / close.iloc[buy] - 1) * drags[
+            close.index[buy].month - 1
+        ]
+        assert value == pytest.approx(expected)
+
+
+def test_permutation_test_matches_pandas(prices):
+    signals = pd.to_datetime(["2015-07-14", "2015-07-20", "2017-08-01", "2019-01-31"])
+    result = permutation_test(signals, prices, 3, repetition=200, seed=5)
+    returns = pd.Series(result["returns"])
+    labels = pd.Series(result["labels"])
+    assert labels.sum() == 3
+    means = returns.groupby(labels).mean()
+    np.testing.assert_allclose(result["means"], [means[False], means[True]])
+
+    # the same shuffles, one at a time
+    shuffles = np.random.default_rng(5).permuted(
+        np.tile(result["labels"], (200, 1)), axis=1
+    )
+    differences = [
+        returns[shuffled].mean() - returns[~shuffled].mean() for shuffled in shuffles
+    ]
+    np.testing.assert_allclose(result["differences"], differences)
+    assert result["p_value"] == np.mean(
+        result["differences"] >= result["observed_difference"]
+    )
+
+
+def test_month_codes_accept_every_month_form():
+    expected = [2015 * 12 + 1, 2016 * 12 + 12]
+    for months in (
+        ["2015-01", "2016-12"],
+        pd.PeriodIndex(["2015-01", "2016-12"], freq="M").to_numpy(),
+        pd.to_datetime(["2015-01-31", "2016-12-01"]),
+        np.array(expected),
+    ):
+        np.testing.assert_array_equal(month_codes(months), expected)
+
+
+def test_signal_month_labels():
+    signals = pd.to_datetime(["2015-03-02", "2015-03-30", "2016-01-15", "2030-01-01"])
+    np.testing.assert_array_equal(
+        signal_month_codes(signals), month_codes(signal_months(signals))
+    )
+    grid = month_grid()
+    labels = month_labels(signal_months(signals), grid)
+    assert list(pd.PeriodIndex(grid)[labels].astype(str)) == ["2015-03", "2016-01"]
+
+    codes = [signal_month_codes(signals), np.array([], dtype=np.int64)]
+    matrix = month_label_matrix(codes + [month_codes(["2015-02"])], grid)
+    np.testing.assert_array_equal(matrix[0], labels)
+    assert not matrix[1].any()
+    assert list(np.flatnonzero(matrix[2])) == [1]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.accumulators import AccumulatorState, add_accumulators
+from engine.cache import ResultCache
+from engine.data import thi
+
+SPECS = [
+    {"name": "GDD_2d", "kind": "gdd", "base": 10, "cap": 30, "window": 2},
+    {"name": "KDD_2d", "kind": "kdd", "threshold": 29, "window": 2},
+    {
+        "name": "THI_excess",
+        "kind": "excess",
+        "column": "THI",
+        "threshold": 75,
+        "window": 1,
+    },
+    {"name": "THI_mean_2d", "kind": "mean", "column": "THI", "window": 2},
+    {"name": "GDD_season", "kind": "gdd", "base": 10, "cap": 30, "season_start": 4},
+]
+
+
+@pytest.fixture
+def weather():
+    df = pd.DataFrame(
+        {
+            "Max_Temp_C": [32.0, 25.0, 35.0, 8.0],
+            "Min_Temp_C": [18.0, 5.0, 21.0, 2.0],
+            "Humidity_Pct": [50.0, 80.0, 60.0, 90.0],
+        },
+        index=pd.DatetimeIndex(
+            ["2021-03-31", "2021-04-01", "2021-04-02", "2021-04-03"], name="Date"
+        ),
+    )
+    df["THI"] = thi(df["Max_Temp_C"], df["Humidity_Pct"])
+    return df
+
+
+def test_thi_by_hand():
+    assert thi(30.0, 50.0) == pytest.approx(0.8 * 30 + 0.5 * 15.6 + 46.4)
+
+
+def test_accumulators_by_hand(weather):
+    df = add_accumulators(weather, SPECS)
+    # daily GDD: (min(Tmax, 30) + max(Tmin, 10)) / 2 - 10, floored at 0;
+    # daily KDD: Tmax - 29, floored at 0
+    gdd = [(30 + 18) / 2 - 10, (25 + 10) / 2 - 10, (30 + 21) / 2 - 10, 0.0]
+    kdd = [3.0, 0.0, 6.0, 0.0]
+    thi_values = weather["THI"].to_list()
+    np.testing.assert_allclose(
+        df["GDD_2d"], [np.nan, gdd[0] + gdd[1], gdd[1] + gdd[2], gdd[2] + gdd[3]]
+    )
+    np.testing.assert_allclose(
+        df["KDD_2d"], [np.nan, kdd[0] + kdd[1], kdd[1] + kdd[2], kdd[2] + kdd[3]]
+    )
+    np.testing.assert_allclose(
+        df["THI_excess"], [max(value - 75, 0.0) for value in thi_values]
+    )
+    np.testing.assert_allclose(
+        df["THI_mean_2d"],
+        [np.nan] + [(a + b) / 2 for a, b in zip(thi_values, thi_values[1:])],
+    )
+    # the season starts on April 1, after the first stored day
+    np.testing.assert_allclose(
+        df["GDD_season"], [np.nan, gdd[1], gdd[1] + gdd[2], gdd[1] + gdd[2] + gdd[3]]
+    )
+
+
+def test_windows_follow_the_calendar_across_gaps(weather):
+    # a missing day and a NaN reading both leave a hole in the window
+    gappy = weather.drop(weather.index[1])
+    gappy.loc[gappy.index[-1], "Max_Temp_C"] = np.nan
+    df = add_accumulators(gappy, SPECS[1:2])
+    np.testing.assert_allclose(df["KDD_2d"], [np.nan, 6.0, 6.0])
+
+
+def test_streaming_matches_batch(weather):
+    expected = add_accumulators(weather, SPECS)
+    state = AccumulatorState(SPECS)
+    rows = [
+        state.update(date, record)
+        for date, record in zip(weather.index, weather.to_dict("records"))
+    ]
+    pd.testing.assert_frame_equal(
+        pd.DataFrame(rows, index=weather.index), expected, check_dtype=False
+    )
+
+
+def test_cache_is_opt_in(weather, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    add_accumulators(weather, SPECS)
+    assert cache.entries() == []
+    first = add_accumulators(weather, SPECS, cache=cache)
+    assert len(cache.entries()) == 1
+    pd.testing.assert_frame_equal(add_accumulators(weather, SPECS, cache=cache), first)
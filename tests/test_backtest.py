@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.backtest import backtest_strategy
+from engine.signals import get_buy_signals
+
+
+def row_loop_backtest(prices, buy_signals, holding_period, drag=0.0, roll_months=()):
+    """The per-crop scripts' loop, charging the roll drag when the trade closes"""
+    cash = 10000
+    portfolio_value = pd.Series(index=prices.index, data=cash, dtype=float)
+    busy_until_date = None
+    for buy_date in sorted(buy_signals):
+        if buy_date not in prices.index:
+            continue
+        if busy_until_date is not None and buy_date < busy_until_date:
+            continue
+        rolls = sum(
+            (buy_date + pd.DateOffset(months=i)).month in roll_months
+            for i in range(1, holding_period + 1)
+        )
+        shares = cash / prices.loc[buy_date, "Close"]
+        target = buy_date + pd.DateOffset(months=holding_period)
+        sell_date = prices.index[
+            prices.index.get_indexer([target], method="nearest")[0]
+        ]
+        period_prices = prices.loc[buy_date:sell_date, "Close"]
+        portfolio_value.loc[buy_date:sell_date] = shares * period_prices
+        cash = shares * prices.loc[sell_date, "Close"] * (1 - drag) ** rolls
+        portfolio_value.loc[sell_date:] = cash
+        busy_until_date = sell_date
+    return cash, portfolio_value
+
+
+@pytest.mark.parametrize("holding_period", [1, 3, 6, 10, 13])
+def test_backtest_matches_row_loop(commodity, holding_period):
+    _, spec, df, prices = commodity
+    signals = get_buy_signals(df, prices, spec["rules"])
+    cash, _, values = backtest_strategy(prices, signals, holding_period, verbose=False)
+    expected_cash, expected_values = row_loop_backtest(prices, signals, holding_period)
+    assert cash == pytest.approx(expected_cash)
+    np.testing.assert_allclose(values.to_numpy(), expected_values.to_numpy())
+
+    # roll drag now marks the curve down on the roll dates; the final cash is unchanged
+    cash, _, _ = backtest_strategy(
+        prices,
+        signals,
+        holding_period,
+        spec["drag"],
+        spec["roll_months"],
+        verbose=False,
+    )
+    expected_cash, _ = row_loop_backtest(
+        prices, signals, holding_period, spec["drag"], spec["roll_months"]
+    )
+    assert cash == pytest.approx(expected_cash)
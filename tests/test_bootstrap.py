@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from engine.bootstrap import block_start_matrix, resample_paths, window_stats
+
+
+def naive_path_stats(log_returns):
+    """Total, high, low and max drawdown of one path, day by day"""
+    level = np.concatenate([[0.0], np.cumsum(log_returns)])
+    drawdown = np.maximum.accumulate(level) - level
+    return level[-1], level.max(), level.min(), drawdown.max()
+
+
+@pytest.fixture
+def log_returns():
+    return np.random.default_rng(0).normal(0, 0.01, (3, 250))
+
+
+@pytest.mark.parametrize("max_bytes", [1 << 28, 1000])
+def test_window_stats_match_each_window(log_returns, max_bytes):
+    length = 21
+    stats = window_stats(log_returns, length, max_bytes)
+    for series in range(len(log_returns)):
+        for start in (0, 1, 100, log_returns.shape[1] - length):
+            expected = naive_path_stats(log_returns[series, start : start + length])
+            got = [stat[series, start] for stat in stats]
+            np.testing.assert_allclose(got, expected, atol=1e-12)
+
+
+def test_resampled_paths_match_concatenated_blocks(log_returns):
+    n, block_length, n_resamples = log_returns.shape[1], 40, 25
+    annualized, max_drawdown = resample_paths(
+        log_returns, n_resamples, block_length, 252, seed=1
+    )
+    starts, last_length = block_start_matrix(
+        n, block_length, n_resamples, np.random.default_rng(1)
+    )
+    lengths = [block_length] * (starts.shape[1] - 1) + [last_length]
+    for series in range(len(log_returns)):
+        for k in range(n_resamples):
+            path = np.concatenate(
+                [
+                    log_returns[series, s : s + length]
+                    for s, length in zip(starts[k], lengths)
+                ]
+            )
+            total, _, _, drawdown = naive_path_stats(path)
+            assert annualized[series, k] == pytest.approx(np.expm1(total * 252 / n))
+            assert max_drawdown[series, k] == pytest.approx(-np.expm1(-drawdown))
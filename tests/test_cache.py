@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine.cache import ResultCache, cache_key, signal_dates_key
+
+
+def test_get_or_compute_hits_after_first_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert cache.get("k", "default") == "default"
+    # None is a result like any other, not a miss
+    assert cache.get_or_compute("k", compute) is None
+    assert cache.get_or_compute("k", compute) is None
+    assert len(calls) == 1
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("k", [1, 2, 3])
+    with open(cache._path("k"), "wb") as f:
+        f.write(b"\x80\x05truncated")
+    assert cache.get("k", "default") == "default"
+    assert not os.path.exists(cache._path("k"))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=10**9)
+    value = np.zeros(1000)
+    for age, key in enumerate(["a", "b", "c"]):
+        cache.put(key, value)
+        os.utime(cache._path(key), (age, age))
+    # reading "a" makes "b" the least recently used entry
+    assert cache.get("a") is not None
+    cache.max_bytes = 2 * os.path.getsize(cache._path("a"))
+    cache.evict()
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_cache_key_is_content_addressed():
+    dates = ["2020-01-02", "2020-03-04"]
+    assert cache_key(np.int64(10), 0.5) == cache_key(10, 0.5)
+    assert cache_key(signal_dates_key(dates)) == cache_key(
+        signal_dates_key(pd.DatetimeIndex(dates[::-1]))
+    )
+    prices = pd.Series([1.0, 2.0], index=pd.DatetimeIndex(dates))
+    assert cache_key(prices) != cache_key(prices * 2)
+    assert cache_key({"a": 1, "b": 2}) != cache_key({"a": 2, "b": 1})
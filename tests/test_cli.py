@@ -0,0 +1,59 @@
+import argparse
+
+import pandas as pd
+import pytest
+
+import engine.cli
+from engine.backtest import backtest_strategy
+from engine.cli import main, parse_int_list
+from engine.registry import get_commodity
+from engine.signals import get_buy_signals
+from tests.conftest import stored_weather, synthetic_prices
+
+
+def test_parse_int_list():
+    assert parse_int_list("6,10") == [6, 10]
+    assert parse_int_list("1-3, 6,2") == [1, 2, 3, 6]
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_int_list(" , ")
+
+
+def test_summary_matches_backtests(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(
+        engine.cli, "load_prices", lambda name, *args, **kwargs: synthetic_prices(name)
+    )
+    main(
+        [
+            "corn",
+            "coffee",
+            "--holding-periods",
+            "2-3",
+            "--no-cache",
+            "--output",
+            str(tmp_path),
+        ]
+    )
+    summary = pd.read_csv(tmp_path / "summary.csv")
+    assert list(zip(summary["commodity"], summary["holding_period"])) == [
+        ("corn", 2),
+        ("corn", 3),
+        ("coffee", 2),
+        ("coffee", 3),
+    ]
+    for row in summary.itertuples():
+        spec, prices = get_commodity(row.commodity), synthetic_prices(row.commodity)
+        signals = get_buy_signals(stored_weather(row.commodity), prices, spec["rules"])
+        cash, annualized, _ = backtest_strategy(
+            prices,
+            signals,
+            row.holding_period,
+            spec["drag"],
+            spec["roll_months"],
+            verbose=False,
+        )
+        assert row.signals == len(signals)
+        assert row.final_cash == pytest.approx(cash)
+        assert row.annualized_return == pytest.approx(annualized)
+    curves = pd.read_csv(tmp_path / "corn_equity.csv", index_col=0)
+    assert list(curves.columns) == ["2", "3"]
+    assert "corn" in capsys.readouterr().out
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from engine.climatology import (
+    N_BINS,
+    N_DAYS,
+    Climatology,
+    day_of_year_index,
+    point_in_time_values,
+)
+from tests.conftest import stored_weather
+
+COLUMNS = ["Max_Temp_C", "Min_Temp_C"]
+
+
+@pytest.fixture
+def weather():
+    return stored_weather("corn")[COLUMNS]
+
+
+def window_values(df, column, day, window):
+    """Observations within +/- window days of a day of year, wrapping the year"""
+    distance = np.abs(day_of_year_index(df.index) - day)
+    near = np.minimum(distance, N_DAYS - distance) <= window
+    values = df[column].to_numpy()[near]
+    return values[np.isfinite(values)]
+
+
+@pytest.mark.parametrize("day", [0, 59, 200, 365])
+def test_tables_match_the_window_around_each_day(weather, day):
+    climatology = Climatology.from_frame(weather, COLUMNS)
+    for j, column in enumerate(COLUMNS):
+        values = window_values(weather, column, day, climatology.window)
+        assert climatology.mean()[day, j] == pytest.approx(values.mean())
+        assert climatology.std()[day, j] == pytest.approx(values.std())
+        for q in (5, 50, 95):
+            edge = climatology.percentile(q)[day, j]
+            expected = np.percentile(values, q, method="inverted_cdf")
+            # thresholds are the upper edge of the bin holding the percentile
+            assert edge - climatology.width[j] <= expected + 1e-9
+            assert expected <= edge + 1e-9
+
+
+def test_monthly_updates_and_save_round_trip(weather, tmp_path):
+    whole = Climatology.from_frame(weather, COLUMNS)
+    ranges = {
+        c: (low, low + N_BINS * width)
+        for c, low, width in zip(COLUMNS, whole.low, whole.width)
+    }
+    folded = Climatology(COLUMNS, whole.window, ranges)
+    for _, month in weather.groupby(weather.index.to_period("M")):
+        folded.update(month)
+    assert folded.update(weather) == 0
+    path = tmp_path / "site.climatology.npz"
+    folded.save(path)
+    loaded = Climatology.load(path)
+    assert loaded.last_date == weather.index[-1]
+    for got, expected in zip(loaded.derived(), whole.derived()):
+        np.testing.assert_allclose(got, expected, equal_nan=True)
+
+
+def test_out_of_range_values_refuse_percentiles(weather):
+    climatology = Climatology.from_frame(weather, COLUMNS)
+    hot = weather.iloc[-1:].copy()
+    hot.index = hot.index + np.timedelta64(1, "D")
+    hot["Max_Temp_C"] = 99.0
+    climatology.update(hot)
+    with pytest.raises(ValueError, match="Max_Temp_C"):
+        climatology.percentile_thresholds(hot.index, "Max_Temp_C", 95)
+    climatology.percentile_thresholds(hot.index, "Min_Temp_C", 5)
+
+
+def test_point_in_time_values_ignore_later_weather(weather):
+    rule = {"column": "Max_Temp_C", "kind": "percentile", "op": ">", "threshold": 90}
+    cut = weather.index.searchsorted(weather.index[len(weather) // 2].replace(day=1))
+    _, threshold = point_in_time_values(rule, weather)
+    changed = weather.copy()
+    changed.iloc[cut:, 0] += 10
+    _, changed_threshold = point_in_time_values(rule, changed)
+    np.testing.assert_array_equal(threshold[:cut], changed_threshold[:cut])
+    # the first month has no history to compare against
+    assert np.isnan(threshold[: weather.index[0].days_in_month]).all()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from engine.compact import (
+    CompactWeather,
+    bitmap_to_days,
+    days_to_bitmap,
+    signal_dates,
+    signal_days,
+    to_day_numbers,
+)
+from engine.signals import get_buy_signals
+
+
+def test_weather_round_trip(commodity):
+    _, _, df, _ = commodity
+    compact = CompactWeather.from_frame(df)
+    assert compact.nbytes < df.memory_usage(index=True).sum() / 1.5
+    back = compact.to_frame()
+    assert back.index.equals(df.index) and list(back.columns) == list(df.columns)
+    # values stored with two decimals survive float32 at that precision
+    np.testing.assert_allclose(back["Max_Temp_C"], df["Max_Temp_C"], atol=5e-6)
+    np.testing.assert_array_equal(compact.column("Max_Temp_C"), compact.values[:, 0])
+
+
+def test_signal_round_trips(commodity):
+    _, spec, df, prices = commodity
+    signals = get_buy_signals(df, prices, spec["rules"])
+    days = signal_days(signals + signals[:1])
+    assert days.dtype == np.int32 and (np.diff(days) > 0).all()
+    assert signal_dates(days) == signals
+
+    first, n_days = int(to_day_numbers(df.index[:1])[0]), len(df) + 1
+    bitmap = days_to_bitmap(days, first, n_days)
+    assert bitmap.nbytes == -(-n_days // 8)
+    np.testing.assert_array_equal(bitmap_to_days(bitmap, first, n_days), days)
+
+
+def test_bitmap_drops_days_outside_its_span():
+    days = to_day_numbers(pd.to_datetime(["2020-01-01", "2020-01-05", "2020-03-01"]))
+    bitmap = days_to_bitmap(days, int(days[0]) + 1, 30)
+    np.testing.assert_array_equal(
+        bitmap_to_days(bitmap, int(days[0]) + 1, 30), days[1:2]
+    )
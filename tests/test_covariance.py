@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.covariance import CovarianceCache, covariance_cache
+from engine.panel import align_prices
+from engine.registry import list_commodities
+from tests.conftest import synthetic_prices
+
+
+@pytest.fixture(params=["none", "ffill"])
+def panel(request):
+    """Union panel of every commodity's closes; fill="none" keeps the gaps"""
+    closes = {name: synthetic_prices(name)["Close"] for name in list_commodities()}
+    # knock out some days so the union calendar has holes and gaps
+    rng = np.random.default_rng(0)
+    closes = {
+        name: close[rng.random(len(close)) > 0.05] for name, close in closes.items()
+    }
+    return align_prices(closes, fill=request.param)
+
+
+def test_incremental_updates_match_batch_build(panel):
+    full = CovarianceCache.from_panel(panel)
+    split = len(panel.dates) // 2
+    cache = CovarianceCache.from_values(
+        panel.values[:split], panel.names, panel.dates[:split]
+    )
+    for date, prices in zip(panel.dates[split:], panel.values[split:]):
+        cache.update(prices, date)
+    assert len(cache) == len(full)
+    np.testing.assert_allclose(
+        cache._prefix[: len(cache) + 1], full._prefix[: len(full) + 1]
+    )
+    for window in (21, 252):
+        np.testing.assert_allclose(
+            cache.covariances(window), full.covariances(window), equal_nan=True
+        )
+
+
+def test_covariance_matches_pandas(panel):
+    cache = CovarianceCache.from_panel(panel)
+    frame = pd.DataFrame(panel.values, index=panel.dates, columns=panel.names)
+    returns = frame / frame.shift(1) - 1
+    end = panel.dates[-100]
+    window = returns.loc[:end].iloc[-252:]
+    pd.testing.assert_frame_equal(
+        cache.covariance(252, end), window.cov(min_periods=20), check_names=False
+    )
+    pd.testing.assert_frame_equal(
+        cache.correlation(252, end), window.corr(min_periods=20), check_names=False
+    )
+
+
+def test_shared_cache_keeps_caller_labels(panel):
+    # the sizing policies ask for an unlabelled cache of the same prices first
+    unlabelled = covariance_cache(panel.values)
+    cache = covariance_cache(panel.values, panel.names, panel.dates)
+    assert unlabelled.names == list(range(len(panel.names)))
+    assert cache.names == panel.names
+    correlation = cache.correlation(252, panel.dates[-1])
+    assert list(correlation.columns) == panel.names
+    assert covariance_cache(panel.values, panel.names, panel.dates) is cache
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.events import RunState, list_events, run_mask
+
+RULES = [
+    {"min_run": 3},
+    {"min_run": 2, "max_gap": 1},
+    {"min_degree_days": 5.0, "max_gap": 2},
+    {"min_run": 2, "min_degree_days": 3.0},
+]
+
+
+def naive_run_mask(mask, days, excess, min_run=1, max_gap=0, min_degree_days=0.0):
+    out = np.zeros(len(mask), dtype=bool)
+    last, length, total = None, 0, 0.0
+    for i in np.flatnonzero(mask):
+        if last is None or days[i] - last - 1 > max_gap:
+            length, total = 0, 0.0
+        last, length, total = days[i], length + 1, total + excess[i]
+        out[i] = length >= min_run and total >= min_degree_days - 1e-9
+    return out
+
+
+@pytest.fixture
+def sample():
+    # weekdays only, so weekends are gaps between exceeding days
+    dates = pd.bdate_range("2020-06-01", periods=120)
+    rng = np.random.default_rng(0)
+    excess = rng.normal(0, 2, (4, len(dates)))
+    return dates, excess > 0, excess
+
+
+@pytest.mark.parametrize("rule", RULES)
+def test_run_mask_matches_day_by_day_loop(sample, rule):
+    dates, mask, excess = sample
+    days = np.asarray(dates.values.astype("datetime64[D]"), dtype=np.int64)
+    got = run_mask(mask, dates, excess, **rule)
+    for row in range(len(mask)):
+        expected = naive_run_mask(mask[row], days, excess[row], **rule)
+        np.testing.assert_array_equal(got[row], expected)
+
+        state = RunState(rule)
+        streamed = [
+            mask[row, i] and state.update(date, excess[row, i])
+            for i, date in enumerate(dates)
+        ]
+        np.testing.assert_array_equal(streamed, expected)
+
+
+def test_list_events():
+    dates = pd.date_range("2020-07-01", periods=8)
+    mask = np.array([1, 1, 0, 1, 0, 0, 1, 1], dtype=bool)
+    excess = np.arange(8.0)
+    events = list_events(mask, dates, excess, max_gap=1)
+    assert list(events["start"]) == [dates[0], dates[6]]
+    assert list(events["end"]) == [dates[3], dates[7]]
+    assert list(events["days"]) == [3, 2]
+    assert list(events["degree_days"]) == [0 + 1 + 3, 6 + 7]
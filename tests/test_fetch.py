@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from engine.fetch import fetch_power_sync, fetch_sites, run_coroutine
+from engine.power_server import PowerServer, synthetic_values
+
+PARAMETERS = ["T2M_MAX", "T2M_MIN", "RH2M"]
+START, END = datetime(2020, 1, 1), datetime(2020, 3, 31)
+SITES = {"north": (41.5, -93.6, PARAMETERS), "south": (-21.2, -47.8, PARAMETERS)}
+
+
+def fetch(server, sites=SITES, **kwargs):
+    return run_coroutine(fetch_sites(sites, START, END, url=server.url, **kwargs))
+
+
+def test_frames_match_served_values():
+    with PowerServer(registry=False) as server:
+        frames = fetch(server)
+    dates = pd.date_range(START, END).to_numpy(dtype="datetime64[D]")
+    for key, (lat, lon, _) in SITES.items():
+        df = frames[key]
+        assert list(df.index) == list(pd.DatetimeIndex(dates))
+        np.testing.assert_array_equal(
+            df["Max_Temp_C"], synthetic_values("T2M_MAX", lat, lon, dates)
+        )
+        np.testing.assert_array_equal(
+            df["Humidity_Pct"], synthetic_values("RH2M", lat, lon, dates)
+        )
+        assert "THI" in df.columns
+
+
+def test_parameter_chunks_merge_into_one_frame():
+    with PowerServer(registry=False) as server:
+        whole = fetch(server)
+        chunked = fetch(server, parameters_per_request=1)
+        assert server.stats["served"] == len(SITES) * (1 + len(PARAMETERS))
+    for key in SITES:
+        pd.testing.assert_frame_equal(chunked[key], whole[key])
+
+
+def test_concurrency_limits_requests_in_flight():
+    sites = {i: (40.0 + i, -90.0, ["T2M_MAX"]) for i in range(6)}
+    with PowerServer(registry=False, latency=0.05) as server:
+        frames = fetch(server, sites, concurrency=2)
+        assert server.stats["max_in_flight"] <= 2
+    assert all(df is not None for df in frames.values())
+
+
+def test_retries_server_errors():
+    # the seed fixes both the synthetic values and which requests fail
+    with PowerServer(registry=False, seed=4) as server:
+        expected = fetch_power_sync(41.5, -93.6, PARAMETERS, START, END, url=server.url)
+    with PowerServer(registry=False, error_rate=0.5, seed=4) as server:
+        df = fetch_power_sync(
+            41.5, -93.6, PARAMETERS, START, END, url=server.url, retries=10, backoff=0
+        )
+        assert server.stats["requests"] > server.stats["served"]
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_failed_site_maps_to_none():
+    with PowerServer(registry=False, error_rate=1.0) as server:
+        frames = fetch(server, retries=1, backoff=0)
+    assert frames == {key: None for key in SITES}
@@ -0,0 +1,67 @@
+import heapq
+
+import numpy as np
+import pytest
+
+from engine.backtest import INITIAL_CASH, roll_offsets
+from engine.data import close_prices
+from engine.lots import backtest_lots
+from engine.trading_calendar import trading_calendar
+from tests.conftest import synthetic_prices
+
+
+def naive_lots_curve(
+    close, positions, holding_period, drag, roll_months, fraction, lot_cash
+):
+    """Daily value with a heap of open lots, walked one day at a time"""
+    calendar = trading_calendar(close.index)
+    price = close.to_numpy()
+    cash, open_lots, values, counter = float(INITIAL_CASH), [], [], 0
+    entries = {}
+    for position in positions:
+        entries.setdefault(position, []).append(position)
+    for t in range(len(price)):
+        for lot in open_lots:
+            lot[2] *= (1 - drag) ** lot[3].count(t)
+        while open_lots and open_lots[0][0] <= t:
+            _, _, shares, _ = heapq.heappop(open_lots)
+            cash += shares * price[t]
+        for entry in entries.get(t, []):
+            allocation = cash * fraction if lot_cash is None else min(cash, lot_cash)
+            if allocation <= 0:
+                continue
+            cash -= allocation
+            month = close.index[entry].month
+            rolls = [
+                calendar.month_table(int(k))[entry]
+                for k in roll_offsets(month, holding_period, roll_months)
+            ]
+            exit = calendar.month_table(holding_period)[entry]
+            heapq.heappush(open_lots, [exit, counter, allocation / price[t], rolls])
+            counter += 1
+        values.append(cash + sum(lot[2] for lot in open_lots) * price[t])
+    return np.array(values)
+
+
+@pytest.mark.parametrize(
+    "drag, roll_months, fraction, lot_cash",
+    [(0.0, (), 0.25, None), (0.02, (3, 6, 9, 12), 0.4, None), (0.01, (5,), 0.25, 3000)],
+)
+def test_lots_match_a_daily_heap_loop(drag, roll_months, fraction, lot_cash):
+    prices = synthetic_prices("corn")
+    close = close_prices(prices)
+    rng = np.random.default_rng(0)
+    positions = np.sort(rng.choice(len(close) - 1, 60, replace=False))
+    # two signals on one day open two lots
+    positions = np.sort(np.r_[positions, positions[5]])
+    buy_signals = list(close.index[positions])
+
+    final, _, curve, lots = backtest_lots(
+        prices, buy_signals, 3, drag, roll_months, fraction, lot_cash
+    )
+    expected = naive_lots_curve(
+        close, positions, 3, drag, roll_months, fraction, lot_cash
+    )
+    np.testing.assert_allclose(curve.to_numpy(), expected, rtol=1e-9)
+    assert final == pytest.approx(expected[-1])
+    assert len(lots) > 0
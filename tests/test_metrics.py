@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.metrics import METRICS, equity_metrics
+
+
+def naive_metrics(curve, exposure):
+    """The same metrics for one curve, with pandas and a loop over trades"""
+    returns = curve.pct_change().dropna()
+    years = (len(curve) - 1) / 252
+    total = curve.iloc[-1] / curve.iloc[0] - 1
+    annualized = (1 + total) ** (1 / years) - 1
+    peak = curve.cummax()
+    below, longest = 0, 0
+    for value, high in zip(curve, peak):
+        below = below + 1 if value < high else 0
+        longest = max(longest, below)
+    held = exposure[:-1] != 0
+    trades, wins, growth = 0, 0, None
+    for on, r in zip(list(held) + [False], list(returns) + [0.0]):
+        if on:
+            growth = (growth if growth is not None else 1.0) * (1 + r)
+        elif growth is not None:
+            trades, wins, growth = trades + 1, wins + (growth > 1), None
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean())
+    max_drawdown = (1 - curve / peak).max()
+    return {
+        "total_return": total,
+        "annualized_return": annualized,
+        "volatility": returns.std() * np.sqrt(252),
+        "sharpe": returns.mean() / returns.std() * np.sqrt(252),
+        "sortino": returns.mean() / downside * np.sqrt(252),
+        "max_drawdown": max_drawdown,
+        "max_drawdown_days": longest,
+        "calmar": annualized / max_drawdown,
+        "trades": trades,
+        "hit_rate": wins / trades,
+        "exposure": (exposure[:-1] != 0).mean(),
+        "turnover": np.abs(np.diff(exposure[:-1], prepend=0)).sum() / years,
+    }
+
+
+@pytest.fixture
+def curves():
+    rng = np.random.default_rng(0)
+    # positions held for 20 days after random entries
+    entries = rng.random((5, 600)) < 0.02
+    exposure = np.zeros((5, 600))
+    for lag in range(20):
+        exposure[:, lag:] += entries[:, : 600 - lag]
+    exposure = np.minimum(exposure, 1.0)
+    # the position at yesterday's close earns today's return
+    returns = rng.normal(0.0005, 0.01, (5, 600)) * np.roll(exposure, 1, axis=1)
+    returns[:, 0] = 0
+    return 10000 * np.cumprod(1 + returns, axis=1), exposure
+
+
+def test_matches_per_curve_pandas(curves):
+    equity, exposure = curves
+    table = equity_metrics(equity, exposure)
+    assert list(table.columns) == list(METRICS)
+    for row in range(len(equity)):
+        expected = naive_metrics(pd.Series(equity[row]), exposure[row])
+        for metric in METRICS:
+            assert table.iloc[row][metric] == pytest.approx(expected[metric]), metric
+        single = equity_metrics(equity[row], exposure[row])
+        pd.testing.assert_series_equal(single, table.iloc[row], check_names=False)
+
+
+def test_frames_label_rows_and_set_the_years(curves):
+    equity, exposure = curves
+    dates = pd.bdate_range("2020-01-01", periods=equity.shape[1])
+    names = list("abcde")
+    frame = pd.DataFrame(equity.T, index=dates, columns=names)
+    table = equity_metrics(frame, pd.DataFrame(exposure.T, index=dates, columns=names))
+    years = (dates[-1] - dates[0]).days / 365.25
+    assert list(table.index) == names
+    np.testing.assert_allclose(
+        table["annualized_return"],
+        (equity[:, -1] / equity[:, 0]) ** (1 / years) - 1,
+    )
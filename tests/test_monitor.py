@@ -0,0 +1,50 @@
+import engine.monitor
+from engine.climatology import Climatology
+from engine.monitor import SignalState
+from engine.registry import SIGNAL_CUTOFF_YEAR, get_commodity
+from engine.signals import get_buy_signals
+from tests.conftest import stored_weather, synthetic_prices
+
+
+def replayed_signals(events):
+    return [
+        event["date"]
+        for event in events
+        if event["type"] in ("buy", "signal")
+        and event["date"].year < SIGNAL_CUTOFF_YEAR
+    ]
+
+
+def test_warm_start_replays_buy_signals(commodity):
+    name, spec, df, prices = commodity
+    # the synthetic prices trade on weekdays, the monitor's default calendar
+    events = SignalState(name).warm_start(df)
+    assert replayed_signals(events) == get_buy_signals(df, prices, spec["rules"])
+
+
+def test_warm_start_judges_anomalies_point_in_time(monkeypatch):
+    rules = [
+        {
+            "name": "hot",
+            "column": "Max_Temp_C",
+            "op": ">",
+            "threshold": 2.0,
+            "kind": "zscore",
+        },
+        {
+            "name": "cold",
+            "column": "Min_Temp_C",
+            "op": "<",
+            "threshold": 5,
+            "kind": "percentile",
+        },
+    ]
+    spec = dict(get_commodity("corn"), rules=rules)
+    monkeypatch.setattr(engine.monitor, "get_commodity", lambda name: spec)
+    df, prices = stored_weather("corn"), synthetic_prices("corn")
+    # an index over the whole history would see the replayed days in advance
+    full = Climatology.from_frame(df, ["Max_Temp_C", "Min_Temp_C"])
+    state = SignalState("corn", climatology=full)
+    signals = replayed_signals(state.warm_start(df))
+    assert signals
+    assert signals == get_buy_signals(df, prices, rules)
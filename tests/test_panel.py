@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.panel import align_prices
+
+NAN = np.nan
+
+
+@pytest.fixture
+def closes():
+    a = pd.Series(
+        [1.0, 2.0, 3.0, 4.0],
+        index=pd.DatetimeIndex(
+            ["2020-01-01", "2020-01-02", "2020-01-03", "2020-01-06"]
+        ),
+    )
+    b = pd.Series(
+        [10.0, 20.0],
+        index=pd.DatetimeIndex(["2020-01-02", "2020-01-07"]),
+    )
+    return {"corn": a, "coffee": b}
+
+
+def test_union_forward_fills_but_never_backfills(closes):
+    panel = align_prices(closes)
+    assert list(panel.dates.strftime("%m-%d")) == [
+        "01-01",
+        "01-02",
+        "01-03",
+        "01-06",
+        "01-07",
+    ]
+    np.testing.assert_array_equal(
+        panel.values,
+        [[1, NAN], [2, 10], [3, 10], [4, 10], [4, 20]],
+    )
+    np.testing.assert_array_equal(
+        panel.observed,
+        [[1, 0], [1, 1], [1, 0], [1, 0], [0, 1]],
+    )
+    assert panel.values.flags.c_contiguous
+    pd.testing.assert_series_equal(
+        panel.close("coffee"), closes["coffee"].rename("Close"), check_names=False
+    )
+
+
+def test_fill_limit_and_none(closes):
+    # two calendar days of carry covers 01-03 but not 01-06 (four days later)
+    limited = align_prices(closes, fill="ffill", limit=2)
+    np.testing.assert_array_equal(limited.column("coffee"), [NAN, 10, 10, NAN, 20])
+    unfilled = align_prices(closes, fill="none")
+    np.testing.assert_array_equal(unfilled.column("coffee"), [NAN, 10, NAN, NAN, 20])
+
+
+def test_calendars(closes):
+    assert list(align_prices(closes, calendar="intersection").dates) == [
+        pd.Timestamp("2020-01-02")
+    ]
+    own = align_prices(closes, calendar="coffee")
+    assert own.dates.equals(pd.DatetimeIndex(closes["coffee"].index, name="Date"))
+    np.testing.assert_array_equal(own.values, [[2, 10], [4, 20]])
+    with pytest.raises(ValueError):
+        align_prices(closes, calendar="wheat")
+    with pytest.raises(ValueError):
+        align_prices(closes, fill="bfill")
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine.shared
+from engine.backtest import backtest_strategy
+from engine.data import close_prices
+from engine.panel import align_prices
+from engine.pipeline import run_graph, run_portfolio_pipeline
+from engine.portfolio import portfolio_backtest
+from engine.registry import get_commodity
+from engine.signals import get_buy_signals
+from tests.conftest import stored_weather, synthetic_prices
+
+NAMES = ["corn", "lean_hogs"]
+
+
+def fake_price_matrix(names, start, end, offline):
+    closes = [close_prices(synthetic_prices(name)).rename(name) for name in names]
+    matrix = pd.concat(closes, axis=1)
+    return matrix.index.values, matrix.to_numpy()
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_pipeline_matches_direct_backtests(monkeypatch, jobs):
+    monkeypatch.setattr(engine.shared, "price_matrix", fake_price_matrix)
+    results = run_portfolio_pipeline(NAMES, {"corn": 2}, jobs=jobs, cache=None)
+
+    holding_periods = {
+        "corn": 2,
+        "lean_hogs": get_commodity("lean_hogs")["holding_period"],
+    }
+    signals = {}
+    for name in NAMES:
+        spec, prices = get_commodity(name), synthetic_prices(name)
+        signals[name] = get_buy_signals(stored_weather(name), prices, spec["rules"])
+        assert results["signals"][name] == signals[name]
+        final, annualized, curve = backtest_strategy(
+            prices,
+            signals[name],
+            holding_periods[name],
+            spec["drag"],
+            spec["roll_months"],
+            verbose=False,
+        )
+        got = results["returns"][name]
+        assert got[0] == pytest.approx(final) and got[1] == pytest.approx(annualized)
+        np.testing.assert_allclose(got[2].to_numpy(), curve.to_numpy())
+
+    panel = align_prices({name: close_prices(synthetic_prices(name)) for name in NAMES})
+    final, annualized, values = portfolio_backtest(panel, signals, holding_periods)
+    got_final, got_annualized, got_values = results["portfolio"]
+    assert got_final == pytest.approx(final)
+    assert got_annualized == pytest.approx(annualized)
+    pd.testing.assert_frame_equal(got_values, values, check_freq=False)
+
+
+def test_run_graph_passes_results_in_dependency_order():
+    tasks = {
+        "c": (max, (0,), ["a", "b"]),
+        "a": (abs, (-2,), []),
+        "b": (pow, (3,), ["a"]),
+    }
+    assert run_graph(tasks) == {"a": 2, "b": 9, "c": 9}
+    with pytest.raises(ValueError, match="unknown"):
+        run_graph({"a": (abs, (1,), ["missing"])})
+    with pytest.raises(ValueError, match="cycle"):
+        run_graph({"a": (abs, (), ["b"]), "b": (abs, (), ["a"])})
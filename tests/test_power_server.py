@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.power_server import FILL_VALUE, PowerServer, synthetic_values
+
+SITES = [(41.5, -93.6), (-21.2, -47.8), (64.0, 20.0), (0.0, 0.0)]
+
+
+def days(start, end):
+    return pd.date_range(start, end).to_numpy(dtype="datetime64[D]")
+
+
+@pytest.mark.parametrize("lat, lon", SITES)
+def test_synthetic_minimum_stays_below_maximum(lat, lon):
+    dates = days("1990-01-01", "2020-12-31")
+    high = synthetic_values("T2M_MAX", lat, lon, dates)
+    low = synthetic_values("T2M_MIN", lat, lon, dates)
+    mean = synthetic_values("T2M", lat, lon, dates)
+    assert (low < high).all()
+    assert ((low <= mean) & (mean <= high)).all()
+
+
+def test_overlapping_windows_agree():
+    whole = synthetic_values("T2M_MIN", 41.5, -93.6, days("2019-01-01", "2020-12-31"))
+    part = synthetic_values("T2M_MIN", 41.5, -93.6, days("2020-06-01", "2020-06-30"))
+    np.testing.assert_array_equal(part, whole[517:547])
+    other_seed = synthetic_values(
+        "T2M_MIN", 41.5, -93.6, days("2020-06-01", "2020-06-30"), seed=1
+    )
+    assert not np.array_equal(part, other_seed)
+
+
+def query(start, end, parameters="T2M_MAX,T2M_MIN", lat=10.0, lon=20.0):
+    return {
+        "parameters": parameters,
+        "latitude": str(lat),
+        "longitude": str(lon),
+        "start": start,
+        "end": end,
+    }
+
+
+def test_respond_serves_fixtures_then_fill(tmp_path):
+    dates = pd.date_range("2020-01-01", periods=3, name="Date")
+    stored = pd.DataFrame({"Max_Temp_C": [1.0, 2.0, 3.0]}, index=dates)
+    stored.to_csv(tmp_path / "site_10.0_20.0.csv")
+    server = PowerServer(fixtures=str(tmp_path), registry=False, synthetic=False)
+
+    status, body = server.respond(query("20200101", "20200104"))
+    assert status == 200
+    values = body["properties"]["parameter"]
+    assert list(values["T2M_MAX"].values()) == [1.0, 2.0, 3.0, FILL_VALUE]
+    assert list(values["T2M_MIN"].values()) == [FILL_VALUE] * 4
+    assert body["header"]["start"] == "20200101"
+
+    assert server.respond(query("20200104", "20200101"))[0] == 422
+    assert server.respond({"parameters": "T2M_MAX"})[0] == 422
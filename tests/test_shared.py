@@ -0,0 +1,51 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine.shared
+from engine.shared import publish_panel
+from tests.conftest import stored_weather, synthetic_prices
+
+NAMES = ["corn", "coffee"]
+
+
+def close(name):
+    prices = synthetic_prices(name)["Close"]
+    # a commodity with holes in its calendar is read through a mask, not a slice
+    return prices.iloc[::3] if name == "coffee" else prices
+
+
+def fake_price_matrix(names, start, end, offline):
+    matrix = pd.concat([close(name).rename(name) for name in names], axis=1)
+    return matrix.index.values, matrix.to_numpy()
+
+
+@pytest.fixture
+def panel(monkeypatch):
+    monkeypatch.setattr(engine.shared, "price_matrix", fake_price_matrix)
+    with publish_panel(NAMES) as panel:
+        yield panel
+
+
+def read_back(panel, name):
+    return panel.prices(name), panel.weather(name)
+
+
+def test_panel_reads_back_each_commodity(panel):
+    for name in NAMES:
+        prices, weather = read_back(panel, name)
+        np.testing.assert_array_equal(prices.to_numpy(), close(name).to_numpy())
+        assert prices.index.equals(close(name).index)
+        pd.testing.assert_frame_equal(weather, stored_weather(name), check_freq=False)
+        assert not weather.to_numpy().flags.writeable
+
+
+def test_panel_pickles_as_a_reference(panel):
+    assert len(pickle.dumps(panel)) < 10_000 < panel.nbytes
+    with ProcessPoolExecutor(1) as pool:
+        prices, weather = pool.submit(read_back, panel, "coffee").result()
+    pd.testing.assert_series_equal(prices, panel.prices("coffee"))
+    pd.testing.assert_frame_equal(weather, panel.weather("coffee"))
@@ -0,0 +1,11 @@
+from engine.registry import list_commodities
+from engine.signal_index import SignalIndex
+from engine.signals import get_buy_signals
+from tests.conftest import stored_weather
+
+
+def test_buy_signals_match_get_buy_signals(commodity):
+    name, spec, df, prices = commodity
+    weather = {n: stored_weather(n) for n in list_commodities()}
+    index = SignalIndex.from_rules(list_commodities(), weather)
+    assert index.buy_signals(name, prices) == get_buy_signals(df, prices, spec["rules"])
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from engine.registry import SIGNAL_CUTOFF_YEAR
+from engine.signals import get_buy_signals
+
+OPERATORS = {
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+}
+
+
+def row_loop_signals(df, prices, rules, cutoff_year=SIGNAL_CUTOFF_YEAR):
+    """The per-crop scripts' loops: row-by-row extremes, first date per month"""
+    extremes = []
+    for i in range(len(df)):
+        for rule in rules:
+            value = df[rule["column"]].iloc[i]
+            month_ok = not rule.get("months") or df.index[i].month in rule["months"]
+            if OPERATORS[rule["op"]](value, rule["threshold"]) and month_ok:
+                extremes.append(df.index[i].date())
+    signals = []
+    seen_months = set()
+    for date in pd.to_datetime(sorted(set(extremes))):
+        if date not in prices.index or date.year >= cutoff_year:
+            continue
+        month_key = (date.year, date.month)
+        if month_key in seen_months:
+            continue
+        seen_months.add(month_key)
+        signals.append(date)
+    return signals
+
+
+def test_buy_signals_match_row_loop(commodity):
+    _, spec, df, prices = commodity
+    signals = get_buy_signals(df, prices, spec["rules"])
+    assert signals
+    assert signals == row_loop_signals(df, prices, spec["rules"])
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from engine.significance import (
+    adjust_p_values,
+    batch_permutation_test,
+    permutation_matrix,
+)
+
+NAN = np.nan
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        # Holm: sorted p times (m - rank + 1), running max
+        ("holm", [0.03, 0.06, NAN, 0.06, 0.02]),
+        # BH: sorted p times m / rank, running min from the largest
+        ("bh", [0.02, 0.04, NAN, 0.04, 0.02]),
+    ],
+)
+def test_adjusted_p_values_by_hand(method, expected):
+    p_values = [0.01, 0.04, NAN, 0.03, 0.005]
+    np.testing.assert_allclose(adjust_p_values(p_values, method), expected)
+
+
+def test_adjusted_p_values_are_capped_at_one():
+    np.testing.assert_allclose(adjust_p_values([0.5, 0.9], "holm"), [1.0, 1.0])
+    with pytest.raises(ValueError):
+        adjust_p_values([0.5], "bonferroni")
+
+
+def test_batch_matches_a_loop_over_shuffles():
+    rng = np.random.default_rng(0)
+    n_months, repetition = 48, 300
+    labels = rng.random((4, n_months)) < 0.3
+    labels[3] = False  # no signal months: nothing to compare
+    returns = rng.normal(0, 0.05, (4, n_months)) + 0.02 * labels
+
+    observed, p_values = batch_permutation_test(labels, returns, repetition, seed=1)
+    chunked = batch_permutation_test(labels, returns, repetition, seed=1, max_bytes=1)
+    np.testing.assert_array_equal(chunked[1], p_values)
+
+    permutations = permutation_matrix(n_months, repetition, np.random.default_rng(1))
+    for row in range(3):
+        signal = labels[row]
+        difference = returns[row][signal].mean() - returns[row][~signal].mean()
+        assert observed[row] == pytest.approx(difference)
+        count = 0
+        for permutation in permutations:
+            shuffled = signal[permutation]
+            shuffled_difference = (
+                returns[row][shuffled].mean() - returns[row][~shuffled].mean()
+            )
+            count += shuffled_difference >= difference - 1e-12
+        assert p_values[row] == pytest.approx(count / repetition)
+    assert np.isnan(observed[3]) and np.isnan(p_values[3])
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.bootstrap import TRADING_DAYS_PER_YEAR
+from engine.data import close_prices
+from engine.panel import align_prices
+from engine.portfolio import portfolio_backtest
+from engine.registry import get_commodity
+from engine.signals import get_buy_signals
+from engine.sizing import (
+    SIZING_POLICIES,
+    min_variance_weight,
+    position_cash,
+    sizing_table,
+)
+from tests.conftest import stored_weather, synthetic_prices
+
+NAMES = ["corn", "coffee", "lean_hogs"]
+
+
+@pytest.fixture(scope="module")
+def portfolio():
+    panel = align_prices({name: close_prices(synthetic_prices(name)) for name in NAMES})
+    signals = {
+        name: get_buy_signals(
+            stored_weather(name), synthetic_prices(name), get_commodity(name)["rules"]
+        )
+        for name in NAMES
+    }
+    return panel, signals
+
+
+def test_rolling_tables_match_pandas(portfolio):
+    panel, _ = portfolio
+    returns = panel.frame().pct_change()
+    volatility = returns.rolling(63, min_periods=20).std() * np.sqrt(
+        TRADING_DAYS_PER_YEAR
+    )
+    kind, scores = sizing_table(panel.values, {"policy": "inverse_vol"})
+    assert kind == "share"
+    np.testing.assert_allclose(scores[25:], 1 / volatility.to_numpy()[25:])
+    assert (scores[:20] == 0).all()
+
+    kind, fractions = sizing_table(
+        panel.values, {"policy": "vol_target", "target": 0.1}
+    )
+    assert kind == "target"
+    np.testing.assert_allclose(fractions[25:], 0.1 / volatility.to_numpy()[25:])
+
+    _, kelly = sizing_table(panel.values, {"policy": "kelly", "cap": 0.3})
+    assert kelly.min() >= 0 and kelly.max() <= 0.3
+
+
+def test_position_cash():
+    scores = np.array([[1.0, 3.0, 4.0]])
+    free = np.array([True, True, False])
+    assert position_cash("share", scores, 0, 1, 1000.0, 5000.0, free) == 750.0
+    fractions = np.array([[0.5, 0.1, 0.0]])
+    assert position_cash("target", fractions, 0, 0, 1000.0, 5000.0, free) == 1000.0
+    assert position_cash("target", fractions, 0, 1, 1000.0, 5000.0, free) == 500.0
+
+
+def test_min_variance_weights_two_assets():
+    covariance = np.array([[0.04, 0.01, 0.0], [0.01, 0.09, 0.0], [0.0, 0.0, 0.01]])
+    free = np.array([True, True, False])
+    # closed form for two assets: (s2^2 - s12) / (s1^2 + s2^2 - 2 s12)
+    expected = (0.09 - 0.01) / (0.04 + 0.09 - 0.02)
+    assert min_variance_weight(covariance, 0, free) == pytest.approx(expected)
+    assert min_variance_weight(covariance, 1, free) == pytest.approx(1 - expected)
+    covariance[1, 1] = np.nan
+    assert min_variance_weight(covariance, 0, free) == 1.0
+    assert min_variance_weight(covariance, 1, free) == 0.0
+
+
+def test_equal_policy_splits_free_cash(portfolio):
+    panel, signals = portfolio
+    default = portfolio_backtest(panel, signals)
+    equal = portfolio_backtest(panel, signals, sizing={"policy": "equal"})
+    pd.testing.assert_frame_equal(default[2], equal[2])
+    values = default[2]
+    # the first trade of the run gets a third of the cash: nothing is held yet
+    first = values[NAMES].to_numpy().sum(axis=1).nonzero()[0][0]
+    assert values["cash"].iloc[first] == pytest.approx(10000 * 2 / 3)
+
+
+@pytest.mark.parametrize("policy", SIZING_POLICIES)
+def test_policies_never_borrow(portfolio, policy):
+    panel, signals = portfolio
+    _, _, values = portfolio_backtest(panel, signals, sizing={"policy": policy})
+    assert (values["cash"] >= -1e-6).all()
+    assert (values[NAMES] >= 0).all().all()
+    np.testing.assert_allclose(
+        values["portfolio"], values[NAMES].sum(axis=1) + values["cash"]
+    )
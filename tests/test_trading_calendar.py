@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.trading_calendar import trading_calendar
+from tests.conftest import synthetic_prices
+
+
+@pytest.fixture
+def index():
+    # a business-day calendar with holes, so nearest-day ties and gaps occur
+    dates = synthetic_prices("corn").index
+    return dates[np.random.default_rng(0).random(len(dates)) > 0.1]
+
+
+@pytest.mark.parametrize("months", [1, 3, 10])
+def test_month_table_matches_date_offsets(index, months):
+    calendar = trading_calendar(index)
+    expected = index.get_indexer(index + pd.DateOffset(months=months), method="nearest")
+    np.testing.assert_array_equal(calendar.month_table(months), expected)
+
+
+def test_nearest_matches_get_indexer(index):
+    targets = pd.date_range(index[0] - pd.Timedelta(days=5), periods=400, freq="19h")
+    expected = index.get_indexer(targets, method="nearest")
+    np.testing.assert_array_equal(trading_calendar(index).nearest(targets), expected)
+
+
+def test_months_ahead_per_entry(index):
+    calendar = trading_calendar(index)
+    positions = np.array([0, 10, 20, 30])
+    months = np.array([1, 3, 1, 6])
+    expected = [calendar.month_table(h)[p] for p, h in zip(positions, months)]
+    np.testing.assert_array_equal(calendar.months_ahead(positions, months), expected)
+    assert trading_calendar(index.copy()) is calendar
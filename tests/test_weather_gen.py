@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from engine.backtest import INITIAL_CASH, backtest_strategy
+from engine.data import close_prices
+from engine.registry import SIGNAL_CUTOFF_YEAR
+from engine.signals import get_buy_signals
+from engine.trading_calendar import trading_calendar
+from engine.weather_gen import batch_backtest, batch_rule_mask, first_in_month_mask
+from tests.conftest import synthetic_prices
+
+
+@pytest.mark.parametrize("holding_period", [3, 10])
+def test_stress_pipeline_on_observed_weather(commodity, holding_period):
+    """The observed weather as the only scenario reproduces the backtest"""
+    _, spec, df, prices = commodity
+    close = close_prices(prices)
+    columns = [c for c in df.columns if df[c].dtype.kind == "f"]
+    sims = df[columns].to_numpy(dtype=float)[None]
+    fired = batch_rule_mask(sims, df.index, columns, spec["rules"], observed=df)
+
+    positions = close.index.get_indexer(df.index)
+    tradable = (positions >= 0) & (df.index.year < SIGNAL_CUTOFF_YEAR)
+    signals = first_in_month_mask(fired & tradable[None], df.index)
+    expected = get_buy_signals(df, prices, spec["rules"])
+    assert list(df.index[signals[0]]) == expected
+
+    signal_mask = np.zeros((1, len(close)), dtype=bool)
+    signal_mask[:, positions[tradable]] = signals[:, tradable]
+    final_cash, n_trades = batch_backtest(
+        close, signal_mask, holding_period, spec["drag"], spec["roll_months"]
+    )
+    cash, _, _ = backtest_strategy(
+        prices,
+        expected,
+        holding_period,
+        spec["drag"],
+        spec["roll_months"],
+        verbose=False,
+    )
+    assert final_cash[0] == pytest.approx(cash)
+    assert n_trades[0] > 0
+
+
+def test_batch_backtest_matches_trade_loop():
+    close = close_prices(synthetic_prices("corn"))
+    exits = trading_calendar(close.index).month_table(3)
+    growth = close.to_numpy()[exits] / close.to_numpy()
+    rng = np.random.default_rng(0)
+    signal_mask = rng.random((20, len(close))) < rng.uniform(0, 0.2, (20, 1))
+    signal_mask[0] = False
+    signal_mask[1, -1] = True
+
+    final_cash, n_trades = batch_backtest(close, signal_mask, 3)
+    for row, positions in enumerate(map(np.flatnonzero, signal_mask)):
+        cash, trades, busy_until = float(INITIAL_CASH), 0, -1
+        for pos in positions:
+            if pos >= busy_until:
+                cash *= growth[pos]
+                trades += 1
+                busy_until = exits[pos]
+        assert final_cash[row] == pytest.approx(cash)
+        assert n_trades[row] == trades